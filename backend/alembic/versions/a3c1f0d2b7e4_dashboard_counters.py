@@ -0,0 +1,134 @@
+"""dashboard counters maintained by triggers
+
+Revision ID: a3c1f0d2b7e4
+Revises: 778dc2bdac96
+Create Date: 2026-10-18 09:12:40.118204
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c1f0d2b7e4"
+down_revision: Union[str, Sequence[str], None] = "778dc2bdac96"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Zähler-Definition (Stand dieser Migration): name → (Tabelle, scope-Ausdruck, Bedingung)
+COUNTERS = {
+    "employees": ("employees", "''", "true"),
+    "employees_by_department": ("employees", "coalesce(nullif(department, ''), 'Unassigned')", "true"),
+    "vacations_pending": ("vacation_requests", "''", "status = 'pending'"),
+    "time_entries_running": ("time_entries", "''", "end_time IS NULL"),
+    "documents": ("documents", "''", "true"),
+    "reminders_pending": ("reminders", "''", "status = 'pending'"),
+}
+TABLES = sorted({table for table, _, _ in COUNTERS.values()})
+
+
+def _deltas(table: str, source: str, sign: int) -> str:
+    """SELECT name, scope, ±1 FROM <transition table> WHERE <bedingung> – je Zähler der Tabelle"""
+    return "\n        UNION ALL ".join(
+        f"SELECT '{name}'::text, ({scope})::text, {sign} FROM {source} WHERE {cond}"
+        for name, (tbl, scope, cond) in COUNTERS.items()
+        if tbl == table
+    )
+
+
+def _upsert(selects: str) -> str:
+    return f"""
+        INSERT INTO dashboard_counters (name, scope, value, updated_at)
+        SELECT name, scope, sum(d), now() FROM (
+            {selects}
+        ) AS delta(name, scope, d)
+        GROUP BY name, scope
+        HAVING sum(d) <> 0
+        ON CONFLICT (name, scope) DO UPDATE
+            SET value = dashboard_counters.value + EXCLUDED.value, updated_at = now();"""
+
+
+def _trigger_function(table: str) -> str:
+    names = ", ".join(f"'{n}'" for n, (t, _, _) in COUNTERS.items() if t == table)
+    return f"""
+    CREATE OR REPLACE FUNCTION dashboard_counters_{table}() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_upsert(_deltas(table, "new_rows", 1))}
+        ELSIF TG_OP = 'DELETE' THEN{_upsert(_deltas(table, "old_rows", -1))}
+        ELSIF TG_OP = 'UPDATE' THEN{_upsert(_deltas(table, "new_rows", 1) + " UNION ALL " + _deltas(table, "old_rows", -1))}
+        ELSIF TG_OP = 'TRUNCATE' THEN
+            UPDATE dashboard_counters SET value = 0, updated_at = now() WHERE name IN ({names});
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            name VARCHAR(64) NOT NULL,
+            scope VARCHAR(200) NOT NULL DEFAULT '',
+            value BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (name, scope)
+        )
+        """
+    )
+
+    # ⏱️ Zeitabhängige Kennzahlen werden beim Lesen korrigiert → schmale Indizes dafür
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reminders_pending_due_at ON reminders (due_at) WHERE status = 'pending'"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sick_leaves_end_date_start_date ON sick_leaves (end_date, start_date)"
+    )
+
+    # 🔁 Statement-Trigger mit Transition-Tables: ein Upsert pro Statement (auch bei COPY / Bulk-Updates)
+    for table in TABLES:
+        op.execute(_trigger_function(table))
+        for event, ref in (
+            ("INSERT", "REFERENCING NEW TABLE AS new_rows"),
+            ("UPDATE", "REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+            ("DELETE", "REFERENCING OLD TABLE AS old_rows"),
+        ):
+            trigger = f"trg_dashboard_counters_{table}_{event.lower()}"
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+            op.execute(
+                f"CREATE TRIGGER {trigger} AFTER {event} ON {table} {ref} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_{table}()"
+            )
+        trigger = f"trg_dashboard_counters_{table}_truncate"
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {trigger} AFTER TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counters_{table}()"
+        )
+
+    # 🧮 Erstbefüllung (danach hält der Trigger die Werte aktuell)
+    op.execute("DELETE FROM dashboard_counters")
+    for name, (table, scope, cond) in COUNTERS.items():
+        op.execute(
+            f"INSERT INTO dashboard_counters (name, scope, value) "
+            f"SELECT '{name}', {scope}, count(*) FROM {table} WHERE {cond} GROUP BY 2"
+        )
+    # Basis-Zeilen auch bei leeren Tabellen (markiert „Zähler sind aufgebaut“)
+    op.execute(
+        "INSERT INTO dashboard_counters (name, scope, value) VALUES "
+        + ", ".join(f"('{n}', '', 0)" for n, (_, scope, _) in COUNTERS.items() if scope == "''")
+        + " ON CONFLICT DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for event in ("insert", "update", "delete", "truncate"):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_dashboard_counters_{table}_{event} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS dashboard_counters_{table}()")
+    op.drop_index("ix_sick_leaves_end_date_start_date", table_name="sick_leaves", if_exists=True)
+    op.drop_index("ix_reminders_pending_due_at", table_name="reminders", if_exists=True)
+    op.drop_table("dashboard_counters")
@@ -0,0 +1,86 @@
+"""Structured audit resource columns (resource_type, resource_id) + indexes
+
+Revision ID: a8d3e5f7b9c1
+Revises: f2a6c8d4e1b7
+Create Date: 2026-10-18 19:12:31.508216
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d3e5f7b9c1"
+down_revision: Union[str, Sequence[str], None] = "f2a6c8d4e1b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# gleiche Regeln wie app/core/audit.py: split_resource
+RESOURCE_TYPE = """
+    CASE
+        WHEN resource LIKE '/%' THEN 'route'
+        WHEN strpos(resource, ':') > 0 THEN left(lower(split_part(resource, ':', 1)), 50)
+        WHEN strpos(resource, '_') > 0 THEN left(lower(split_part(resource, '_', 1)), 50)
+        ELSE left(lower(resource), 50)
+    END
+"""
+RESOURCE_ID = """
+    CASE
+        WHEN resource LIKE '/%' THEN resource
+        WHEN strpos(resource, ':') > 0 THEN nullif(substr(resource, strpos(resource, ':') + 1), '')
+        WHEN strpos(resource, '_') > 0 THEN nullif(substr(resource, strpos(resource, '_') + 1), '')
+    END
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # IF NOT EXISTS: frisch per create_all angelegte Schemas haben die Spalten schon
+    op.execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS resource_type VARCHAR(50)")
+    op.execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS resource_id VARCHAR(255)")
+
+    # Backfill in Batches entlang (created_at, id), jeder Batch eigene Transaktion → kurze Row-Locks,
+    # kein riesiges UPDATE; E-Mails und Aktionen dabei gleich normalisieren (Filter = Gleichheit auf dem Index)
+    with op.get_context().autocommit_block():
+        cursor = None
+        while True:
+            after = "" if cursor is None else "WHERE (created_at, id) > (:c, :i)"
+            params = {} if cursor is None else {"c": cursor[0], "i": cursor[1]}
+            upper = bind.execute(sa.text(
+                f"SELECT created_at, id FROM audit_logs {after} "
+                f"ORDER BY created_at, id OFFSET {BATCH_SIZE - 1} LIMIT 1"
+            ), params).first()
+            bounds = [] if cursor is None else ["(created_at, id) > (:c, :i)"]
+            if upper is not None:
+                bounds.append("(created_at, id) <= (:uc, :ui)")
+                params.update(uc=upper[0], ui=upper[1])
+            where = f"WHERE {' AND '.join(bounds)}" if bounds else ""
+            bind.execute(sa.text(
+                f"UPDATE audit_logs SET resource_type = {RESOURCE_TYPE}, resource_id = {RESOURCE_ID}, "
+                f"user_email = lower(user_email), action = lower(action) {where}"
+            ), params)
+            if upper is None:
+                break
+            cursor = (upper[0], upper[1])
+
+    # Nachzügler (während des Backfills geschrieben, noch ohne Spalten) im selben Schritt wie NOT NULL
+    op.execute(
+        f"UPDATE audit_logs SET resource_type = {RESOURCE_TYPE}, resource_id = {RESOURCE_ID}, "
+        "user_email = lower(user_email), action = lower(action) WHERE resource_type IS NULL"
+    )
+    op.alter_column("audit_logs", "resource_type", nullable=False)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_resource_type_created_at ON audit_logs (resource_type, created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_user_email_created_at ON audit_logs (user_email, created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_action_created_at ON audit_logs (action, created_at)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_logs_action_created_at", table_name="audit_logs", if_exists=True)
+    op.drop_index("ix_audit_logs_user_email_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_resource_type_created_at", table_name="audit_logs")
+    op.drop_column("audit_logs", "resource_id")
+    op.drop_column("audit_logs", "resource_type")
@@ -0,0 +1,29 @@
+"""indexes for keyset pagination of upcoming absences
+
+Revision ID: b7d2e9a41c05
+Revises: a3c1f0d2b7e4
+Create Date: 2026-10-18 11:40:02.531877
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e9a41c05"
+down_revision: Union[str, Sequence[str], None] = "a3c1f0d2b7e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Urlaube im Fenster [today, until] in (start_date, id)-Reihenfolge
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vacation_requests_start_date_id ON vacation_requests (start_date, id)"
+    )
+    # Krankmeldungen mit end_date >= today nutzen ix_sick_leaves_end_date_start_date (a3c1f0d2b7e4)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_vacation_requests_start_date_id", table_name="vacation_requests", if_exists=True)
@@ -0,0 +1,76 @@
+"""audit_logs.details as JSONB + GIN index
+
+Revision ID: c2f7a9d4e6b3
+Revises: a8d3e5f7b9c1
+Create Date: 2026-10-18 20:03:57.114902
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f7a9d4e6b3"
+down_revision: Union[str, Sequence[str], None] = "a8d3e5f7b9c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# gleiche Regeln wie app/core/audit.py: _safe_json – JSON-Objekte bleiben, Text (auch gekürztes JSON) → {"message": …}
+AS_JSONB = """
+    CASE
+        WHEN details IS NULL OR details = '' THEN NULL
+        WHEN pg_input_is_valid(details, 'jsonb') AND jsonb_typeof(details::jsonb) = 'object' THEN details::jsonb
+        ELSE jsonb_build_object('message', details)
+    END
+"""
+
+
+def _details_type(bind) -> str:
+    return bind.scalar(sa.text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'audit_logs' AND column_name = 'details'"
+    ))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if _details_type(bind) != "jsonb":
+        # ALTER COLUMN … TYPE jsonb würde die ganze Tabelle unter ACCESS EXCLUSIVE umschreiben →
+        # Schattenspalte in Batches füllen, am Ende nur noch kurz umbenennen
+        op.execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS details_jsonb JSONB")
+
+        with op.get_context().autocommit_block():
+            cursor = None
+            while True:
+                after = "" if cursor is None else "WHERE (created_at, id) > (:c, :i)"
+                params = {} if cursor is None else {"c": cursor[0], "i": cursor[1]}
+                upper = bind.execute(sa.text(
+                    f"SELECT created_at, id FROM audit_logs {after} "
+                    f"ORDER BY created_at, id OFFSET {BATCH_SIZE - 1} LIMIT 1"
+                ), params).first()
+                bounds = [] if cursor is None else ["(created_at, id) > (:c, :i)"]
+                if upper is not None:
+                    bounds.append("(created_at, id) <= (:uc, :ui)")
+                    params.update(uc=upper[0], ui=upper[1])
+                bounds.append("details_jsonb IS NULL")
+                bind.execute(sa.text(
+                    f"UPDATE audit_logs SET details_jsonb = {AS_JSONB} WHERE {' AND '.join(bounds)}"
+                ), params)
+                if upper is None:
+                    break
+                cursor = (upper[0], upper[1])
+
+        # Nachzügler + Tausch in einer kurzen Transaktion (DROP/RENAME sind reine Katalog-Änderungen)
+        op.execute(f"UPDATE audit_logs SET details_jsonb = {AS_JSONB} WHERE details_jsonb IS NULL AND details IS NOT NULL")
+        op.execute("ALTER TABLE audit_logs DROP COLUMN details")
+        op.execute("ALTER TABLE audit_logs RENAME COLUMN details_jsonb TO details")
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_details ON audit_logs USING gin (details jsonb_path_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_details")
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN details TYPE TEXT USING details::text")
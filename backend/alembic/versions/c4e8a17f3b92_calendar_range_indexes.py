@@ -0,0 +1,36 @@
+"""GiST range indexes for the team absence calendar
+
+Revision ID: c4e8a17f3b92
+Revises: b7d2e9a41c05
+Create Date: 2026-10-18 13:05:47.902114
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e8a17f3b92"
+down_revision: Union[str, Sequence[str], None] = "b7d2e9a41c05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ausdruck muss exakt dem in app/models.py (VACATION_PERIOD / SICK_LEAVE_PERIOD) entsprechen
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vacation_requests_period ON vacation_requests "
+        "USING gist (daterange(start_date, GREATEST(start_date, end_date), '[]'))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sick_leaves_period ON sick_leaves "
+        "USING gist (tstzrange(start_date, GREATEST(start_date, end_date), '[]'))"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_employees_department ON employees (department)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_employees_department", table_name="employees", if_exists=True)
+    op.drop_index("ix_sick_leaves_period", table_name="sick_leaves", if_exists=True)
+    op.drop_index("ix_vacation_requests_period", table_name="vacation_requests", if_exists=True)
@@ -0,0 +1,51 @@
+"""table version watermarks for conditional GET
+
+Revision ID: d9a4c2e6f1b8
+Revises: c4e8a17f3b92
+Create Date: 2026-10-18 15:21:09.337460
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a4c2e6f1b8"
+down_revision: Union[str, Sequence[str], None] = "c4e8a17f3b92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("employees", "documents", "sick_leaves", "vacation_requests", "time_entries", "reminders")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # eine Sequenz pro Tabelle statt einer Zeile in einer Versions-Tabelle: nextval() sperrt nichts,
+    # parallele Schreiber derselben Tabelle warten nicht bis zum Commit des anderen
+    for table in TABLES:
+        op.execute(f"CREATE SEQUENCE IF NOT EXISTS table_version_{table}")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM nextval(('table_version_' || TG_TABLE_NAME)::regclass);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    for table in TABLES:
+        trigger = f"trg_table_version_{table}"
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_table_version_{table} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    for table in TABLES:
+        op.execute(f"DROP SEQUENCE IF EXISTS table_version_{table}")
@@ -0,0 +1,30 @@
+"""Case-insensitive identity indexes on employees
+
+Revision ID: e5b3f7a9c2d1
+Revises: d9a4c2e6f1b8
+Create Date: 2026-10-18 16:42:10.318554
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b3f7a9c2d1"
+down_revision: Union[str, Sequence[str], None] = "d9a4c2e6f1b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ausdrücke müssen exakt denen in app/core/identity.py entsprechen (lower(...) = lower(:wert))
+    op.execute("CREATE INDEX IF NOT EXISTS ix_employees_email_lower ON employees (lower(email))")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_employees_name_lower ON employees (lower(name))")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_employees_employee_id_lower ON employees (lower(employee_id))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_employees_employee_id_lower", table_name="employees", if_exists=True)
+    op.drop_index("ix_employees_name_lower", table_name="employees", if_exists=True)
+    op.drop_index("ix_employees_email_lower", table_name="employees", if_exists=True)
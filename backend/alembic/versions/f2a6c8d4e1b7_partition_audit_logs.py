@@ -0,0 +1,111 @@
+"""Partition audit_logs by month (RANGE created_at)
+
+Revision ID: f2a6c8d4e1b7
+Revises: e5b3f7a9c2d1
+Create Date: 2026-10-18 18:05:44.912730
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a6c8d4e1b7"
+down_revision: Union[str, Sequence[str], None] = "e5b3f7a9c2d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# weitere Monate legt app/services/audit_partitions.py (Lifespan/CLI) an
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_email, role, action, resource, details, created_at"
+# Alt-Tabelle (119d32d1de2f) erlaubt created_at NULL → beim Umkopieren auf „jetzt“ setzen statt abzubrechen
+LEGACY_VALUES = "id, user_email, role, action, resource, details, coalesce(created_at, now())"
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month(month: date) -> None:
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS audit_logs_{month:%Y_%m} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{upper:%Y-%m-%d} 00:00:00+00')"
+    )
+
+
+def _relkind(bind) -> str:
+    return bind.scalar(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_logs')"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    today = datetime.now(timezone.utc).date()
+    first = date(today.year, today.month, 1)
+
+    if _relkind(bind) == "r":
+        # bestehende Tabelle einmalig umkopieren (Postgres kann eine Tabelle nicht in-place partitionieren);
+        # Spaltenbreiten wie in 119d32d1de2f, sonst scheitert der Kopierschritt an langen Werten
+        op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+        op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+        op.execute(
+            """
+            CREATE TABLE audit_logs (
+                id UUID NOT NULL,
+                user_email VARCHAR(255) NOT NULL,
+                role VARCHAR(50) NOT NULL,
+                action VARCHAR(200) NOT NULL,
+                resource VARCHAR(255) NOT NULL,
+                details TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        oldest = bind.scalar(sa.text("SELECT min(created_at) FROM audit_logs_legacy"))
+        if oldest is not None:
+            oldest = oldest.astimezone(timezone.utc).date()
+            first = min(first, date(oldest.year, oldest.month, 1))
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_audit_logs_created_at ON audit_logs (created_at)")
+    # Auffangbecken für Zeilen außerhalb aller Monate (z. B. Wartung ausgefallen) – sollte leer bleiben
+    op.execute("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    month, last = first, _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        _create_month(month)
+        month = _add_months(month, 1)
+
+    if bind.scalar(sa.text("SELECT to_regclass('audit_logs_legacy') IS NOT NULL")):
+        op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {LEGACY_VALUES} FROM audit_logs_legacy")
+        op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _relkind(op.get_bind()) != "p":
+        return
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    op.execute("ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_partitioned_created_at")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID NOT NULL,
+            user_email VARCHAR(255) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            action VARCHAR(200) NOT NULL,
+            resource VARCHAR(255) NOT NULL,
+            details TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            CONSTRAINT audit_logs_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    # Partitionen werden mit der Elterntabelle gelöscht
+    op.execute("DROP TABLE audit_logs_partitioned")
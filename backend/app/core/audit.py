@@ -1,16 +1,36 @@
 # app/core/audit.py
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Union
+import asyncio
+import base64
+import binascii
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Literal, Optional, Tuple, Union
 
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, Query
+from sqlalchemy import ColumnElement, func, insert, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# ============================================================
+# ⚙️ Konfiguration (asynchroner Audit-Writer, opt-in)
+# ============================================================
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "0") == "1"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))      # M Einträge → sofort schreiben
+AUDIT_FLUSH_MS = int(os.getenv("AUDIT_FLUSH_MS", "250"))           # spätestens nach N ms schreiben
+AUDIT_MAX_BACKLOG = int(os.getenv("AUDIT_MAX_BACKLOG", "10000"))
+# Backlog voll: "sync" = im Request schreiben (wie früher), "drop_newest" / "drop_oldest" = verwerfen
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "sync")
+
 # Optional: actions/ressourcen whitelisten (hilft gegen Tippfehler im Code)
 ALLOWED_ACTIONS = {
     "create", "update", "delete", "approve", "reject",
@@ -22,85 +42,460 @@ ALLOWED_RESOURCE_PREFIXES = ("document:", "employee:", "reminder:", "vacation:",
 
 Jsonable = Union[str, Dict[str, Any]]
 
-def _safe_json(details: Jsonable) -> str:
-    """Konvertiert dict → JSON (verlustfrei), string bleibt string."""
-    if isinstance(details, str):
-        return details
+def _safe_json(details: Jsonable, max_len: int) -> Optional[Dict[str, Any]]:
+    """
+    details → JSON-Objekt für die JSONB-Spalte (durchsuchbar per @>, GIN-Index).
+    dict bleibt dict (nicht-serialisierbares wie datetimes → str), Text → {"message": …},
+    zu groß → {"message": <gekürztes JSON>, "truncated": true}. Muss zur Migration c2f7a9d4e6b3 passen.
+    """
+    if details is None or details == "":
+        return None
+    if not isinstance(details, dict):
+        details = {"message": str(details)}
     try:
         # default=str verhindert Crashes bei nicht-serialisierbaren Objekten (z. B. datetimes)
-        return json.dumps(details, ensure_ascii=False, default=str)
+        serialized = json.dumps(details, ensure_ascii=False, default=str)
     except Exception as e:
         # Fallback: best-effort string
         logger.warning("audit details could not be JSON-serialized: %s", e)
-        return str(details)
+        serialized = json.dumps({"message": str(details)}, ensure_ascii=False)
+    if len(serialized) > max_len:
+        return {"message": serialized[:max_len - 3] + "...", "truncated": True}
+    return json.loads(serialized)
 
 def _normalize_resource(resource: str) -> str:
     return resource.strip()
 
+# HR-Sicht auf die Audits (früher: resource ILIKE 'hr_%' OR 'document:%' OR 'reminder:%')
+HR_RESOURCE_TYPES = ("hr", "document", "reminder")
+
+def split_resource(resource: str) -> Tuple[str, Optional[str]]:
+    """
+    'document:<uuid>' → ('document', '<uuid>'), 'hr_reports' → ('hr', 'reports'),
+    '/hr/audits' (Route, z. B. ACCESS_DENIED) → ('route', '/hr/audits'), sonst (resource, None).
+    Muss zum Backfill in der Migration a8d3e5f7b9c1 passen.
+    """
+    resource = resource.strip()
+    if resource.startswith("/"):
+        return "route", resource
+    for sep in (":", "_"):
+        head, found, tail = resource.partition(sep)
+        if found:
+            return head.lower()[:50], tail or None
+    return resource.lower()[:50], None
+
 def _normalize_action(action: str) -> str:
     return action.strip().lower()
 
-def log_action(
-    db: Session,
+
+# ============================================================
+# 📅 Zeitraum-Filter (audit_logs ist nach Monat partitioniert)
+# ============================================================
+def created_between(date_from: Optional[date], date_to: Optional[date]) -> List[ColumnElement[bool]]:
+    """
+    Tage inklusive, UTC: created_at >= from 00:00 AND created_at < (to + 1 Tag) 00:00.
+    Halboffener Bereich auf der nackten Spalte → Postgres liest nur die betroffenen Monatspartitionen.
+    """
+    filters: List[ColumnElement[bool]] = []
+    if date_from is not None:
+        filters.append(models.AuditLog.created_at >= datetime.combine(date_from, dtime.min, timezone.utc))
+    if date_to is not None:
+        filters.append(models.AuditLog.created_at < datetime.combine(date_to + timedelta(days=1), dtime.min, timezone.utc))
+    return filters
+
+
+# ============================================================
+# 🗂️ Auswahllisten für die Admin-Filter (exakte Werte statt Freitext)
+# ============================================================
+def _distinct_values(column) -> Any:
+    """
+    SELECT DISTINCT per Index-Sprüngen (rekursive CTE, je Schritt ein min() über den Index)
+    statt Vollscan – Kosten ~ Anzahl verschiedener Werte, nicht Tabellengröße.
+    """
+    found = select(func.min(column).label("value")).cte("found", recursive=True)
+    step = select(select(func.min(column)).where(column > found.c.value).scalar_subquery())
+    found = found.union_all(step.where(found.c.value.isnot(None)))
+    return select(found.c.value).where(found.c.value.isnot(None))
+
+
+async def audit_filter_options(db: AsyncSession) -> Dict[str, List[str]]:
+    """{"actions": [...], "resource_types": [...]} – über ix_audit_logs_action_/resource_type_created_at."""
+    L = models.AuditLog
+    return {
+        "actions": list((await db.scalars(_distinct_values(L.action))).all()),
+        "resource_types": list((await db.scalars(_distinct_values(L.resource_type))).all()),
+    }
+
+
+def resource_filters(resource: Optional[str]) -> List[ColumnElement[bool]]:
+    """'document' → alle Dokumente, 'document:<id>' → genau eines (über ix_audit_logs_resource_type_created_at)."""
+    if not resource or not resource.strip():
+        return []
+    resource_type, resource_id = split_resource(resource)
+    filters: List[ColumnElement[bool]] = [models.AuditLog.resource_type == resource_type]
+    if resource_id is not None:
+        filters.append(models.AuditLog.resource_id == resource_id)
+    return filters
+
+def build_entry(
+    user: Optional[dict],
+    action: str,
+    resource: str,
+    details: Jsonable = "",
+    max_details_len: int = 4000,
+) -> Dict[str, Any]:
+    """Spaltenwerte für audit_logs (normalisiert, Details serialisiert + gekürzt, Zeitpunkt = jetzt)."""
+    norm_action = _normalize_action(action)
+    norm_resource = _normalize_resource(resource)
+
+    # Optionale Leitplanke gegen Zahlendreher/Tippfehler
+    if ALLOWED_ACTIONS and norm_action not in ALLOWED_ACTIONS:
+        logger.warning("audit action '%s' not in ALLOWED_ACTIONS (continuing)", norm_action)
+
+    if ALLOWED_RESOURCE_PREFIXES and not norm_resource.startswith(ALLOWED_RESOURCE_PREFIXES):
+        logger.warning("audit resource '%s' does not match expected prefixes %s (continuing)",
+                       norm_resource, ALLOWED_RESOURCE_PREFIXES)
+
+    # User-Fallbacks (z. B. Systemjobs)
+    user_email = ((user or {}).get("email") or "system@workmate").strip().lower()
+    user_role  = (user or {}).get("role")  or "system"
+
+    resource_type, resource_id = split_resource(norm_resource)
+
+    # Details sicher serialisieren + sanft begrenzen
+    serialized = _safe_json(details, max_details_len)
+
+    return {
+        "user_email": user_email,
+        "role": user_role,
+        "action": norm_action,
+        "resource": norm_resource,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": serialized,
+        "created_at": datetime.now(timezone.utc),  # tz-aware, Zeitpunkt der Aktion (nicht des Schreibens)
+    }
+
+
+async def log_action(
+    db: AsyncSession,
     user: Optional[dict],
     action: str,
     resource: str,
     details: Jsonable = "",
     *,
     strict: bool = False,          # wenn True → bei Fehler raise statt nur loggen
+    transactional: bool = False,   # True → immer in der Transaktion des Requests (auch mit AUDIT_ASYNC)
     max_details_len: int = 4000,   # Sicherheitsgrenze für sehr große Payloads
 ) -> None:
     """
     Fügt einen Audit-Log-Eintrag hinzu (ohne eigenen Commit).
-    - bleibt in der laufenden Transaktion (db.flush())
+    - Standard: bleibt in der laufenden Transaktion (db.flush())
+    - AUDIT_ASYNC=1: Eintrag geht in den Audit-Writer (Batch-Insert im Hintergrund, kein Roundtrip);
+      transactional=True / strict=True behalten die Garantie „Audit-Eintrag genau dann, wenn Commit“
     - fällt nie leise aus (loggt Fehler), optional strict
     - normalisiert action/resource, serialisiert details robust
 
     Args:
-        db: aktive SQLAlchemy Session
+        db: aktive AsyncSession des Requests
         user: dict mit mind. {"email", "role"} (kann None sein → wird zu 'system')
         action: z.B. 'upload', 'update', 'hr_export'
         resource: z.B. 'document:<uuid>' oder 'hr_reports'
         details: Kontextinfos (str oder dict)
-        strict: bei True Exceptions nicht schlucken
+        strict: bei True Exceptions nicht schlucken (impliziert transactional)
+        transactional: Eintrag mit den Daten committen/zurückrollen
         max_details_len: Details werden auf diese Länge gekürzt (DB-Constraints/GDPR)
     """
     try:
-        norm_action = _normalize_action(action)
-        norm_resource = _normalize_resource(resource)
-
-        # Optionale Leitplanke gegen Zahlendreher/Tippfehler
-        if ALLOWED_ACTIONS and norm_action not in ALLOWED_ACTIONS:
-            logger.warning("audit action '%s' not in ALLOWED_ACTIONS (continuing)", norm_action)
-
-        if ALLOWED_RESOURCE_PREFIXES and not norm_resource.startswith(ALLOWED_RESOURCE_PREFIXES):
-            logger.warning("audit resource '%s' does not match expected prefixes %s (continuing)",
-                           norm_resource, ALLOWED_RESOURCE_PREFIXES)
-
-        # User-Fallbacks (z. B. Systemjobs)
-        user_email = (user or {}).get("email") or "system@workmate"
-        user_role  = (user or {}).get("role")  or "system"
-
-        # Details sicher serialisieren + sanft begrenzen
-        serialized = _safe_json(details)
-        if serialized and len(serialized) > max_details_len:
-            serialized = serialized[:max_details_len - 3] + "..."
-
-        log = models.AuditLog(
-            user_email=user_email,
-            role=user_role,
-            action=norm_action,
-            resource=norm_resource,
-            details=serialized,
-            created_at=datetime.now(timezone.utc),  # tz-aware
-        )
-
-        db.add(log)
-        db.flush()  # keine eigene Transaktion eröffnen
-        logger.info("📝 audit: %s → %s", norm_action, norm_resource)
+        entry = build_entry(user, action, resource, details, max_details_len)
+
+        if AUDIT_ASYNC and not (strict or transactional) and audit_writer.submit(entry):
+            return
+
+        db.add(models.AuditLog(**entry))
+        await db.flush()  # keine eigene Transaktion eröffnen
+        logger.info("📝 audit: %s → %s", entry["action"], entry["resource"])
 
     except Exception as e:
         logger.error("⚠️ audit log failed (%s → %s): %s", action, resource, e, exc_info=True)
         if strict:
             raise
         # bewusst kein rollback hier – das gehört dem Call-Scope
+
+
+# ============================================================
+# 🧾 details (JSONB): Filter + Textform für CSV
+# ============================================================
+DETAILS_PARAM_PREFIX = "details."
+
+
+def details_filters(query_params: Iterable[Tuple[str, str]]) -> List[ColumnElement[bool]]:
+    """
+    ?details.employee_id=KIT-0042&details.format=json → details @> '{"employee_id": "KIT-0042"}' AND …
+    (ix_audit_logs_details, GIN jsonb_path_ops). Punkte im Schlüssel = verschachtelt, Zahlen/true/false
+    passen zusätzlich als JSON-Wert (details.entries=5 findet {"entries": 5}). ValueError bei leerem Pfad.
+    """
+    filters: List[ColumnElement[bool]] = []
+    for key, value in query_params:
+        if not key.startswith(DETAILS_PARAM_PREFIX):
+            continue
+        path = key[len(DETAILS_PARAM_PREFIX):].split(".")
+        if not all(path):
+            raise ValueError(key)
+        candidates: List[Any] = [value]
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            parsed = value
+        if parsed is None or isinstance(parsed, (bool, int, float)):
+            candidates.append(parsed)
+
+        documents = []
+        for candidate in candidates:
+            for part in reversed(path):
+                candidate = {part: candidate}
+            documents.append(models.AuditLog.details.contains(candidate))
+        filters.append(or_(*documents))
+    return filters
+
+
+def details_text(details: Optional[Dict[str, Any]]) -> Optional[str]:
+    return None if details is None else json.dumps(details, ensure_ascii=False)
+
+
+# ============================================================
+# 📜 Keyset-Pagination (created_at, id) mit undurchsichtigem Cursor
+# ============================================================
+AUDIT_COUNT_CAP = int(os.getenv("AUDIT_COUNT_CAP", "10000"))  # count=capped zählt höchstens so weit
+AuditCursor = Tuple[datetime, uuid.UUID]
+CountMode = Literal["exact", "capped", "none"]
+
+
+def encode_cursor(created_at: datetime, audit_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{audit_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> AuditCursor:
+    """Gegenstück zu encode_cursor (ValueError bei Unsinn)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(token) from e
+    created, _, audit_id = raw.partition("|")
+    created_at = datetime.fromisoformat(created)
+    if created_at.tzinfo is None:
+        raise ValueError(token)
+    return created_at, uuid.UUID(audit_id)
+
+
+def audit_cursor(
+    cursor: Optional[str] = Query(None, description="next_cursor der vorherigen Seite (ersetzt skip)"),
+) -> Optional[AuditCursor]:
+    """FastAPI-Dependency: Cursor prüfen → 400 statt 500 bei manipulierten Tokens."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'cursor'")
+
+
+async def audit_page(
+    db: AsyncSession,
+    filters: List[ColumnElement[bool]],
+    *,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[AuditCursor] = None,
+    count: CountMode = "capped",
+) -> Dict[str, Any]:
+    """
+    Neueste zuerst. Mit Cursor: WHERE (created_at, id) < Cursor statt OFFSET → jede Seite gleich schnell.
+    count: exact = Gesamtzahl (scannt alles Gefilterte), capped = bis AUDIT_COUNT_CAP, none = keine Zählung.
+    """
+    AuditLog = models.AuditLog
+    stmt = select(AuditLog).where(*filters).order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+    if cursor is not None:
+        created_at, audit_id = cursor
+        # created_at <= … als Index-Bedingung (jeder created_at-Index, Partition Pruning), Tupel nur für Gleichstände
+        stmt = stmt.where(AuditLog.created_at <= created_at, tuple_(AuditLog.created_at, AuditLog.id) < (created_at, audit_id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    total, capped = None, False
+    if count == "exact":
+        total = await db.scalar(select(func.count()).select_from(AuditLog).where(*filters))
+    elif count == "capped":
+        limited = select(AuditLog.id).where(*filters).limit(AUDIT_COUNT_CAP + 1).subquery()
+        total = await db.scalar(select(func.count()).select_from(limited))
+        capped = total > AUDIT_COUNT_CAP
+        total = min(total, AUDIT_COUNT_CAP)
+
+    # eine Zeile mehr holen → wissen, ob es weitergeht (keine leere letzte Seite)
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    items, more = rows[:limit], len(rows) > limit
+    return {
+        "total": total,
+        "total_capped": capped,
+        "items": items,
+        "next_cursor": encode_cursor(items[-1].created_at, items[-1].id) if more else None,
+    }
+
+
+# ============================================================
+# 📦 Asynchroner Audit-Writer (Batch-Inserts im Hintergrund)
+# ============================================================
+@dataclass
+class AuditWriterStats:
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    dropped: int = 0
+    overflow_sync: int = 0  # Backlog voll → im Request geschrieben
+    failed: int = 0
+    max_backlog_seen: int = 0
+
+
+class AuditWriter:
+    """
+    Sammelt Audit-Einträge im Speicher und schreibt sie gebündelt
+    (alle flush_ms Millisekunden oder sobald batch_size Einträge warten) mit einem Multi-Row-INSERT.
+    - Backlog begrenzt (max_backlog), Verhalten bei Überlauf: overflow
+    - stop() schreibt alles Ausstehende (Worker-Shutdown)
+    - läuft nicht (Tests, CLI) → submit() liefert False, Aufrufer schreibt selbst
+    Nicht transaktional: ein Eintrag kann geschrieben werden, obwohl der Request danach zurückrollt
+    (bzw. bei Absturz verloren gehen) → für Pflicht-Audits log_action(..., transactional=True).
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_ms: int = AUDIT_FLUSH_MS,
+        max_backlog: int = AUDIT_MAX_BACKLOG,
+        overflow: str = AUDIT_OVERFLOW,
+    ):
+        if overflow not in ("sync", "drop_newest", "drop_oldest"):
+            raise ValueError(f"unknown audit overflow policy: {overflow}")
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.max_backlog = max_backlog
+        self.overflow = overflow
+        self._backlog: Deque[Dict[str, Any]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._last_drop_warning = 0.0
+        self.stats = AuditWriterStats()
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    @property
+    def running(self) -> bool:
+        try:
+            return self._task is not None and not self._stopping and self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    # ---------- Lebenszyklus ----------
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake, self._stopping = asyncio.Event(), False
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Ausstehende Einträge schreiben und beenden."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await self._task
+        finally:
+            self._task, self._loop = None, None
+
+    # ---------- Einreihen ----------
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """True = übernommen (oder per Policy verworfen); False = Aufrufer muss selbst schreiben."""
+        if not self.running:
+            return False
+        if len(self._backlog) >= self.max_backlog:
+            if self.overflow == "sync":
+                self.stats.overflow_sync += 1
+                return False
+            self.stats.dropped += 1
+            self._warn_drop()
+            if self.overflow == "drop_newest":
+                return True
+            self._backlog.popleft()
+
+        self._backlog.append(entry)
+        self.stats.enqueued += 1
+        self.stats.max_backlog_seen = max(self.stats.max_backlog_seen, len(self._backlog))
+        if len(self._backlog) == 1 or len(self._backlog) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _warn_drop(self) -> None:
+        now = time.monotonic()
+        if now - self._last_drop_warning >= 10:
+            self._last_drop_warning = now
+            logger.warning("audit backlog full (%d) – dropping entries (%d so far)", self.max_backlog, self.stats.dropped)
+
+    # ---------- Schreiben ----------
+    async def _run(self) -> None:
+        while not (self._stopping and not self._backlog):
+            if not self._backlog:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            # erster Eintrag da → bis flush_ms warten, außer der Batch ist schon voll
+            if len(self._backlog) < self.batch_size and not self._stopping:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [self._backlog.popleft() for _ in range(min(self.batch_size, len(self._backlog)))]
+            await self._write(batch)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        for attempt in (1, 2):
+            try:
+                async with self._session() as db:
+                    await db.execute(insert(models.AuditLog), rows)
+                    await db.commit()
+                self.stats.written += len(rows)
+                self.stats.batches += 1
+                return
+            except Exception as e:
+                if attempt == 2:
+                    self.stats.failed += len(rows)
+                    logger.error("⚠️ audit batch of %d entries lost: %s", len(rows), e, exc_info=True)
+                else:
+                    await asyncio.sleep(0.5)
+
+    # ---------- Monitoring ----------
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": AUDIT_ASYNC,
+            "running": self._task is not None and not self._task.done(),
+            "backlog": len(self._backlog),
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_ms,
+            "max_backlog": self.max_backlog,
+            "overflow": self.overflow,
+            **self.stats.__dict__,
+        }
+
+
+audit_writer = AuditWriter()
@@ -1,17 +1,16 @@
 # app/core/auth.py
 from __future__ import annotations
 import json
-import requests
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
-from jwt.algorithms import RSAAlgorithm
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app import models
+from app.database import get_async_db
+from app.core.jwks import JWKSKeyStore, JWKSUnavailable
+from app.core.token_cache import TOKEN_CACHE_ENABLED, token_cache
+from app.core.identity import resolve_identity
 
 # ============================================================
 # ⚙️ Keycloak / OpenID Konfiguration
@@ -22,25 +21,12 @@ CLIENT_ID = "workmate-ui"
 JWKS_URI = f"{KEYCLOAK_INTERNAL}/realms/kit/protocol/openid-connect/certs"
 
 auth_scheme = HTTPBearer(auto_error=False)
-_JWKS_CACHE = None
 
 
 # ============================================================
-# 🔑 JWKS Key Retrieval (cached)
+# 🔑 JWKS Key Store (geparst, mit TTL + Nachladen bei Rotation)
 # ============================================================
-def get_jwks():
-    """Lädt und cached die öffentlichen JWKS-Schlüssel vom Keycloak-Server."""
-    global _JWKS_CACHE
-    if _JWKS_CACHE:
-        return _JWKS_CACHE
-    try:
-        res = requests.get(JWKS_URI, timeout=5)
-        res.raise_for_status()
-        jwks = res.json()
-        _JWKS_CACHE = {key["kid"]: key for key in jwks["keys"]}
-        return _JWKS_CACHE
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der JWKS: {e}")
+key_store = JWKSKeyStore(JWKS_URI)
 
 
 # ============================================================
@@ -49,7 +35,7 @@ def get_jwks():
 async def get_current_user(
     request: Request,
     creds: HTTPAuthorizationCredentials = Depends(auth_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Liefert den aktuellen Benutzer basierend auf:
@@ -77,14 +63,20 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Missing credentials")
 
     token = creds.credentials
+
+    # 🎟️ Schon verifiziert? → ohne Signaturprüfung und Employee-Query
+    if TOKEN_CACHE_ENABLED:
+        cached_user = token_cache.get(token)
+        if cached_user is not None:
+            return cached_user
+    generation = token_cache.generation
+
     try:
         header = jwt.get_unverified_header(token)
-        keys = get_jwks()
-        key_data = keys.get(header.get("kid"))
-        if not key_data:
+        public_key = await key_store.get_key(header.get("kid"))
+        if public_key is None:
             raise HTTPException(status_code=401, detail="Unknown key ID in token header")
 
-        public_key = RSAAlgorithm.from_jwk(key_data)
         decoded = jwt.decode(
             token,
             key=public_key,
@@ -93,6 +85,10 @@ async def get_current_user(
             issuer=OIDC_ISSUER,
         )
 
+    except HTTPException:
+        raise
+    except JWKSUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Fehler beim Laden der JWKS: {e}")
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except InvalidTokenError as e:
@@ -101,49 +97,15 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail=f"Token verification failed: {e}")
 
     # ============================================================
-    # 🧭 Benutzer in DB finden
+    # 🧭 Benutzer + Rolle auflösen (Index-Lookup, danach Per-Worker-Cache)
     # ============================================================
-    email = decoded.get("email")
-    username = decoded.get("preferred_username")
-    user = None
-
-    if email:
-        user = db.scalar(select(models.Employee).where(models.Employee.email == email))
-    if not user and username:
-        user = db.scalar(
-            select(models.Employee).where(
-                (models.Employee.name.ilike(username))
-                | (models.Employee.employee_id.ilike(f"%{username}%"))
-            )
-        )
-
-    if not user:
+    result = await resolve_identity(db, decoded)
+    if not result:
         raise HTTPException(status_code=404, detail="Kein Employee für aktuellen Benutzer gefunden")
 
-    # ============================================================
-    # 🧩 Rolle ableiten
-    # ============================================================
-    dept = (user.department or "").lower()
-    if dept in ("backoffice", "hr"):
-        role = "hr"
-    elif dept == "management":
-        role = "management"
-    elif dept == "support":
-        role = "support"
-    elif dept in ("facility", "security"):
-        role = "admin"
-    else:
-        role = "employee"
-
-    result = {
-        "preferred_username": user.name,
-        "email": user.email,
-        "employee_id": user.employee_id,
-        "department": dept,
-        "role": role,
-    }
-
     print("✅ Authenticated as:", result)
+    if TOKEN_CACHE_ENABLED:
+        token_cache.set(token, result, decoded.get("exp"), generation)
     return result
 
 
@@ -0,0 +1,274 @@
+# app/core/cache.py
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.core import changes
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+# Faktor auf alle TTLs (z. B. 0.5 in Staging, 0 = Cache praktisch aus)
+CACHE_TTL_FACTOR = float(os.getenv("CACHE_TTL_FACTOR", "1"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+
+# Parameter, die nicht in den Cache-Key gehören (Session, Request, eingeloggter User)
+IGNORED_PARAMS = {"db", "request", "user", "current_user"}
+
+
+# ============================================================
+# 🗃️ In-Process TTL-Cache mit Tags
+# ============================================================
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    expires_at: float
+    tags: frozenset
+
+
+@dataclass
+class NamespaceStats:
+    ttl: float = 0.0
+    tags: Tuple[str, ...] = ()
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # Requests, die auf eine laufende Berechnung gewartet haben
+    invalidations: int = 0
+    expirations: int = 0
+    served_age_total: float = 0.0
+    served_age_max: float = 0.0
+
+    def snapshot(self, entries: int, oldest_age: float) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        served = self.hits + self.coalesced
+        return {
+            "ttl_s": self.ttl,
+            "tags": list(self.tags),
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            # Staleness: wie alt waren ausgelieferte Treffer?
+            "served_age_avg_s": round(self.served_age_total / served, 3) if served else 0.0,
+            "served_age_max_s": round(self.served_age_max, 3),
+            "oldest_entry_age_s": round(oldest_age, 3),
+        }
+
+
+class TTLCache:
+    """
+    Prozesslokaler Cache: Key → Wert mit Ablaufzeit und Tags (= Tabellennamen).
+    Ein Commit, der eine Tabelle schreibt, wirft alle Einträge mit diesem Tag weg (app/core/changes.py).
+    Andere Worker erfahren davon nichts → dort begrenzt die TTL die Staleness.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, CacheEntry] = {}
+        self._stats: Dict[str, NamespaceStats] = {}
+        # Generation pro Tag: Berechnungen, die vor einer Invalidierung gestartet sind, werden nicht gespeichert
+        self._generations: Dict[str, int] = {}
+
+    # ---------- Registrierung / Statistik ----------
+    def register(self, namespace: str, ttl: float, tags: Iterable[str]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(namespace, NamespaceStats())
+            stats.ttl, stats.tags = ttl, tuple(sorted(tags))
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in sorted(tags))
+
+    # ---------- Lesen / Schreiben ----------
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        namespace = key[0]
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.setdefault(namespace, NamespaceStats())
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                stats.expirations += 1
+                entry = None
+            if entry is None:
+                stats.misses += 1
+                return False, None
+            stats.hits += 1
+            self._record_age(stats, now - entry.stored_at)
+            return True, entry.value
+
+    def set(self, key: Tuple, value: Any, ttl: float, tags: Iterable[str], generation: Tuple[int, ...]) -> bool:
+        tags = frozenset(tags)
+        now = time.monotonic()
+        with self._lock:
+            if tuple(self._generations.get(t, 0) for t in sorted(tags)) != generation:
+                return False  # zwischendurch invalidiert → Ergebnis evtl. schon veraltet
+            if len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[key] = CacheEntry(value, now, now + ttl, tags)
+            return True
+
+    def coalesced(self, namespace: str, age: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(namespace, NamespaceStats())
+            stats.coalesced += 1
+            self._record_age(stats, age)
+
+    @staticmethod
+    def _record_age(stats: NamespaceStats, age: float) -> None:
+        stats.served_age_total += age
+        stats.served_age_max = max(stats.served_age_max, age)
+
+    def _evict(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for k in expired:
+            del self._entries[k]
+        if len(self._entries) >= self.max_entries:
+            # ältesten Eintrag opfern
+            oldest = min(self._entries, key=lambda k: self._entries[k].stored_at)
+            del self._entries[oldest]
+
+    # ---------- Invalidierung ----------
+    def invalidate_tags(self, tags: Set[str]) -> int:
+        with self._lock:
+            for t in tags:
+                self._generations[t] = self._generations.get(t, 0) + 1
+            doomed = [k for k, e in self._entries.items() if e.tags & tags]
+            for k in doomed:
+                del self._entries[k]
+                self._stats.setdefault(k[0], NamespaceStats()).invalidations += 1
+            return len(doomed)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            doomed = [k for k in self._entries if namespace is None or k[0] == namespace]
+            for k in doomed:
+                del self._entries[k]
+            for t in list(self._generations):
+                self._generations[t] += 1
+            return len(doomed)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for stats in self._stats.values():
+                ttl, tags = stats.ttl, stats.tags
+                stats.__dict__.update(NamespaceStats(ttl=ttl, tags=tags).__dict__)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for namespace, stats in sorted(self._stats.items()):
+                entries = [e for k, e in self._entries.items() if k[0] == namespace and e.expires_at > now]
+                oldest = max((now - e.stored_at for e in entries), default=0.0)
+                result[namespace] = stats.snapshot(len(entries), oldest)
+            return result
+
+
+cache = TTLCache()
+
+
+def _invalidate(change: changes.Change) -> None:
+    cache.invalidate_tags(change.tables)
+
+
+changes.subscribe(_invalidate)
+
+
+# ============================================================
+# 🎀 Decorator
+# ============================================================
+def _cache_key(namespace: str, signature: inspect.Signature, args, kwargs) -> Tuple:
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    parts = []
+    for name, value in bound.arguments.items():
+        if name in IGNORED_PARAMS or isinstance(value, (AsyncSession, Request)):
+            continue
+        parts.append((name, value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)))
+    return (namespace, *parts)
+
+
+@dataclass
+class _InFlight:
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    started: float = field(default_factory=time.monotonic)
+
+
+def cached(namespace: str, ttl: float, tags: Iterable[str]):
+    """
+    Decorator: Ergebnis einer async Route/Service-Funktion cachen.
+    Key = Namespace + fachliche Parameter (db/user/request zählen nicht).
+    tags = Tabellen, deren Commit den Eintrag ungültig macht.
+    Gleichzeitige Misses auf denselben Key rechnen nur einmal (Single-Flight).
+
+    @router.get("/overview")
+    @query_budget(1)
+    @cached("dashboard.overview", ttl=30, tags={"employees", "reminders"})
+    async def get_dashboard_overview(db: AsyncSession = Depends(get_async_db)): ...
+    """
+    tags = frozenset(tags)
+    effective_ttl = ttl * CACHE_TTL_FACTOR
+    cache.register(namespace, effective_ttl, tags)
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+        inflight: Dict[Tuple, _InFlight] = {}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED or effective_ttl <= 0:
+                return await func(*args, **kwargs)
+
+            key = _cache_key(namespace, signature, args, kwargs)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+
+            loop = asyncio.get_running_loop()
+            running = inflight.get(key)
+            if running is not None and running.loop is loop:
+                value = await asyncio.shield(running.future)
+                cache.coalesced(namespace, time.monotonic() - running.started)
+                return value
+
+            flight = _InFlight(loop, loop.create_future())
+            inflight[key] = flight
+            generation = cache.generation(tags)
+            try:
+                value = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                flight.future.cancel()
+                raise
+            except Exception as exc:
+                flight.future.set_exception(exc)
+                flight.future.exception()  # als abgerufen markieren, falls niemand wartet
+                raise
+            finally:
+                if inflight.get(key) is flight:
+                    del inflight[key]
+            flight.future.set_result(value)
+            cache.set(key, value, effective_ttl, tags, generation)
+            return value
+
+        wrapper.__cache_namespace__ = namespace
+        return wrapper
+
+    return decorator
@@ -0,0 +1,118 @@
+# app/core/changes.py
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# 🔔 Change-Bus: was hat eine Transaktion geschrieben?
+# ============================================================
+# Abonnenten bekommen nach erfolgreichem Commit ein Change-Objekt (Tabellen + betroffene
+# Business-IDs), z. B. für Cache-Invalidierung oder Live-Updates. Ein Rollback verwirft alles.
+# Commits anderer Worker kommen über app/core/invalidation.py (LISTEN/NOTIFY) auf denselben Bus.
+_INFO_KEY = "pending_change"
+
+
+@dataclass
+class Change:
+    tables: Set[str] = field(default_factory=set)
+    # Business-IDs (employee_id) der geschriebenen Zeilen; None = unbekannt (Bulk-UPDATE/DELETE)
+    employee_ids: Optional[Set[str]] = field(default_factory=set)
+    # None = Commit in diesem Worker; sonst Worker-ID des Absenders (app/core/invalidation.py)
+    origin: Optional[str] = None
+
+    def merge(self, other: "Change") -> None:
+        self.tables |= other.tables
+        if self.employee_ids is None or other.employee_ids is None:
+            self.employee_ids = None
+        else:
+            self.employee_ids |= other.employee_ids
+
+
+_subscribers: List[Callable[[Change], None]] = []
+_lock = threading.Lock()
+
+
+def subscribe(fn: Callable[[Change], None]) -> None:
+    with _lock:
+        if fn not in _subscribers:
+            _subscribers.append(fn)
+
+
+def unsubscribe(fn: Callable[[Change], None]) -> None:
+    with _lock:
+        if fn in _subscribers:
+            _subscribers.remove(fn)
+
+
+def publish(change: Change) -> None:
+    """Meldet eine Änderung an alle Abonnenten (Fehler eines Abonnenten stoppen die anderen nicht)."""
+    if not change.tables:
+        return
+    with _lock:
+        subscribers = list(_subscribers)
+    for fn in subscribers:
+        try:
+            fn(change)
+        except Exception:
+            logger.exception("change subscriber %r failed", fn)
+
+
+def _pending(session: Session) -> Change:
+    return session.info.setdefault(_INFO_KEY, Change())
+
+
+def _employee_ids(obj) -> Set[str]:
+    """Business-ID der Zeile; wurde sie geändert, auch die vorherige (Caches kennen noch die alte)."""
+    state = inspect(obj)
+    if "employee_id" not in state.attrs:
+        return set()
+    # after_flush sieht noch die History vor dem Flush
+    return {e for e in (obj.employee_id, *state.attrs.employee_id.history.deleted) if e}
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    written = [*session.new, *session.deleted]
+    written += [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    if not written:
+        return
+    change = Change(
+        tables={obj.__table__.name for obj in written},
+        employee_ids=set().union(*(_employee_ids(obj) for obj in written)),
+    )
+    _pending(session).merge(change)
+
+
+def _do_orm_execute(state) -> None:
+    # session.execute(update(...)/delete(...)/insert(...)) läuft am Flush vorbei → Zeilen unbekannt
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _pending(state.session).merge(Change(tables={table.name}, employee_ids=None))
+
+
+def _after_commit(session: Session) -> None:
+    change = session.info.pop(_INFO_KEY, None)
+    if change is not None:
+        publish(change)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+def track_changes(session_class=Session) -> None:
+    """Hängt die Erfassung an eine Session-Klasse (Default: alle Sessions)."""
+    if event.contains(session_class, "after_commit", _after_commit):
+        return
+    event.listen(session_class, "after_flush", _after_flush)
+    event.listen(session_class, "do_orm_execute", _do_orm_execute)
+    event.listen(session_class, "after_commit", _after_commit)
+    event.listen(session_class, "after_rollback", _after_rollback)
@@ -0,0 +1,273 @@
+# app/core/conditional.py
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import changes
+from app.core.sql_metrics import untracked
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+CONDITIONAL_GET_ENABLED = os.getenv("CONDITIONAL_GET", "1") == "1"
+# wie lange ein Worker seine Kopie der Versions-Sequenzen nutzt, bevor er neu lädt
+# (= max. Verzögerung, bis Commits ANDERER Worker den ETag ändern)
+WATERMARK_TTL_S = float(os.getenv("WATERMARK_TTL_S", "2"))
+# Header, nach denen sich Antworten unterscheiden (User-spezifische Filter / Rollen)
+VARY_HEADERS = ("authorization", "x-test-user")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("conditional_get", default=None)
+
+
+# ============================================================
+# 🔖 Wasserstände (Sequenzen table_version_<tabelle>, von Triggern per nextval() hochgezählt)
+# ============================================================
+_SEQUENCE_PREFIX = "table_version_"
+
+
+async def load_versions(db: AsyncSession) -> Dict[str, int]:
+    """
+    {table: version} – eine Query auf pg_sequences, egal wie groß die Daten sind.
+    Noch nie hochgezählt (last_value NULL) oder Sequenz fehlt (Schema per create_all) → 0.
+    """
+    rows = await db.execute(
+        text("SELECT sequencename, coalesce(last_value, 0) FROM pg_sequences WHERE sequencename LIKE :prefix"),
+        {"prefix": f"{_SEQUENCE_PREFIX}%"},
+    )
+    return {name.removeprefix(_SEQUENCE_PREFIX): version for name, version in rows.all()}
+
+
+class Watermarks:
+    """
+    Prozesslokale Kopie der Versions-Sequenzen.
+    - eigene Commits und die anderer Worker (Change-Bus bzw. app/core/invalidation.py) zählen sofort
+      einen lokalen Zähler hoch → kein DB-Roundtrip
+    - Schreibzugriffe an der App vorbei (psql, Cronjobs, Bus ausgefallen) sieht man spätestens nach
+      ttl Sekunden (Neuladen, eine Query)
+    Token pro Tabelle = (DB-Version, lokaler Zähler); beide steigen nur → ETag ändert sich bei jeder Änderung.
+    nextval() ist nicht transaktional (schon vor dem Commit sichtbar) – für App-Commits schließt der
+    lokale Zähler diese Lücke, weil er erst nach dem Commit steigt.
+    Sequenzen kennen keinen Zeitpunkt → changed_at = wann dieser Worker die Version zuerst gesehen hat
+    (nie früher als die Änderung selbst, Last-Modified bleibt also konservativ).
+    """
+
+    def __init__(self, ttl: float = WATERMARK_TTL_S):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db: Dict[str, Tuple[int, datetime]] = {}
+        self._loaded_at = float("-inf")
+        self._local: Dict[str, int] = {}
+        self._local_at: Dict[str, datetime] = {}
+        self.reloads = 0
+
+    def bump(self, tables: Iterable[str]) -> None:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for t in tables:
+                self._local[t] = self._local.get(t, 0) + 1
+                self._local_at[t] = now
+
+    async def get(self, db: AsyncSession, tables: Iterable[str]) -> Dict[str, Tuple[Tuple[int, int], datetime]]:
+        tables = sorted(tables)
+        # reload() holt alle Sequenzen; Tabellen ohne Sequenz bleiben bei 0 (kein Neuladen pro Request)
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            await self.reload(db)
+        with self._lock:
+            result = {}
+            for t in tables:
+                version, changed_at = self._db.get(t, (0, _EPOCH))
+                local_at = self._local_at.get(t, _EPOCH)
+                result[t] = ((version, self._local.get(t, 0)), max(changed_at, local_at))
+            return result
+
+    async def reload(self, db: AsyncSession) -> None:
+        # gehört nicht zur Route → zählt nicht fürs Query-Budget
+        with untracked():
+            versions = await load_versions(db)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for table, version in versions.items():
+                seen = self._db.get(table)
+                if seen is None or seen[0] != version:
+                    self._db[table] = (version, now)
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db, self._loaded_at = {}, float("-inf")
+
+
+watermarks = Watermarks()
+
+
+def _bump(change: changes.Change) -> None:
+    watermarks.bump(change.tables)
+
+
+changes.subscribe(_bump)
+
+
+def _user_scope(request: Request) -> str:
+    return "|".join(request.headers.get(h, "") for h in VARY_HEADERS)
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # schwacher Vergleich: W/-Präfix ignorieren
+    wanted = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in wanted
+
+
+def _not_modified_since(request: Request, last_modified: datetime) -> bool:
+    if request.headers.get("if-none-match"):
+        return False  # If-None-Match hat Vorrang (RFC 9110)
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+async def _call(func: Callable, *args, **kwargs):
+    result = func(*args, **kwargs)
+    return await result if inspect.isawaitable(result) else result
+
+
+# ============================================================
+# 🎀 Decorators
+# ============================================================
+def conditional(tables: Iterable[str], time_bucket: int = 0):
+    """
+    Decorator: ETag / Last-Modified aus den Wasserständen der Tabellen.
+    Passt If-None-Match (bzw. If-Modified-Since) → 304, ohne die eigentliche Query und ohne Serialisierung.
+    time_bucket (Sekunden) für zeitabhängige Antworten (überfällig, „heute“): ETag wechselt spätestens dann.
+    Muss oberhalb von @query_budget / @cached stehen (unterhalb von @require_roles):
+
+    @router.get("/overview")
+    @conditional(OVERVIEW_TABLES, time_bucket=60)
+    @query_budget(1)
+    async def get_dashboard_overview(db: AsyncSession = Depends(get_async_db)): ...
+    """
+    tables = frozenset(tables)
+
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            state = _current.get()
+            if not CONDITIONAL_GET_ENABLED or state is None:
+                return await _call(func, *args, **kwargs)
+
+            request: Request = state["request"]
+            db = kwargs.get("db")
+            if isinstance(db, AsyncSession):
+                versions = await watermarks.get(db, tables)
+            else:
+                from app.database import AsyncSessionLocal
+                async with AsyncSessionLocal() as own:
+                    versions = await watermarks.get(own, tables)
+
+            last_modified = max(changed_at for _, changed_at in versions.values())
+            bucket = None
+            if time_bucket:
+                bucket = int(time.time() // time_bucket)
+                last_modified = max(last_modified, datetime.fromtimestamp(bucket * time_bucket, timezone.utc))
+
+            etag = make_etag(
+                str(request.url.path), str(request.url.query), _user_scope(request),
+                sorted((t, v) for t, (v, _) in versions.items()), bucket,
+            )
+            headers = {
+                "ETag": etag,
+                "Last-Modified": format_datetime(last_modified.astimezone(timezone.utc), usegmt=True),
+                "Cache-Control": "private, no-cache",
+                "Vary": "Authorization, X-Test-User",
+            }
+            if _etag_matches(request, etag) or _not_modified_since(request, last_modified):
+                return _not_modified(headers)
+            state["headers"].update(headers)
+            return await _call(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def static_cache(max_age: int = 86400):
+    """
+    Decorator für (fast) statische Listen: lange Cache-Lebensdauer + Inhalts-ETag.
+    Ändert sich der Inhalt (Deploy), ändert sich der ETag → Revalidierung liefert die neue Liste.
+    """
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            value = await _call(func, *args, **kwargs)
+            state = _current.get()
+            if not CONDITIONAL_GET_ENABLED or state is None:
+                return value
+
+            etag = make_etag(jsonable_encoder(value))
+            headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+            if _etag_matches(state["request"], etag):
+                return _not_modified(headers)
+            state["headers"].update(headers)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+# ============================================================
+# 🧱 Middleware (setzt die Header auf die 200-Antwort)
+# ============================================================
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD"):
+            return await call_next(request)
+
+        state: Dict[str, Any] = {"request": request, "headers": {}}
+        token = _current.set(state)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+
+        if response.status_code == 200:
+            for key, value in state["headers"].items():
+                response.headers.setdefault(key, value)
+        return response
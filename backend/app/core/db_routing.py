@@ -0,0 +1,73 @@
+# app/core/db_routing.py
+from __future__ import annotations
+
+import math
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+# Nach einem Schreibzugriff liest derselbe Client so lange von der Primary (Read-your-writes)
+REPLICA_RYW_SECONDS = float(os.getenv("REPLICA_RYW_SECONDS", "5"))
+# Zeitpunkt des letzten Schreibzugriffs reist mit dem Client: Header (UI, per CORS freigegeben) bzw. Cookie
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "wm_last_write"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# True → RoutingSession darf reine Lesezugriffe an die Replica geben
+use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+
+# ============================================================
+# 🧭 Read-your-writes über den Client statt pro Worker
+# ============================================================
+# Ein Fenster im Worker-Speicher hilft nicht, sobald der folgende GET bei einem anderen Worker
+# (gunicorn -w N, mehrere Container) landet → der Client bringt den Zeitstempel selbst mit.
+def last_write(request: Request) -> Optional[float]:
+    """Unix-Zeit des letzten Schreibzugriffs (Header vor Cookie); fehlt/ungültig → None."""
+    raw = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def wrote_recently(request: Request) -> bool:
+    # Zukunftswerte (Uhrenabweichung, Manipulation) zählen als „gerade geschrieben“ → nur mehr Primary-Reads
+    stamp = last_write(request)
+    return stamp is not None and time.time() - stamp < REPLICA_RYW_SECONDS
+
+
+# ============================================================
+# 🧱 Middleware
+# ============================================================
+class ReplicaRoutingMiddleware(BaseHTTPMiddleware):
+    """
+    Lesende Requests (GET/HEAD) → Replica, außer der Client hat gerade geschrieben.
+    Schreibende Statements landen unabhängig davon immer auf der Primary (RoutingSession).
+    """
+    async def dispatch(self, request: Request, call_next):
+        read_only = request.method in SAFE_METHODS and not wrote_recently(request)
+
+        token = use_replica.set(read_only)
+        try:
+            response = await call_next(request)
+        finally:
+            use_replica.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            stamp = f"{time.time():.3f}"
+            response.headers[LAST_WRITE_HEADER] = stamp
+            response.set_cookie(
+                LAST_WRITE_COOKIE, stamp,
+                max_age=math.ceil(REPLICA_RYW_SECONDS),
+                httponly=True, samesite="lax", secure=request.url.scheme == "https",
+            )
+        return response
@@ -0,0 +1,114 @@
+# app/core/identity.py
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.core import changes
+from app.core.token_cache import TokenCache
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+IDENTITY_CACHE_ENABLED = os.getenv("IDENTITY_CACHE", "1") == "1"
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "5000"))
+IDENTITY_CACHE_TTL_S = float(os.getenv("IDENTITY_CACHE_TTL_S", "900"))
+
+
+# ============================================================
+# 🧩 Rolle aus der Abteilung ableiten
+# ============================================================
+def derive_role(department: Optional[str]) -> str:
+    dept = (department or "").lower()
+    if dept in ("backoffice", "hr"):
+        return "hr"
+    if dept == "management":
+        return "management"
+    if dept == "support":
+        return "support"
+    if dept in ("facility", "security"):
+        return "admin"
+    return "employee"
+
+
+# ============================================================
+# 🧭 Token-Claims → Employee (ein Statement, nur Index-Zugriffe)
+# ============================================================
+def identity_statement(email: Optional[str], username: Optional[str]):
+    """
+    E-Mail hat Vorrang, danach Name bzw. Business-ID = preferred_username – alles case-insensitiv
+    über die lower(...)-Indizes (ix_employees_*_lower), ohne führendes Wildcard.
+    """
+    Employee = models.Employee
+    email_match = func.lower(Employee.email) == (email or "").lower()
+    username_match = or_(
+        func.lower(Employee.name) == (username or "").lower(),
+        func.lower(Employee.employee_id) == (username or "").lower(),
+    )
+    conditions = []
+    if email:
+        conditions.append(email_match)
+    if username:
+        conditions.append(username_match)
+    return (
+        select(Employee.name, Employee.email, Employee.employee_id, Employee.department)
+        .where(or_(*conditions))
+        .order_by(case((email_match, 0), else_=1), Employee.employee_id)
+        .limit(1)
+    )
+
+
+def cache_key(claims: Dict[str, Any]) -> Optional[str]:
+    if claims.get("sub"):
+        return f"sub:{claims['sub']}"
+    email, username = claims.get("email"), claims.get("preferred_username")
+    if email or username:
+        return f"email:{(email or '').lower()}|user:{(username or '').lower()}"
+    return None
+
+
+# ============================================================
+# 🗂️ Per-Worker-Cache: sub → Identität (employee_id, Rolle, …)
+# ============================================================
+# Neuer Token (Refresh alle paar Minuten) → Signatur prüfen ja, Employee-Query nein
+identity_cache = TokenCache(max_entries=IDENTITY_CACHE_MAX_ENTRIES, max_ttl=IDENTITY_CACHE_TTL_S)
+
+
+def _invalidate(change: changes.Change) -> None:
+    if "employees" in change.tables:
+        identity_cache.invalidate_employees(change.employee_ids)
+
+
+changes.subscribe(_invalidate)
+
+
+async def resolve_identity(db: AsyncSession, claims: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """User-Dict (wie get_current_user es liefert) oder None, wenn kein Employee passt."""
+    key = cache_key(claims)
+    if key is None:
+        return None
+    if IDENTITY_CACHE_ENABLED:
+        cached = identity_cache.get(key)
+        if cached is not None:
+            return cached
+
+    generation = identity_cache.generation
+    row = (await db.execute(identity_statement(claims.get("email"), claims.get("preferred_username")))).first()
+    if row is None:
+        return None
+
+    dept = (row.department or "").lower()
+    identity = {
+        "preferred_username": row.name,
+        "email": row.email,
+        "employee_id": row.employee_id,
+        "department": dept,
+        "role": derive_role(dept),
+    }
+    if IDENTITY_CACHE_ENABLED:
+        identity_cache.set(key, identity, None, generation)
+    return identity
@@ -0,0 +1,209 @@
+# app/core/invalidation.py
+"""
+Invalidierungs-Bus über Postgres LISTEN/NOTIFY.
+
+Jeder Worker hat In-Process-Caches (Response-Cache, Token/Identität, ETag-Wasserstände, SSE-Stand).
+Ohne Bus erfahren nur die Caches des schreibenden Workers von einem Commit; die anderen Worker
+(gunicorn -w 2, mehrere Container) liefern bis zum TTL-Ablauf alte Daten.
+
+Ablauf:
+    lokaler Commit → changes.publish(Change) → Bus sendet NOTIFY workmate_invalidation '{…}'
+    anderer Worker  → LISTEN-Verbindung empfängt → changes.publish(Change(origin=…)) → Caches räumen auf
+
+Eigene Nachrichten werden am origin erkannt und ignoriert. Nach einem Verbindungsabbruch können
+Nachrichten fehlen → der Worker verwirft dann einmal alles (Resync).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.core import changes
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+INVALIDATION_BUS_ENABLED = os.getenv("INVALIDATION_BUS", "1") == "1"
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "workmate_invalidation")
+# NOTIFY-Payload ist auf 8000 Bytes begrenzt → zu viele IDs = "unbekannt" (alles der Tabelle)
+MAX_PAYLOAD_BYTES = 7000
+RECONNECT_MAX_S = 30.0
+
+
+def to_libpq_dsn(url: str) -> str:
+    """SQLAlchemy-URL (postgresql+psycopg://…) → libpq-DSN für eine eigene psycopg-Verbindung."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def encode(change: changes.Change, origin: str) -> str:
+    ids = None if change.employee_ids is None else sorted(change.employee_ids)
+    payload = json.dumps({"origin": origin, "tables": sorted(change.tables), "employee_ids": ids})
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps({"origin": origin, "tables": sorted(change.tables), "employee_ids": None})
+    return payload
+
+
+def decode(payload: str) -> changes.Change:
+    data = json.loads(payload)
+    ids = data.get("employee_ids")
+    return changes.Change(
+        tables=set(data.get("tables") or ()),
+        employee_ids=None if ids is None else set(ids),
+        origin=data.get("origin") or "unknown",
+    )
+
+
+@dataclass
+class BusStats:
+    sent: int = 0
+    received: int = 0
+    ignored_own: int = 0
+    send_failures: int = 0
+    reconnects: int = 0
+    resyncs: int = 0
+
+
+# ============================================================
+# 📮 Bus (ein Objekt pro Worker, gebunden an dessen Event-Loop)
+# ============================================================
+class InvalidationBus:
+    def __init__(self, dsn: Optional[str] = None, channel: str = INVALIDATION_CHANNEL, worker_id: Optional[str] = None):
+        self._dsn = dsn
+        self.channel = channel
+        self.worker_id = worker_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._send_conn: Optional[psycopg.AsyncConnection] = None
+        self.listening = asyncio.Event()
+        self.stats = BusStats()
+
+    @property
+    def dsn(self) -> str:
+        if self._dsn is None:
+            from app.database import ASYNC_DATABASE_URL
+            self._dsn = to_libpq_dsn(ASYNC_DATABASE_URL)
+        return self._dsn
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    # ---------- Lebenszyklus ----------
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self.listening = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._listen()), asyncio.ensure_future(self._send())]
+        changes.subscribe(self._on_change)
+
+    async def stop(self) -> None:
+        changes.unsubscribe(self._on_change)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._loop = [], None
+        if self._send_conn is not None:
+            await self._send_conn.close()
+            self._send_conn = None
+
+    # ---------- Senden (lokale Commits) ----------
+    def _on_change(self, change: changes.Change) -> None:
+        loop = self._loop
+        if change.origin is not None or loop is None or loop.is_closed():
+            return  # fremde Änderungen nicht zurückspiegeln
+        copy = changes.Change(set(change.tables), None if change.employee_ids is None else set(change.employee_ids))
+        try:
+            loop.call_soon_threadsafe(self._queue.put_nowait, copy)
+        except RuntimeError:
+            pass  # Loop wird gerade beendet
+
+    async def _send(self) -> None:
+        while True:
+            change = await self._queue.get()
+            # was inzwischen aufgelaufen ist, in einer Nachricht zusammenfassen
+            while not self._queue.empty():
+                change.merge(self._queue.get_nowait())
+            await self._notify(encode(change, self.worker_id))
+
+    async def _notify(self, payload: str) -> None:
+        for attempt in (1, 2):
+            try:
+                if self._send_conn is None or self._send_conn.closed:
+                    self._send_conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+                await self._send_conn.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                self.stats.sent += 1
+                return
+            except psycopg.Error as e:
+                self._send_conn = None
+                if attempt == 2:
+                    # andere Worker merken es spätestens über ihre TTLs
+                    self.stats.send_failures += 1
+                    logger.warning("invalidation NOTIFY failed: %s", e)
+
+    # ---------- Empfangen (Commits anderer Worker) ----------
+    async def _listen(self) -> None:
+        backoff, connected_before = 1.0, False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(f'LISTEN "{self.channel}"')
+                    if connected_before:
+                        self._resync()
+                    connected_before, backoff = True, 1.0
+                    self.listening.set()
+                    async for notify in conn.notifies():
+                        self.receive(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.listening.clear()
+                self.stats.reconnects += 1
+                logger.warning("invalidation LISTEN lost (%s) – reconnect in %.0fs", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_S)
+
+    def receive(self, payload: str) -> None:
+        try:
+            change = decode(payload)
+        except (ValueError, TypeError):
+            logger.warning("ignoring malformed invalidation payload: %.200s", payload)
+            return
+        if change.origin == self.worker_id:
+            self.stats.ignored_own += 1
+            return
+        self.stats.received += 1
+        changes.publish(change)
+
+    def _resync(self) -> None:
+        # während der Unterbrechung verpasste Nachrichten → alles als geändert melden
+        from app.database import Base
+
+        self.stats.resyncs += 1
+        changes.publish(changes.Change(set(Base.metadata.tables), None, origin="resync"))
+
+    # ---------- Monitoring ----------
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": INVALIDATION_BUS_ENABLED,
+            "running": self.running,
+            "listening": self.listening.is_set(),
+            "worker_id": self.worker_id,
+            "channel": self.channel,
+            **self.stats.__dict__,
+        }
+
+
+bus = InvalidationBus()
@@ -0,0 +1,203 @@
+# app/core/jwks.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+JWKS_TTL_S = float(os.getenv("JWKS_TTL_S", "3600"))
+# Mindestabstand zwischen zwei Nachlade-Versuchen (unbekannte kid / Keycloak down) –
+# sonst löst jeder Token mit erfundener kid einen Request an Keycloak aus
+JWKS_MIN_REFRESH_S = float(os.getenv("JWKS_MIN_REFRESH_S", "30"))
+JWKS_TIMEOUT_S = float(os.getenv("JWKS_TIMEOUT_S", "5"))
+JWKS_CONNECT_TIMEOUT_S = float(os.getenv("JWKS_CONNECT_TIMEOUT_S", "2"))
+
+
+class JWKSUnavailable(Exception):
+    """Keine Schlüssel vorhanden und Keycloak nicht erreichbar."""
+
+
+@dataclass
+class JWKSStats:
+    hits: int = 0
+    misses: int = 0  # kid nicht im Store
+    stale_served: int = 0  # Treffer nach Ablauf der TTL (Nachladen läuft im Hintergrund)
+    refreshes: Dict[str, int] = field(default_factory=dict)  # Grund → Anzahl (startup / cold / ttl / kid)
+    coalesced: int = 0  # auf ein bereits laufendes Nachladen gewartet
+    rate_limited: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+# ============================================================
+# 🔑 Key-Store: JWKS einmal parsen, bei Bedarf nachladen
+# ============================================================
+class JWKSKeyStore:
+    """
+    Öffentliche Schlüssel aus dem JWKS-Endpunkt, fertig geparst (kid → Key-Objekt).
+    - Laden per httpx.AsyncClient (Keep-Alive, Timeouts) → blockiert den Event-Loop nie
+    - nach ttl Sekunden: alte Schlüssel weiter ausliefern, im Hintergrund nachladen (stale-while-revalidate)
+    - unbekannte kid → sofort nachladen (höchstens alle min_refresh_interval Sekunden)
+    - gleichzeitige Nachlade-Wünsche → ein HTTP-Request (Single-Flight)
+    - schlägt das Nachladen fehl, bleiben die alten Schlüssel gültig
+    Nur Requests ohne passenden Schlüssel warten auf Keycloak, alle anderen laufen weiter.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        ttl: float = JWKS_TTL_S,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_S,
+        fetch: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+    ):
+        self.uri = uri
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._fetch = fetch or self._http_fetch
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = float("-inf")
+        self._last_attempt = float("-inf")
+        self._inflight: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = JWKSStats()
+
+    # ---------- HTTP ----------
+    def _http_client(self) -> httpx.AsyncClient:
+        # ein Client pro Event-Loop (Worker); Verbindung zu Keycloak bleibt offen
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(JWKS_TIMEOUT_S, connect=JWKS_CONNECT_TIMEOUT_S),
+                limits=httpx.Limits(max_connections=2, max_keepalive_connections=1),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _http_fetch(self) -> Dict[str, Any]:
+        res = await self._http_client().get(self.uri)
+        res.raise_for_status()
+        return res.json()
+
+    async def aclose(self) -> None:
+        client, loop = self._client, self._client_loop
+        self._client = self._client_loop = None
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    @staticmethod
+    def parse(jwks: Dict[str, Any]) -> Dict[str, Any]:
+        """kid → Public Key; Verschlüsselungs-Keys (use=enc) und unbrauchbare Einträge fallen raus."""
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("use", "sig") != "sig" or not jwk.get("kid"):
+                continue
+            try:
+                keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+            except jwt.PyJWKError as e:
+                logger.warning("skipping JWKS key %s: %s", jwk.get("kid"), e)
+        return keys
+
+    # ---------- Lesen ----------
+    async def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        """Key zur kid oder None (auch nach dem Nachladen unbekannt)."""
+        key = self._keys.get(kid) if kid else None
+        if key is not None:
+            self.stats.hits += 1
+            if time.monotonic() - self._fetched_at >= self.ttl:
+                self.stats.stale_served += 1
+                self._revalidate()
+            return key
+
+        self.stats.misses += 1
+        if kid and await self.refresh("kid" if self._keys else "cold"):
+            return self._keys.get(kid)
+        return None
+
+    # ---------- Nachladen ----------
+    def _running(self) -> Optional[asyncio.Task]:
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _start(self, reason: str) -> asyncio.Task:
+        self._last_attempt = time.monotonic()
+        task = asyncio.get_running_loop().create_task(self._load(reason))
+        # Fehler abholen, auch wenn alle Wartenden abgebrochen wurden
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight = task
+        return task
+
+    def _revalidate(self) -> None:
+        """TTL abgelaufen → im Hintergrund nachladen, der Request wartet nicht."""
+        if self._running() is None and time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            self._start("ttl")
+
+    async def refresh(self, reason: str) -> bool:
+        """True = Schlüssel sind jetzt frisch (selbst oder von einem parallelen Request geladen)."""
+        task = self._running()
+        if task is not None:
+            self.stats.coalesced += 1
+        elif self._keys and time.monotonic() - self._last_attempt < self.min_refresh_interval:
+            self.stats.rate_limited += 1
+            return False
+        else:
+            task = self._start(reason)
+        # shield: bricht ein wartender Request ab, läuft das Laden für die anderen weiter
+        return await asyncio.shield(task)
+
+    async def _load(self, reason: str) -> bool:
+        try:
+            keys = self.parse(await self._fetch())
+        except Exception as e:
+            self.stats.failures += 1
+            self.stats.last_error = f"{type(e).__name__}: {e}"
+            if not self._keys:
+                raise JWKSUnavailable(self.stats.last_error) from e
+            logger.warning("JWKS refresh (%s) failed, keeping %d cached keys: %s", reason, len(self._keys), e)
+            return False
+
+        self._keys, self._fetched_at = keys, time.monotonic()
+        self.stats.refreshes[reason] = self.stats.refreshes.get(reason, 0) + 1
+        return True
+
+    async def prewarm(self, reason: str = "startup") -> bool:
+        """Beim Start laden – ein nicht erreichbares Keycloak soll den Start aber nicht verhindern."""
+        try:
+            return await self.refresh(reason)
+        except JWKSUnavailable as e:
+            logger.warning("JWKS prewarm failed (%s): %s", self.uri, e)
+            return False
+
+    # ---------- Monitoring ----------
+    def snapshot(self) -> Dict[str, Any]:
+        age = time.monotonic() - self._fetched_at
+        return {
+            "uri": self.uri,
+            "kids": sorted(self._keys),
+            "age_s": round(age, 3) if self._keys else None,
+            "ttl_s": self.ttl,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "stale_served": self.stats.stale_served,
+            "refreshes": dict(self.stats.refreshes),
+            "coalesced": self.stats.coalesced,
+            "rate_limited": self.stats.rate_limited,
+            "failures": self.stats.failures,
+            "last_error": self.stats.last_error,
+        }
+
+    def reset_stats(self) -> None:
+        self.stats = JWKSStats()
@@ -0,0 +1,151 @@
+# app/core/query_budget.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.core.sql_metrics import (
+    RequestSQLStats,
+    add_statement_listener,
+    remove_statement_listener,
+    route_key,
+    statement_shape,
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+# off   → keine Prüfung
+# log   → Verstöße als Warning loggen (Staging)
+# raise → Request mit 500 beantworten (Tests / CI)
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log").lower()
+# Budget für Routen ohne @query_budget (0 = unbegrenzt)
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "0"))
+# Ab so vielen identischen Statement-Shapes pro Request → N+1-Verdacht
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Endpoint hat sein Query-Budget überschritten oder zeigt ein N+1-Muster."""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: int
+    max_repeats: int = QUERY_REPEAT_THRESHOLD
+
+
+def query_budget(max_queries: int, max_repeats: int = QUERY_REPEAT_THRESHOLD):
+    """
+    Decorator: legt das Query-Budget einer Route fest.
+    Muss unterhalb von @router.get(...) stehen, z. B.:
+
+    @router.get("/overview")
+    @query_budget(2)
+    async def get_dashboard_overview(...): ...
+    """
+    budget = QueryBudget(max_queries=max_queries, max_repeats=max_repeats)
+
+    def decorator(func: Callable):
+        func.__query_budget__ = budget  # functools.wraps (require_roles) kopiert das Attribut mit
+        return func
+
+    return decorator
+
+
+def budget_for(endpoint: Optional[Callable]) -> Optional[QueryBudget]:
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is None and QUERY_BUDGET_DEFAULT > 0:
+        budget = QueryBudget(max_queries=QUERY_BUDGET_DEFAULT)
+    return budget
+
+
+def find_violations(count: int, shapes: Counter, budget: Optional[QueryBudget]) -> List[str]:
+    """Liefert lesbare Verstöße (leer = alles im Budget)."""
+    violations = []
+    if budget is not None and count > budget.max_queries:
+        violations.append(f"{count} queries > budget {budget.max_queries}")
+
+    max_repeats = budget.max_repeats if budget is not None else QUERY_REPEAT_THRESHOLD
+    for shape, n in shapes.most_common():
+        if n < max_repeats:
+            break
+        violations.append(f"N+1 suspect: {n}x {shape[:200]}")
+    return violations
+
+
+# ============================================================
+# 🧱 Middleware (benötigt SQLMetricsMiddleware weiter außen)
+# ============================================================
+class QueryBudgetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if QUERY_BUDGET_MODE == "off":
+            return response
+
+        stats: Optional[RequestSQLStats] = getattr(request.state, "sql_stats", None)
+        if stats is None:
+            return response
+
+        violations = find_violations(stats.count, stats.shapes, budget_for(request.scope.get("endpoint")))
+        if not violations:
+            return response
+
+        route = route_key(request)
+        if QUERY_BUDGET_MODE == "raise":
+            logger.error("🚨 query budget violated on %s: %s", route, violations)
+            return JSONResponse(
+                status_code=500,
+                content={"detail": "Query budget exceeded", "route": route, "violations": violations},
+            )
+        logger.warning("⚠️ query budget violated on %s: %s", route, violations)
+        return response
+
+
+# ============================================================
+# 🧪 Test-Helfer
+# ============================================================
+@dataclass
+class QueryCapture:
+    """Sammelt alle Statements (prozessweit) – auch aus dem TestClient-Thread."""
+    statements: List[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _record(self, statement: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def shapes(self) -> Counter:
+        return Counter(statement_shape(s) for s in self.statements)
+
+    def assert_max(self, max_queries: int, max_repeats: int = QUERY_REPEAT_THRESHOLD) -> None:
+        violations = find_violations(self.count, self.shapes, QueryBudget(max_queries, max_repeats))
+        if violations:
+            raise QueryBudgetExceeded("; ".join(violations) + "\n" + "\n---\n".join(self.statements))
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryCapture]:
+    """with capture_queries() as q: client.get(...); q.assert_max(2)"""
+    capture = QueryCapture()
+    add_statement_listener(capture._record)
+    try:
+        yield capture
+    finally:
+        remove_statement_listener(capture._record)
@@ -3,10 +3,11 @@ from typing import Union, List, Callable
 from fastapi import Depends, HTTPException, status, Request
 from functools import wraps
 import inspect, uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.core.auth import get_current_user
-from app.database import get_db, SessionLocal
+from app.core.audit import AUDIT_ASYNC, _normalize_action, audit_writer, split_resource
+from app.database import AsyncSessionLocal
 from app.models import AuditLog
 
 # 🔁 Rollen-Aliases
@@ -23,6 +24,20 @@ def normalize_role(role: str) -> str:
     return ROLE_ALIASES.get(role.lower(), role.lower())
 
 
+async def _write_denied(db, entry: dict) -> None:
+    """access_denied direkt schreiben (ohne Audit-Writer); die Request-Session bleibt offen."""
+    try:
+        if db is not None:
+            db.add(AuditLog(**entry))
+            await db.commit()
+        else:
+            async with AsyncSessionLocal() as own:
+                own.add(AuditLog(**entry))
+                await own.commit()
+    except Exception as e:
+        print(f"[AUDIT] Fehler beim Loggen: {e}")
+
+
 def require_roles(allowed_roles: Union[str, List[str]]):
     """
     Decorator zur Rollenprüfung mit integriertem Audit-Logging.
@@ -66,25 +81,25 @@ def require_roles(allowed_roles: Union[str, List[str]]):
 
             # 🚫 Zugriff verweigert → Audit-Eintrag + HTTP 403
             if not allowed:
-                try:
-                    if not db:
-                        db = SessionLocal()
-                    log = AuditLog(
-                        id=uuid.uuid4(),
-                        user_email=email,
-                        role=",".join(normalized_user_roles) or (normalized_user_role or "none"),
-                        action="ACCESS_DENIED",
-                        resource=request.url.path if request else func.__name__,
-                        details=f"Required: {allowed_normalized} | Actual: {normalized_user_roles or normalized_user_role}",
-                        created_at=datetime.utcnow(),
-                    )
-                    db.add(log)
-                    db.commit()
-                except Exception as e:
-                    print(f"[AUDIT] Fehler beim Loggen: {e}")
-                finally:
-                    if db:
-                        db.close()
+                resource = request.url.path if request else func.__name__
+                resource_type, resource_id = split_resource(resource)
+                entry = dict(
+                    id=uuid.uuid4(),
+                    user_email=(email or "unknown").strip().lower(),
+                    role=",".join(normalized_user_roles) or (normalized_user_role or "none"),
+                    action=_normalize_action("ACCESS_DENIED"),  # wie build_entry: klein → ?action= findet ihn
+                    resource=resource,
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    details={
+                        "required": sorted(allowed_normalized),
+                        "actual": sorted(normalized_user_roles) or normalized_user_role,
+                    },
+                    created_at=datetime.now(timezone.utc),
+                )
+                # Audit-Writer aktiv → kein Roundtrip und keine Extra-Verbindung pro 403
+                if not (AUDIT_ASYNC and audit_writer.submit(entry)):
+                    await _write_denied(db, entry)
 
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
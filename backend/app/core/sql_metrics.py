@@ -0,0 +1,231 @@
+# app/core/sql_metrics.py
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+SQL_METRICS_ENABLED = os.getenv("SQL_METRICS", "1") == "1"
+SQL_METRICS_WINDOW = int(os.getenv("SQL_METRICS_WINDOW", "200"))  # Samples pro Route
+MAX_STATEMENT_LEN = 500
+
+
+# ============================================================
+# 📊 Request-Statistik (lebt in einer ContextVar)
+# ============================================================
+_PARAM_LIST_RE = re.compile(r"\(\s*%\(\w+\)s(?:::[\w ]+)?(?:\s*,\s*%\(\w+\)s(?:::[\w ]+)?)*\s*\)")
+_PARAM_RE = re.compile(r"%\(\w+\)s")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalisiert ein Statement (Parameter, IN-Listen, Zahlen) → gleiche Form = gleicher Shape."""
+    shape = _PARAM_LIST_RE.sub("(?)", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("N", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestSQLStats:
+    """Zählt alle Statements, die während eines Requests ausgeführt werden."""
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_sql: Optional[str] = None
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement[:MAX_STATEMENT_LEN]
+
+
+_current_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("sql_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestSQLStats]:
+    """Statistik des laufenden Requests (oder None außerhalb eines Requests)."""
+    return _current_stats.get()
+
+
+_untracked: ContextVar[bool] = ContextVar("sql_untracked", default=False)
+
+
+@contextmanager
+def untracked():
+    """
+    Statements im Block zählen weder für den Request noch für Listener (Query-Budget, Tests).
+    Nur für Infrastruktur-Lookups, die nicht zur Route gehören (z. B. ETag-Wasserstände).
+    """
+    token = _untracked.set(True)
+    try:
+        yield
+    finally:
+        _untracked.reset(token)
+
+
+# ============================================================
+# 🔌 Engine-Events
+# ============================================================
+_listeners: list = []
+
+
+def add_statement_listener(fn) -> None:
+    """Registriert fn(statement, elapsed_ms) für jedes Statement – prozessweit (z. B. pytest-Fixture)."""
+    _listeners.append(fn)
+
+
+def remove_statement_listener(fn) -> None:
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("sql_metrics_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if _untracked.get():
+        return
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    for fn in list(_listeners):
+        fn(statement, elapsed_ms)
+
+
+def _handle_error(exception_context):
+    # fehlgeschlagenes Statement → Startzeit verwerfen, sonst wächst der Stack
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("sql_metrics_start"):
+        conn.info["sql_metrics_start"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Hängt die Zeitmessung an eine (Sync- oder Async-)Engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+# ============================================================
+# 🧮 Rollierende Zusammenfassung pro Route
+# ============================================================
+class RouteSQLSummary:
+    """Hält die letzten N Requests pro Route (Queries, DB-Zeit, langsamstes Statement)."""
+
+    def __init__(self, window: int = SQL_METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, route: str, stats: RequestSQLStats) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = {
+                    "samples": deque(maxlen=self.window),
+                    "requests": 0,
+                    "slowest_ms": 0.0,
+                    "slowest_sql": None,
+                }
+                self._routes[route] = entry
+            entry["samples"].append((stats.count, stats.total_ms))
+            entry["requests"] += 1
+            if stats.slowest_ms >= entry["slowest_ms"]:
+                entry["slowest_ms"] = stats.slowest_ms
+                entry["slowest_sql"] = stats.slowest_sql
+
+    def snapshot(self) -> list[Dict[str, Any]]:
+        with self._lock:
+            items = [(route, dict(entry, samples=list(entry["samples"]))) for route, entry in self._routes.items()]
+
+        result = []
+        for route, entry in items:
+            samples = entry["samples"]
+            counts = sorted(c for c, _ in samples)
+            times = sorted(t for _, t in samples)
+            n = len(samples)
+            result.append({
+                "route": route,
+                "requests": entry["requests"],
+                "window": n,
+                "queries_avg": round(sum(counts) / n, 2) if n else 0,
+                "queries_max": counts[-1] if n else 0,
+                "db_ms_avg": round(sum(times) / n, 2) if n else 0,
+                "db_ms_p95": round(times[min(n - 1, int(n * 0.95))], 2) if n else 0,
+                "db_ms_total": round(sum(times), 2),
+                "slowest_ms": round(entry["slowest_ms"], 2),
+                "slowest_sql": entry["slowest_sql"],
+            })
+        result.sort(key=lambda r: r["db_ms_total"], reverse=True)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_summary = RouteSQLSummary()
+
+
+def route_key(request: Request) -> str:
+    """'GET /dashboard/employee/{employee_id}' – Pfad-Template statt konkreter URL."""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{request.method} {path}"
+
+
+# ============================================================
+# 🧱 Middleware
+# ============================================================
+class SQLMetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Misst Queries + DB-Zeit pro Request.
+    - Header: Server-Timing, X-DB-Query-Count, X-DB-Time-Ms
+    - Aggregat pro Route → GET /admin/sql-stats (leeren per POST ?reset=true)
+    """
+    async def dispatch(self, request: Request, call_next):
+        if not SQL_METRICS_ENABLED:
+            return await call_next(request)
+
+        stats = RequestSQLStats()
+        request.state.sql_stats = stats
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        route_summary.add(route_key(request), stats)
+
+        response.headers["Server-Timing"] = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+        return response
@@ -0,0 +1,134 @@
+# app/core/token_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core import changes
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE", "1") == "1"
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "2000"))
+# Obergrenze unabhängig vom exp des Tokens (Rollenwechsel anderer Worker, gesperrte Accounts)
+TOKEN_CACHE_MAX_TTL_S = float(os.getenv("TOKEN_CACHE_MAX_TTL_S", "300"))
+
+
+@dataclass
+class _Entry:
+    user: Dict[str, Any]
+    expires_at: float  # time.monotonic()
+
+
+# ============================================================
+# 🎟️ Verifizierte Tokens → aufgelöster User (LRU)
+# ============================================================
+class TokenCache:
+    """
+    Gleicher Bearer-Token → gleicher User, ohne RS256-Prüfung und Employee-Query.
+    Key = SHA-256 des Tokens (kein Klartext-Token im Speicher), gültig bis exp, höchstens max_ttl.
+    Schreibzugriffe auf employees (Change-Bus) werfen die Einträge der betroffenen Personen weg.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, max_ttl: float = TOKEN_CACHE_MAX_TTL_S):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Generation: Prüfungen, die vor einer Invalidierung gestartet sind, werden nicht gespeichert
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry.user)
+
+    def set(self, token: str, user: Dict[str, Any], exp: Optional[float], generation: int) -> bool:
+        ttl = self.max_ttl if exp is None else min(self.max_ttl, float(exp) - time.time())
+        if ttl <= 0:
+            return False
+        with self._lock:
+            if generation != self._generation:
+                return False  # User wurde zwischendurch geändert → Ergebnis evtl. schon veraltet
+            key = self.key(token)
+            self._entries[key] = _Entry(dict(user), time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    # ---------- Invalidierung ----------
+    def invalidate_employees(self, employee_ids: Optional[set]) -> int:
+        """Einträge dieser Business-IDs verwerfen; None = unbekannt → alles."""
+        with self._lock:
+            self._generation += 1
+            if employee_ids is None:
+                doomed = list(self._entries)
+            else:
+                doomed = [k for k, e in self._entries.items() if e.user.get("employee_id") in employee_ids]
+            for k in doomed:
+                del self._entries[k]
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def clear(self) -> int:
+        return self.invalidate_employees(None)
+
+    # ---------- Monitoring ----------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_ttl_s": self.max_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+
+token_cache = TokenCache()
+
+
+def _invalidate(change: changes.Change) -> None:
+    # Abteilung / E-Mail / Name bestimmen Rolle und Zuordnung → jede employees-Änderung zählt
+    if "employees" in change.tables:
+        token_cache.invalidate_employees(change.employee_ids)
+
+
+changes.subscribe(_invalidate)
@@ -1,8 +1,13 @@
-import os 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import os
+from sqlalchemy import create_engine, Delete, Insert, Update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from dotenv import load_dotenv
 
+from app.core.changes import track_changes
+from app.core.db_routing import use_replica
+from app.core.sql_metrics import instrument_engine
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -11,10 +16,91 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set.")
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def to_async_url(url: str) -> str:
+    """
+    Leitet die Async-URL aus DATABASE_URL ab.
+    psycopg3 kann sync und async – nur ältere Treiber-Präfixe (psycopg2, ohne Treiber) werden umgebogen.
+    """
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+# Optional: Lese-Replica (Streaming-Replication o. ä.)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Statement-Logging nur noch auf Wunsch – Kennzahlen liefert app/core/sql_metrics.py
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
+
+# ============================================================
+# 🧱 Sync-Pfad (Alembic, Seeder, Skripte)
+# ============================================================
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# ============================================================
+# ⚡ Async-Pfad (alle Router)
+# ============================================================
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=SQL_ECHO,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+replica_async_engine = (
+    create_async_engine(
+        to_async_url(DATABASE_REPLICA_URL),
+        echo=SQL_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+    )
+    if DATABASE_REPLICA_URL
+    else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Wählt die Engine pro Statement:
+    - Replica: nur wenn der Request als read-only markiert ist (core/db_routing.py)
+    - Primary: Flush/INSERT/UPDATE/DELETE und alles, nachdem die Session einmal geschrieben hat
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = async_engine.sync_engine
+        if replica_async_engine is None:
+            return primary
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["wrote"] = True
+            return primary
+        if self.info.get("wrote") or not use_replica.get():
+            return primary
+        return replica_async_engine.sync_engine
+
+
+# expire_on_commit=False: nach dem Commit keine impliziten (blockierenden) Lazy-Loads
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine)
+# Commits melden geschriebene Tabellen (Cache-Invalidierung usw.)
+track_changes()
+if replica_async_engine is not None:
+    instrument_engine(replica_async_engine)
+
 
 # 🔧 Diese Funktion fehlt dir wahrscheinlich:
 def get_db():
@@ -23,3 +109,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI-Dependency: eine AsyncSession pro Request."""
+    async with AsyncSessionLocal() as db:
+        yield db
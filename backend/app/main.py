@@ -1,11 +1,21 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
+from .database import Base, engine, async_engine, replica_async_engine
 from .routers import register_routers
-from .core.auth import get_current_user
+from .core.auth import get_current_user, key_store
 from .core.test_auth_middleware import TestAuthMiddleware
+from .core.sql_metrics import SQLMetricsMiddleware
+from .core.query_budget import QueryBudgetMiddleware
+from .core.db_routing import ReplicaRoutingMiddleware
+from .core.conditional import ConditionalGetMiddleware
+from .core.invalidation import INVALIDATION_BUS_ENABLED, bus as invalidation_bus
+from .core.audit import AUDIT_ASYNC, audit_writer
+from .services.dashboard_stream import broadcaster
+from .services.audit_partitions import AUDIT_PARTITION_MAINTENANCE_H, run_maintenance as audit_partition_maintenance
 
 # ====== Basis Verzeichnis =====
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,11 +26,44 @@ os.makedirs(os.path.join(UPLOAD_DIR, "documents"), exist_ok=True)
 os.makedirs(os.path.join(UPLOAD_DIR, "avatar"), exist_ok=True)
 
 
+# === Lifecycle ===
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JWKS vorladen → der erste Login wartet nicht auf Keycloak
+    if os.getenv("JWKS_PREWARM", "1") == "1":
+        await key_store.prewarm()
+    # Commits anderer Worker/Container → eigene Caches räumen (LISTEN/NOTIFY)
+    if INVALIDATION_BUS_ENABLED:
+        await invalidation_bus.start()
+    # Audit-Einträge gebündelt im Hintergrund schreiben (opt-in)
+    if AUDIT_ASYNC:
+        await audit_writer.start()
+    # Monatspartitionen von audit_logs vorausschauend anlegen + Aufbewahrung (Advisory-Lock: ein Worker baut um)
+    partition_task = (
+        asyncio.create_task(audit_partition_maintenance()) if AUDIT_PARTITION_MAINTENANCE_H > 0 else None
+    )
+    yield
+    if partition_task is not None:
+        partition_task.cancel()
+        await asyncio.gather(partition_task, return_exceptions=True)
+    # ausstehende Audit-Einträge schreiben, solange der Pool noch offen ist
+    await audit_writer.stop()
+    await invalidation_bus.stop()
+    await key_store.aclose()
+    # offene SSE-Streams beenden, sonst wartet der Shutdown auf die Clients
+    await broadcaster.close()
+    # Async-Pool sauber schließen (gunicorn/uvicorn Worker-Shutdown)
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+
+
 # === FastAPI App ===
 app = FastAPI(
     title="Workmate API",
     version="0.1.0",
     description="HR management system",
+    lifespan=lifespan,
 )
 
 # === CORS ===
@@ -44,8 +87,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Query-Count", "X-DB-Time-Ms", "ETag", "Last-Modified", "X-Next-After", "X-Last-Write"],
 )
 app.add_middleware(TestAuthMiddleware)
+if replica_async_engine is not None:
+    app.add_middleware(ReplicaRoutingMiddleware)
+app.add_middleware(ConditionalGetMiddleware)  # ETag/Last-Modified auf 200-Antworten, 304 kommt aus @conditional
+app.add_middleware(QueryBudgetMiddleware)  # innen: liest request.state.sql_stats
+app.add_middleware(SQLMetricsMiddleware)
 
 # === Static Files mounten ===
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, date
-from sqlalchemy import Boolean, String, Date, Text, Enum, ForeignKey, DateTime, Index
+from sqlalchemy import BigInteger, Boolean, String, Date, Text, Enum, ForeignKey, DateTime, Index, literal_column, text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -96,6 +96,12 @@ class Employee(Base):
 
 
 Index("ix_employees_name_department", Employee.name, Employee.department)
+# Team-Kalender filtert nach Abteilung
+Index("ix_employees_department", Employee.department)
+# Login: Identität case-insensitiv auflösen (app/core/identity.py)
+Index("ix_employees_email_lower", func.lower(Employee.email))
+Index("ix_employees_name_lower", func.lower(Employee.name))
+Index("ix_employees_employee_id_lower", func.lower(Employee.employee_id))
 
 
 # =========================
@@ -203,6 +209,15 @@ class SickLeave(Base):
     document = relationship("Document", back_populates="sick_leave", uselist=False)
 
 
+# „Aktuell krank“: nur Zeilen mit end_date >= now sind interessant → kurzer Index-Range-Scan
+Index("ix_sick_leaves_end_date_start_date", SickLeave.end_date, SickLeave.start_date)
+# Kalender: Zeitraum-Überlappung (&&) über GiST – GREATEST schützt vor end < start
+SICK_LEAVE_PERIOD = func.tstzrange(
+    SickLeave.start_date, func.greatest(SickLeave.start_date, SickLeave.end_date), literal_column("'[]'")
+)
+Index("ix_sick_leaves_period", SICK_LEAVE_PERIOD, postgresql_using="gist")
+
+
 # =========================
 # VacationRequest
 # =========================
@@ -248,6 +263,16 @@ class VacationRequest(Base):
     )
 
 
+# Kommende Urlaube/Abwesenheiten: Range auf start_date, sortiert nach (start_date, id) → Keyset-Seiten
+Index("ix_vacation_requests_start_date_id", VacationRequest.start_date, VacationRequest.id)
+VACATION_PERIOD = func.daterange(
+    VacationRequest.start_date,
+    func.greatest(VacationRequest.start_date, VacationRequest.end_date),
+    literal_column("'[]'"),
+)
+Index("ix_vacation_requests_period", VACATION_PERIOD, postgresql_using="gist")
+
+
 # =========================
 # TimeEntry
 # =========================
@@ -319,18 +344,61 @@ class Reminder(Base):
     )
 
 
+# Offene Reminder nach Fälligkeit (überfällig / nächste 7 Tage) – erledigte bleiben draußen
+Index(
+    "ix_reminders_pending_due_at",
+    Reminder.due_at,
+    postgresql_where=text("status = 'pending'"),
+)
+
+
+# =========================
+# DashboardCounter
+# =========================
+class DashboardCounter(Base):
+    """
+    Vorberechnete Zähler fürs Dashboard, gepflegt von DB-Triggern
+    (Migration dashboard_counters, Rebuild: python -m app.services.dashboard_counters rebuild).
+    """
+    __tablename__ = "dashboard_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    scope: Mapped[str] = mapped_column(String(200), primary_key=True, default="", server_default="")
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 # app/models.py
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Monatspartitionen (audit_logs_YYYY_MM + audit_logs_default), siehe app/services/audit_partitions.py
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
         PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    user_email: Mapped[str] = mapped_column(String(200))
+    user_email: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(50))
     action: Mapped[str] = mapped_column(String(200))
-    resource: Mapped[str] = mapped_column(String(200))
-    details: Mapped[Optional[str]] = mapped_column(Text)
+    resource: Mapped[str] = mapped_column(String(255))
+    # strukturiert aus resource abgeleitet (app/core/audit.py: split_resource) → Index statt ILIKE
+    resource_type: Mapped[str] = mapped_column(String(50))
+    resource_id: Mapped[Optional[str]] = mapped_column(String(255))
+    # JSON-Objekt (app/core/audit.py: _safe_json), durchsuchbar per details @> '{…}'
+    details: Mapped[Optional[dict]] = mapped_column(postgresql.JSONB)
+    # Teil des Primärschlüssels: Partitionsschlüssel muss in jedem UNIQUE-Constraint stecken
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
+
+
+# ORDER BY created_at DESC LIMIT n → Merge Append über die Index-Scans der Partitionen
+Index("ix_audit_logs_created_at", AuditLog.created_at)
+# HR-/Admin-Filter: resource_type IN (…) bzw. user_email = … / action = … jeweils neueste zuerst
+Index("ix_audit_logs_resource_type_created_at", AuditLog.resource_type, AuditLog.created_at)
+Index("ix_audit_logs_user_email_created_at", AuditLog.user_email, AuditLog.created_at)
+Index("ix_audit_logs_action_created_at", AuditLog.action, AuditLog.created_at)
+# ?details.employee_id=KIT-0042 → details @> … ; jsonb_path_ops: kleiner, reicht für @>
+Index("ix_audit_logs_details", AuditLog.details, postgresql_using="gin", postgresql_ops={"details": "jsonb_path_ops"})
@@ -1,94 +1,235 @@
 # app/routers/admin.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-import io, csv
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timezone
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import AuditLog
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, key_store
 from app.core.roles import require_roles
-from app.core.audit import log_action
+from app.core.audit import (
+    AuditCursor, CountMode, audit_cursor, audit_filter_options, audit_page, audit_writer, created_between,
+    details_filters, log_action, resource_filters,
+)
+from app.core.sql_metrics import route_summary
+from app.core.cache import cache, cached
+from app.core.invalidation import bus as invalidation_bus
+from app.core.token_cache import token_cache
+from app.core.identity import identity_cache
+from app.core.query_budget import query_budget
+from app.services import audit_export
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+# ============================================================
+# 🔎 Gemeinsame Audit-Filter (Liste + Export)
+# ============================================================
+def admin_audit_filters(
+    request: Request,
+    user_email: str | None = Query(None, description="Filter by user email (exact, case-insensitive)"),
+    action: str | None = Query(None, description="Filter by action (exact, case-insensitive)"),
+    resource: str | None = Query(None, description="Filter by resource type ('document') or resource ('document:<id>')"),
+    date_from: date | None = Query(None, description="Created on/after this day (UTC)"),
+    date_to: date | None = Query(None, description="Created on/before this day (UTC)"),
+) -> list:
+    """
+    Details-Filter: beliebig viele ?details.<key>=<wert>, z. B. details.employee_id=KIT-0042 oder details.format=json.
+    """
+    filters = []
+
+    # Gleichheit statt '%term%' → ix_audit_logs_user_email_/action_/resource_type_created_at;
+    # user_email und action werden beim Schreiben kleingeschrieben gespeichert (build_entry bzw. require_roles)
+    if user_email and user_email.strip():
+        filters.append(AuditLog.user_email == user_email.strip().lower())
+    if action and action.strip():
+        filters.append(AuditLog.action == action.strip().lower())
+    filters.extend(resource_filters(resource))
+    # Zeitraum → nur die betroffenen Monatspartitionen werden gelesen
+    filters.extend(created_between(date_from, date_to))
+    # details.<key>=<wert> → details @> {...} (GIN-Index)
+    try:
+        filters.extend(details_filters(request.query_params.multi_items()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid details filter '{e}', expected details.<key>=<value>")
+    return filters
+
+
 # ============================================================
 # 📄 Audit-Logs (Liste + Filter + Pagination)
 # ============================================================
 @router.get("/audits")
 @require_roles(["management", "admin"])
-def get_audits(
-    db: Session = Depends(get_db),
+@query_budget(2)
+async def get_audits(
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
-    user_email: str | None = Query(None, description="Filter by user email"),
-    action: str | None = Query(None, description="Filter by action"),
-    resource: str | None = Query(None, description="Filter by resource"),
+    filters: list = Depends(admin_audit_filters),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: AuditCursor | None = Depends(audit_cursor),
+    count: CountMode = Query("capped", description="total: exact | capped (bis AUDIT_COUNT_CAP) | none"),
 ):
-    """Listet alle Audit-Logs mit optionalen Filtern auf (Admin & Management only)."""
-    query = db.query(AuditLog)
-
-    if user_email:
-        query = query.filter(AuditLog.user_email.ilike(f"%{user_email}%"))
-    if action:
-        query = query.filter(AuditLog.action.ilike(f"%{action}%"))
-    if resource:
-        query = query.filter(AuditLog.resource.ilike(f"%{resource}%"))
-
-    total = query.count()
-    items = (
-        query.order_by(AuditLog.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    """
+    Listet alle Audit-Logs mit optionalen Filtern auf (Admin & Management only).
+    Infinite Scroll: next_cursor als ?cursor= übergeben (konstante Zeit je Seite), skip nur für die erste Seite(n).
+    """
+    return await audit_page(db, filters, limit=limit, skip=skip, cursor=cursor, count=count)
 
-    return {"total": total, "items": items}
+
+# ============================================================
+# 🗂️ Auswahllisten für die Audit-Filter
+# ============================================================
+@router.get("/audits/options")
+@require_roles(["management", "admin"])
+@query_budget(2)
+@cached("admin.audit_options", ttl=60, tags=())
+async def get_audit_filter_options(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    """Vorhandene Aktionen und Ressourcentypen – Auswahllisten für die (exakten) Filter der Audit-Ansicht."""
+    return await audit_filter_options(db)
 
 
 # ============================================================
-# 📤 CSV-Export (inkl. Audit über Audit)
+# 📤 CSV-Export (Streaming, inkl. Audit über Audit)
 # ============================================================
 @router.get("/audits/export", response_class=StreamingResponse)
 @require_roles(["management", "admin"])
-def export_audits(
-    db: Session = Depends(get_db),
+async def export_audits(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
+    filters: list = Depends(admin_audit_filters),
+    gzip: bool = Query(False, description="audit_logs.csv.gz statt audit_logs.csv"),
 ):
-    """Exportiert alle Audit-Logs als CSV-Datei."""
-    logs = db.query(AuditLog).order_by(AuditLog.created_at.desc()).all()
-    if not logs:
+    """
+    Exportiert die Audit-Logs (gleiche Filter wie /admin/audits) als CSV.
+    Gestreamt mit konstantem Speicher – auch bei Millionen Zeilen.
+    """
+    # Stand zum Zeitpunkt der Anfrage (der eigene Export-Eintrag gehört nicht mehr dazu)
+    filters = [*filters, AuditLog.created_at <= datetime.now(timezone.utc)]
+    if not await db.scalar(select(exists().where(*filters))):
         raise HTTPException(status_code=404, detail="Keine Audit-Logs gefunden")
 
-    # 🪵 Audit über Audit (Export protokollieren)
-    log_action(
+    # 🪵 Audit über Audit (Export protokollieren) – Anzahl ist vor dem Streamen unbekannt → Filter merken
+    await log_action(
         db=db,
         user=user,
         action="admin_export_audits",
         resource="admin_audits",
-        details={"entries": len(logs)},
-    )
-    db.commit()
-
-    output = io.StringIO()
-    writer = csv.writer(output, lineterminator="\n")
-    writer.writerow(["created_at", "user_email", "role", "action", "resource", "details"])
-
-    for log in logs:
-        writer.writerow([
-            log.created_at.isoformat() if log.created_at else None,
-            log.user_email,
-            log.role,
-            log.action,
-            log.resource,
-            log.details,
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue().encode("utf-8")]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"},
+        details={"filters": dict(request.query_params), "gzip": gzip},
     )
+    await db.commit()
+
+    return audit_export.csv_response(filters, "audit_logs.csv", compress=gzip)
+
+
+# ============================================================
+# ⏱️ SQL-Statistik pro Route (Queries, DB-Zeit, langsamstes Statement)
+# ============================================================
+@router.get("/sql-stats")
+@require_roles(["management", "admin"])
+async def get_sql_stats(user=Depends(get_current_user)):
+    """Rollierende SQL-Kennzahlen pro Route dieses Workers (Admin & Management only, nur lesend)."""
+    return {"window": route_summary.window, "routes": route_summary.snapshot()}
+
+
+@router.post("/sql-stats")
+@require_roles(["management", "admin"])
+async def manage_sql_stats(
+    user=Depends(get_current_user),
+    reset: bool = Query(False, description="Zusammenfassung nach dem Auslesen leeren"),
+):
+    """Wie GET, danach optional leeren – als POST, damit Prefetch/Link-Vorschau nichts auslöst."""
+    routes = route_summary.snapshot()
+    if reset:
+        route_summary.reset()
+    return {"window": route_summary.window, "routes": routes}
+
+
+# ============================================================
+# 🗃️ Cache-Statistik (Trefferquote, Alter ausgelieferter Einträge)
+# ============================================================
+@router.get("/cache")
+@require_roles(["management", "admin"])
+async def get_cache_stats(user=Depends(get_current_user)):
+    """Cache-Kennzahlen pro Namespace dieses Workers (Admin & Management only, nur lesend)."""
+    return {"namespaces": cache.snapshot(), "invalidation_bus": invalidation_bus.snapshot()}
+
+
+@router.post("/cache")
+@require_roles(["management", "admin"])
+async def manage_cache(
+    user=Depends(get_current_user),
+    reset: bool = Query(False, description="Zähler nach dem Auslesen zurücksetzen"),
+    flush: bool = Query(False, description="Alle Einträge verwerfen"),
+):
+    """Wie GET, danach Zähler zurücksetzen und/oder Cache leeren – als POST, damit Prefetch/Link-Vorschau nichts auslöst."""
+    namespaces = cache.snapshot()
+    if reset:
+        cache.reset_stats()
+    flushed = cache.clear() if flush else 0
+    return {"namespaces": namespaces, "flushed": flushed, "invalidation_bus": invalidation_bus.snapshot()}
+
+
+# ============================================================
+# 🔑 JWKS-Key-Store (Treffer, Nachladen, Fehler)
+# ============================================================
+@router.get("/jwks")
+@require_roles(["management", "admin"])
+async def get_jwks_stats(user=Depends(get_current_user)):
+    """Zustand des JWKS-Key-Stores dieses Workers (Admin & Management only, nur lesend)."""
+    return key_store.snapshot()
+
+
+@router.post("/jwks")
+@require_roles(["management", "admin"])
+async def manage_jwks(
+    user=Depends(get_current_user),
+    reset: bool = Query(False, description="Zähler nach dem Auslesen zurücksetzen"),
+    refresh: bool = Query(False, description="Schlüssel sofort neu laden"),
+):
+    """Schlüssel neu laden und/oder Zähler zurücksetzen – als POST, damit Prefetch/Link-Vorschau nichts auslöst."""
+    refreshed = await key_store.prewarm("manual") if refresh else False
+    stats = key_store.snapshot()
+    if reset:
+        key_store.reset_stats()
+    return {"refreshed": refreshed, **stats}
+
+
+# ============================================================
+# 🎟️ Token-Cache (verifizierte Bearer-Tokens)
+# ============================================================
+@router.get("/token-cache")
+@require_roles(["management", "admin"])
+async def get_token_cache_stats(user=Depends(get_current_user)):
+    """Kennzahlen von Token- und Identitäts-Cache dieses Workers (Admin & Management only, nur lesend)."""
+    return {**token_cache.snapshot(), "identities": identity_cache.snapshot()}
+
+
+@router.post("/token-cache")
+@require_roles(["management", "admin"])
+async def manage_token_cache(
+    user=Depends(get_current_user),
+    reset: bool = Query(False, description="Zähler nach dem Auslesen zurücksetzen"),
+    flush: bool = Query(False, description="Alle Einträge verwerfen (alle Tokens neu prüfen)"),
+):
+    """Wie GET, danach Zähler zurücksetzen und/oder Caches leeren – als POST, damit Prefetch/Link-Vorschau nichts auslöst."""
+    stats = token_cache.snapshot()
+    identities = identity_cache.snapshot()
+    if reset:
+        token_cache.reset_stats()
+        identity_cache.reset_stats()
+    flushed = token_cache.clear() + identity_cache.clear() if flush else 0
+    return {**stats, "identities": identities, "flushed": flushed}
+
+
+# ============================================================
+# 📦 Audit-Writer (Backlog, Batches, verworfene Einträge)
+# ============================================================
+@router.get("/audit-writer")
+@require_roles(["management", "admin"])
+async def get_audit_writer_stats(user=Depends(get_current_user)):
+    """Zustand des asynchronen Audit-Writers dieses Workers (Admin & Management only)."""
+    return audit_writer.snapshot()
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, String, literal
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from app.database import get_async_db
 from datetime import datetime, timedelta, timezone, date
+from urllib.parse import quote
 from app import models
 from app.models import ReminderStatus, VacationRequest, VacationStatus
+from app.core.cache import cached
+from app.core.query_budget import query_budget
+from app.services import dashboard_service
+from app.services.dashboard_stream import broadcaster
+from app.core.conditional import conditional
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -21,176 +28,48 @@ def now_utc() -> datetime:
 # ============================================================
 
 @router.get("/overview")
-def get_dashboard_overview(db: Session = Depends(get_db)):
-    now = now_utc()
-    today = date.today()
-    next_7d_dt = now + timedelta(days=7)
-
-    total_employees = db.query(models.Employee).count()
-
-    per_dept = (
-        db.query(models.Employee.department, func.count(models.Employee.employee_id))
-        .group_by(models.Employee.department)
-        .all()
-    )
-    employees_by_department = {dept or "Unassigned": cnt for dept, cnt in per_dept}
-
-    open_vacation_requests = (
-        db.query(models.VacationRequest)
-        .filter(models.VacationRequest.status == "pending")
-        .count()
-    )
-
-    active_sick_leaves = (
-        db.query(models.SickLeave)
-        .filter(models.SickLeave.start_date <= now, models.SickLeave.end_date >= now)
-        .count()
-    )
-
-    active_time_entries = (
-        db.query(models.TimeEntry)
-        .filter(models.TimeEntry.end_time.is_(None))
-        .count()
-    )
-
-    total_documents = db.query(models.Document).count()
-
-    pending_reminders = db.query(models.Reminder).filter(models.Reminder.status == "pending")
-    pending_total = pending_reminders.count()
-    overdue = pending_reminders.filter(
-        models.Reminder.due_at.isnot(None), models.Reminder.due_at < now
-    ).count()
-    due_next_7_days = pending_reminders.filter(
-        models.Reminder.due_at.isnot(None),
-        models.Reminder.due_at >= now,
-        models.Reminder.due_at <= next_7d_dt,
-    ).count()
-
-    return {
-        "employees": {"total": total_employees, "by_department": employees_by_department},
-        "vacations": {"open_requests": open_vacation_requests},
-        "sick_leaves": {"active_now": active_sick_leaves},
-        "time_entries": {"active_now": active_time_entries},
-        "documents": {"total": total_documents},
-        "reminders": {
-            "pending_total": pending_total,
-            "overdue": overdue,
-            "due_next_7_days": due_next_7_days,
-        },
-        "generated_at": now.isoformat(),
-    }
+@conditional(dashboard_service.OVERVIEW_TABLES, time_bucket=60)
+@query_budget(1)
+async def get_dashboard_overview(db: AsyncSession = Depends(get_async_db)):
+    """Alle Kennzahlen in einem Statement → app/services/dashboard_service.py"""
+    return await dashboard_service.get_overview(db)
 
 # ============================================================
 # 👤 Mitarbeiter-Dashboard
 # ============================================================
 
-@router.get("/employee/{employee_id}")
-def get_employee_dashboard(employee_id: str, db: Session = Depends(get_db)):
-    now = now_utc()
-    today = date.today()
-    next_60d = today + timedelta(days=60)
-
-    emp = db.query(models.Employee).filter_by(employee_id=employee_id).first()
-    if not emp:
-        return {"error": f"Employee {employee_id} not found"}
-
-    # alle Relationen über die Business-ID!
-    total_documents = db.query(models.Document).filter_by(employee_id=emp.employee_id).count()
-
-    current_sick_leave = (
-        db.query(models.SickLeave)
-        .filter(
-            models.SickLeave.employee_id == emp.employee_id,
-            models.SickLeave.start_date <= now,
-            models.SickLeave.end_date >= now,
-        )
-        .first()
-    )
-
-    open_vacation_requests = (
-        db.query(models.VacationRequest)
-        .filter_by(employee_id=emp.employee_id, status="pending")
-        .all()
-    )
-
-    all_vacation_requests = (
-        db.query(models.VacationRequest).filter_by(employee_id=emp.employee_id).all()
-    )
-
-    upcoming_vacations = (
-        db.query(models.VacationRequest)
-        .filter(
-            models.VacationRequest.employee_id == emp.employee_id,
-            models.VacationRequest.start_date >= today,
-            models.VacationRequest.start_date <= next_60d,
-        )
-        .order_by(models.VacationRequest.start_date.asc())
-        .all()
-    )
-
-    running_time_entry = (
-        db.query(models.TimeEntry)
-        .filter_by(employee_id=emp.employee_id, end_time=None)
-        .first()
-    )
-
-    employee_pending_reminders = (
-        db.query(models.Reminder)
-        .filter(
-            models.Reminder.employee_id == emp.employee_id,
-            models.Reminder.status == "pending",
-        )
-        .order_by(models.Reminder.due_at.is_(None).asc(), models.Reminder.due_at.asc())
-        .all()
-    )
+MAX_BATCH_EMPLOYEES = 100
 
-    overdue_count = (
-        db.query(models.Reminder)
-        .filter(
-            models.Reminder.employee_id == emp.employee_id,
-            models.Reminder.status == "pending",
-            models.Reminder.due_at.isnot(None),
-            models.Reminder.due_at < now,
-        )
-        .count()
-    )
 
+@router.get("/employee/{employee_id}")
+@conditional(dashboard_service.EMPLOYEE_DASHBOARD_TABLES, time_bucket=60)
+@query_budget(1)
+async def get_employee_dashboard(employee_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Dashboard einer Person – ein Statement → app/services/dashboard_service.py"""
+    dashboards = await dashboard_service.get_employee_dashboards(db, [employee_id])
+    if employee_id not in dashboards:
+        return {"error": f"Employee {employee_id} not found"}
+    return dashboards[employee_id]
+
+
+@router.get("/employees")
+@conditional(dashboard_service.EMPLOYEE_DASHBOARD_TABLES, time_bucket=60)
+@query_budget(1)
+async def get_employee_dashboards(
+    employees: str = Query(..., description="Business-IDs, kommagetrennt (z. B. KIT-0001,KIT-0002)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Mehrere Dashboards in einem Aufruf (z. B. Teamleitung) – Reihenfolge wie angefragt."""
+    ids = list(dict.fromkeys(e.strip() for e in employees.split(",") if e.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No employee IDs given")
+    if len(ids) > MAX_BATCH_EMPLOYEES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EMPLOYEES} employees per request")
+
+    dashboards = await dashboard_service.get_employee_dashboards(db, ids)
     return {
-        "employee": {
-            "id": str(emp.id),
-            "employee_id": emp.employee_id,
-            "name": emp.name,
-            "department": emp.department,
-            "email": emp.email,
-            "position": emp.position,
-        },
-        "documents": {"total": total_documents},
-        "sick_leave": {"active_now": current_sick_leave is not None},
-        "vacations": {
-            "open_requests": len(open_vacation_requests),
-            "all_statuses": [
-                vr.status.value if hasattr(vr.status, "value") else vr.status
-                for vr in all_vacation_requests
-            ],
-            "upcoming_60_days": [
-                {"id": v.id, "start_date": str(v.start_date), "end_date": str(v.end_date)}
-                for v in upcoming_vacations
-            ],
-        },
-        "time_entries": {
-            "running_start": running_time_entry.start_time if running_time_entry else None
-        },
-        "reminders": {
-            "open": [
-                {
-                    "id": r.id,
-                    "title": r.title,
-                    "due_at": r.due_at.isoformat() if r.due_at else None,
-                }
-                for r in employee_pending_reminders
-            ],
-            "overdue_count": overdue_count,
-        },
+        "items": [dashboards[i] for i in ids if i in dashboards],
+        "not_found": [i for i in ids if i not in dashboards],
     }
 
 # ============================================================
@@ -199,22 +78,25 @@ def get_employee_dashboard(employee_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/reminders/top")
-def top_employees_by_reminders(db: Session = Depends(get_db), limit: int = 5):
+@conditional({"reminders", "employees"})
+@cached("dashboard.reminders_top", ttl=60, tags={"reminders", "employees"})
+async def top_employees_by_reminders(db: AsyncSession = Depends(get_async_db), limit: int = 5):
     count_open = func.count(models.Reminder.id).label("open_reminders")
 
     results = (
-        db.query(
-            models.Employee.employee_id,
-            models.Employee.name,
-            count_open,
+        await db.execute(
+            select(
+                models.Employee.employee_id,
+                models.Employee.name,
+                count_open,
+            )
+            .join(models.Reminder, models.Reminder.employee_id == models.Employee.employee_id)
+            .where(models.Reminder.status == ReminderStatus.pending)
+            .group_by(models.Employee.employee_id, models.Employee.name)
+            .order_by(count_open.desc())
+            .limit(limit)
         )
-        .join(models.Reminder, models.Reminder.employee_id == models.Employee.employee_id)
-        .filter(models.Reminder.status == ReminderStatus.pending)
-        .group_by(models.Employee.employee_id, models.Employee.name)
-        .order_by(count_open.desc())
-        .limit(limit)
-        .all()
-    )
+    ).all()
 
     return [
         {"employee_id": r.employee_id, "name": r.name, "open_reminders": r.open_reminders}
@@ -222,28 +104,31 @@ def top_employees_by_reminders(db: Session = Depends(get_db), limit: int = 5):
     ]
 
 @router.get("/vacations/upcoming")
-def upcoming_vacations(db: Session = Depends(get_db), days: int = 30, limit: int = 20):
+@conditional({"vacation_requests", "employees"}, time_bucket=3600)
+@cached("dashboard.vacations_upcoming", ttl=60, tags={"vacation_requests", "employees"})
+async def upcoming_vacations(db: AsyncSession = Depends(get_async_db), days: int = 30, limit: int = 20):
     today = date.today()
     until = today + timedelta(days=days)
 
     rows = (
-        db.query(
-            models.VacationRequest.id,
-            models.VacationRequest.start_date,
-            models.VacationRequest.end_date,
-            models.VacationRequest.status,
-            models.Employee.employee_id,
-            models.Employee.name,
-        )
-        .join(models.Employee, models.Employee.employee_id == models.VacationRequest.employee_id)
-        .filter(
-            models.VacationRequest.start_date >= today,
-            models.VacationRequest.start_date <= until,
+        await db.execute(
+            select(
+                models.VacationRequest.id,
+                models.VacationRequest.start_date,
+                models.VacationRequest.end_date,
+                models.VacationRequest.status,
+                models.Employee.employee_id,
+                models.Employee.name,
+            )
+            .join(models.Employee, models.Employee.employee_id == models.VacationRequest.employee_id)
+            .where(
+                models.VacationRequest.start_date >= today,
+                models.VacationRequest.start_date <= until,
+            )
+            .order_by(models.VacationRequest.start_date.asc().nulls_last())
+            .limit(limit)
         )
-        .order_by(models.VacationRequest.start_date.asc().nulls_last())
-        .limit(limit)
-        .all()
-    )
+    ).all()
 
     return [
         {
@@ -262,59 +147,72 @@ def upcoming_vacations(db: Session = Depends(get_db), days: int = 30, limit: int
 # ============================================================
 
 @router.get("/absences/upcoming")
-def upcoming_absences(db: Session = Depends(get_db), days: int = 30, limit: int = 20):
-    today = date.today()
-    until = today + timedelta(days=days)
+@conditional({"vacation_requests", "sick_leaves", "employees"}, time_bucket=3600)
+@query_budget(1)
+async def upcoming_absences(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    days: int = 30,
+    limit: int = Query(20, ge=1, le=500),
+    after: str | None = Query(None, description="Fortsetzen hinter '<start_date>,<id>' des letzten Items"),
+):
+    """
+    Urlaub + Krank, nach Start sortiert – Merge/Sortierung/Limit in SQL (UNION ALL … LIMIT).
+    Volle Seite → Header X-Next-After enthält den Cursor für die nächste Seite.
+    """
+    try:
+        cursor = dashboard_service.parse_absence_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'after' cursor, expected '<start_date>,<id>'")
+
+    items = await dashboard_service.get_upcoming_absences(db, days=days, limit=limit, after=cursor)
+    if len(items) == limit:
+        # URL-kodiert ('+' im Zeitstempel) → kann unverändert als ?after= angehängt werden
+        response.headers["X-Next-After"] = quote(f"{items[-1]['start_date']},{items[-1]['id']}", safe=",")
+    return items
 
-    vacations = (
-        db.query(
-            models.VacationRequest.id.label("id"),
-            models.Employee.employee_id,
-            models.Employee.name,
-            models.VacationRequest.start_date,
-            models.VacationRequest.end_date,
-            func.coalesce(cast(models.VacationRequest.status, String), literal("approved")).label("status"),
-        )
-        .join(models.Employee, models.Employee.employee_id == models.VacationRequest.employee_id)
-        .filter(models.VacationRequest.start_date >= today,
-                models.VacationRequest.start_date <= until)
-        .all()
-    )
 
-    sick = (
-        db.query(
-            models.SickLeave.id.label("id"),
-            models.Employee.employee_id,
-            models.Employee.name,
-            models.SickLeave.start_date,
-            models.SickLeave.end_date,
+# ============================================================
+# 📅 Team-Kalender (Urlaub + Krank je Tag)
+# ============================================================
+
+@router.get("/calendar")
+@conditional({"vacation_requests", "sick_leaves", "employees"}, time_bucket=3600)
+@query_budget(1)
+async def absence_calendar(
+    db: AsyncSession = Depends(get_async_db),
+    date_from: date | None = Query(None, alias="from", description="Erster Tag (Default: heute)"),
+    date_to: date | None = Query(None, alias="to", description="Letzter Tag inkl. (Default: from + 30 Tage)"),
+    department: str | None = Query(None, description="Nur diese Abteilung"),
+):
+    """Pro Tag: Anzahl Abwesender (gesamt/Urlaub/Krank) und wer fehlt – inkl. bereits laufender Abwesenheiten."""
+    date_from = date_from or date.today()
+    date_to = date_to or date_from + timedelta(days=30)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days + 1 > dashboard_service.CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {dashboard_service.CALENDAR_MAX_DAYS} days per request"
         )
-        .join(models.Employee, models.Employee.employee_id == models.SickLeave.employee_id)
-        .filter(models.SickLeave.end_date >= today)
-        .all()
-    )
+    return await dashboard_service.get_calendar(db, date_from=date_from, date_to=date_to, department=department)
+
 
-    result = []
-    for v in vacations:
-        result.append({
-            "id": f"vac_{v.id}",
-            "employee_id": v.employee_id,
-            "name": v.name,
-            "type": "vacation",
-            "status": v.status,
-            "start_date": str(v.start_date),
-            "end_date": str(v.end_date),
-        })
-    for s in sick:
-        result.append({
-            "id": f"sick_{s.id}",
-            "employee_id": s.employee_id,
-            "name": s.name,
-            "type": "sick",
-            "status": "sick",
-            "start_date": str(s.start_date),
-            "end_date": str(s.end_date),
-        })
+# ============================================================
+# 📡 Live-Updates (Server-Sent Events)
+# ============================================================
 
-    result.sort(key=lambda r: r["start_date"])
-    return result[:limit]
+@router.get("/stream")
+async def dashboard_stream(
+    request: Request,
+    employee_id: str | None = Query(None, description="Zusätzlich Deltas für dieses Mitarbeiter-Dashboard"),
+):
+    """
+    SSE statt Polling: erst ein `snapshot`, danach `overview`/`employee`-Events mit den geänderten Feldern,
+    sobald Reminder, Urlaube, Krankmeldungen, Zeiteinträge oder Dokumente committet werden.
+    """
+    client = await broadcaster.connect(employee_id)
+    return StreamingResponse(
+        broadcaster.events(client, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
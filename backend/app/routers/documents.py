@@ -17,15 +17,19 @@ from fastapi import (
     status,
 )
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 
 from app import models, schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.enums import DocumentStatus, DocumentType
 from app.core.auth import get_current_user
 from app.core.audit import log_action
 from app.core.roles import require_roles
+from app.core.query_budget import query_budget
+from app.core.conditional import conditional, static_cache
 
 
 # ============================================================
@@ -45,11 +49,11 @@ router = APIRouter(prefix="/documents", tags=["Documents"])
 # 🔧 Hilfsfunktion
 # ============================================================
 
-def resolve_employee(db: Session, identifier: str):
+async def resolve_employee(db: AsyncSession, identifier: str):
     """Sucht einen Mitarbeiter anhand seiner KIT-ID (z. B. 'KIT-0001')."""
     if not identifier:
         return None
-    return db.scalar(
+    return await db.scalar(
         select(models.Employee).where(models.Employee.employee_id == identifier)
     )
 
@@ -59,6 +63,7 @@ def resolve_employee(db: Session, identifier: str):
 # ============================================================
 
 @router.get("/types", response_model=list[str])
+@static_cache()
 def list_document_types():
     """Gibt alle erlaubten DocumentType-ENUM-Werte zurück."""
     return [e.value for e in DocumentType]
@@ -69,8 +74,10 @@ def list_document_types():
 # ============================================================
 
 @router.get("/", response_model=List[schemas.DocumentOut])
-def list_documents(
-    db: Session = Depends(get_db),
+@conditional({"documents", "employees"})
+@query_budget(2)  # Mitarbeiter-Lookup + Liste (Employee per joinedload, kein Lazy-Load pro Zeile)
+async def list_documents(
+    db: AsyncSession = Depends(get_async_db),
     employee_id: Optional[str] = Query(None, description="KIT-ID des Mitarbeiters"),
     status: Optional[DocumentStatus] = Query(None),
     doc_type: Optional[DocumentType] = Query(None),
@@ -89,7 +96,7 @@ def list_documents(
 
     # 🔹 Nach Mitarbeiter filtern (KIT-ID)
     if employee_id:
-        emp = resolve_employee(db, employee_id)
+        emp = await resolve_employee(db, employee_id)
         if not emp:
             raise HTTPException(status_code=404, detail=f"Employee '{employee_id}' not found")
         filters.append(models.Document.employee_id == emp.employee_id)
@@ -110,7 +117,7 @@ def list_documents(
         stmt = stmt.where(f)
 
     stmt = stmt.offset((page - 1) * page_size).limit(page_size)
-    docs = db.scalars(stmt).all()
+    docs = (await db.scalars(stmt)).all()
 
     return [
         {
@@ -134,14 +141,14 @@ def list_documents(
 # ============================================================
 
 @router.put("/{doc_id}", response_model=schemas.DocumentOut)
-def update_document(
+async def update_document(
     doc_id: UUID,
     payload: schemas.DocumentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Aktualisiert ein Dokument (z. B. Notizen, Typ, Status)."""
-    doc = db.get(models.Document, doc_id)
+    doc = await db.get(models.Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -160,10 +167,11 @@ def update_document(
         setattr(doc, key, value)
 
     # 🧾 Audit vor dem Commit hinzufügen (gleiche Transaktion)
-    log_action(db, user, "update", f"document:{doc_id}", data)
+    # Datenänderung → Audit-Eintrag in derselben Transaktion (auch mit AUDIT_ASYNC)
+    await log_action(db, user, "update", f"document:{doc_id}", data, transactional=True)
 
-    db.commit()
-    db.refresh(doc)
+    await db.commit()
+    await db.refresh(doc)
     print(f"✅ Dokument aktualisiert & Audit gespeichert: {doc_id}")
     return doc
 
@@ -173,9 +181,9 @@ def update_document(
 # ============================================================
 
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_document(doc_id: UUID, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def delete_document(doc_id: UUID, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
     """Löscht ein Dokument (inkl. Datei)."""
-    doc = db.get(models.Document, doc_id)
+    doc = await db.get(models.Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -187,10 +195,10 @@ def delete_document(doc_id: UUID, db: Session = Depends(get_db), user=Depends(ge
             except Exception as e:
                 print(f"⚠️ Datei konnte nicht gelöscht werden: {e}")
 
-    db.delete(doc)
-    log_action(db, user, "delete", f"document:{doc_id}", "Dokument gelöscht")
+    await db.delete(doc)
+    await log_action(db, user, "delete", f"document:{doc_id}", "Dokument gelöscht", transactional=True)
 
-    db.commit()
+    await db.commit()
     print(f"✅ Dokument gelöscht & Audit gespeichert: {doc_id}")
 
 
@@ -205,11 +213,11 @@ async def upload_document(
     document_type: DocumentType = Form(...),
     notes: Optional[str] = Form(None),
     is_original_required: bool = Form(False),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Speichert neues Dokument mit Metadaten für Mitarbeiter."""
-    employee = resolve_employee(db, employee_id)
+    employee = await resolve_employee(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail=f"Employee '{employee_id}' not found")
 
@@ -220,8 +228,9 @@ async def upload_document(
     safe_name = f"{uuid4().hex}{ext}"
     save_path = emp_dir / safe_name
 
+    # Datei-IO blockiert → im Threadpool statt auf dem Event-Loop
     with open(save_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(shutil.copyfileobj, file.file, buffer)
 
     file_url = f"{BACKEND_URL}/uploads/documents/{employee.employee_id}/{safe_name}"
 
@@ -237,16 +246,16 @@ async def upload_document(
     )
 
     db.add(doc)
-    db.flush()  # ⚡ ID wird generiert, bevor Audit geschrieben wird
+    await db.flush()  # ⚡ ID wird generiert, bevor Audit geschrieben wird
 
-    log_action(db, user, "upload", f"document:{doc.id}", {
+    await log_action(db, user, "upload", f"document:{doc.id}", {
         "filename": name,
         "type": document_type,
         "employee_id": employee.employee_id,
-    })
+    }, transactional=True)
 
-    db.commit()
-    db.refresh(doc)
+    await db.commit()
+    await db.refresh(doc)
     print(f"✅ Upload abgeschlossen & Audit gespeichert: {doc.id}")
     return doc
 
@@ -256,10 +265,10 @@ async def upload_document(
 # ============================================================
 
 @router.get("/download/{employee_id}/{filename}")
-def download_document(
+async def download_document(
     employee_id: str,
     filename: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Gibt eine hochgeladene Datei zurück."""
@@ -268,7 +277,7 @@ def download_document(
         raise HTTPException(status_code=404, detail="File not found")
 
     # 🧾 Optionales Logging für Nachvollziehbarkeit
-    log_action(db, user, "download", f"document:{filename}", {"employee_id": employee_id})
-    db.commit()
+    await log_action(db, user, "download", f"document:{filename}", {"employee_id": employee_id})
+    await db.commit()
 
     return FileResponse(str(file_path), filename=filename)
@@ -4,14 +4,16 @@ from uuid import UUID, uuid4
 import uuid
 
 from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile,File
-from sqlalchemy.orm import Session
-from sqlalchemy import Column, func
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Column, func, select
 from sqlalchemy.exc import IntegrityError
 from pathlib import Path
 import shutil
 from app import models, schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.core.auth import get_current_user
+from app.core.conditional import conditional
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
@@ -25,36 +27,38 @@ def get_me(user=Depends(get_current_user)):
 
 
 @router.get("/", response_model=List[schemas.EmployeeOut])
-def get_employees(
-    db: Session = Depends(get_db),
+@conditional({"employees"})
+async def get_employees(
+    db: AsyncSession = Depends(get_async_db),
     q: Optional[str] = Query(None, description="Suche in name/email/employee_id/department/position"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
 ):
-    query = db.query(models.Employee)
+    query = select(models.Employee)
     if q:
         like = f"%{q}%"
-        query = query.filter(
+        query = query.where(
             (models.Employee.name.ilike(like)) |
             (models.Employee.email.ilike(like)) |
             (models.Employee.employee_id.ilike(like)) |
             (models.Employee.department.ilike(like)) |
             (models.Employee.position.ilike(like))
         )
-    rows = query.order_by(models.Employee.name.asc()).offset(offset).limit(limit).all()
+    rows = (await db.scalars(query.order_by(models.Employee.name.asc()).offset(offset).limit(limit))).all()
     return rows
 
 @router.get("/{employee_id}", response_model=schemas.EmployeeOut)
-def get_employee(employee_id: UUID, db: Session = Depends(get_db)):
-    emp = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+@conditional({"employees"})
+async def get_employee(employee_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    emp = await db.get(models.Employee, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
     return emp
 
 @router.post("/", response_model=schemas.EmployeeOut)
-def create_employee(
+async def create_employee(
     employee: schemas.EmployeeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.Employee = Depends(get_current_user),
 ):
     """🧩 Legt einen neuen Mitarbeiter-Eintrag an, wenn der User noch keinen hat."""
@@ -64,11 +68,11 @@ def create_employee(
         raise HTTPException(status_code=403, detail="You can only create your own profile")
 
     # 🔢 Nächste freie Business-ID bestimmen
-    last_emp = (
-        db.query(models.Employee)
-        .filter(models.Employee.employee_id.like("KIT-%"))
+    last_emp = await db.scalar(
+        select(models.Employee)
+        .where(models.Employee.employee_id.like("KIT-%"))
         .order_by(models.Employee.employee_id.desc())
-        .first()
+        .limit(1)
     )
 
     if last_emp and last_emp.employee_id.startswith("KIT-"):
@@ -95,18 +99,18 @@ def create_employee(
 
     try:
         db.add(new_emp)
-        db.commit()
-        db.refresh(new_emp)
+        await db.commit()
+        await db.refresh(new_emp)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=409, detail="Email or employee_id already in use")
 
     return new_emp
 
 
 @router.put("/{employee_id}", response_model=schemas.EmployeeOut)
-def update_employee(employee_id: UUID, updated: schemas.EmployeeUpdate, db: Session = Depends(get_db)):
-    emp = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+async def update_employee(employee_id: UUID, updated: schemas.EmployeeUpdate, db: AsyncSession = Depends(get_async_db)):
+    emp = await db.get(models.Employee, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -116,26 +120,26 @@ def update_employee(employee_id: UUID, updated: schemas.EmployeeUpdate, db: Sess
     # Set the updated timestamp if 'updated' is a mapped attribute
     if hasattr(emp, "updated") and isinstance(getattr(type(emp), "updated", None), Column):
         emp.updated = datetime.utcnow()
-    db.commit()
-    db.refresh(emp)
+    await db.commit()
+    await db.refresh(emp)
     return emp
 
 @router.delete("/{employee_id}")
-def delete_employee(employee_id: UUID, db: Session = Depends(get_db)):
-    emp = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+async def delete_employee(employee_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    emp = await db.get(models.Employee, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
-    db.delete(emp)
-    db.commit()
+    await db.delete(emp)
+    await db.commit()
     return {"detail": "Employee deleted"}
 
 @router.put("/by_business/{employee_id}", response_model=schemas.EmployeeOut)
-def update_employee_by_business_id(
+async def update_employee_by_business_id(
     employee_id: str,
     payload: schemas.EmployeeUpdateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    emp = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+    emp = await db.scalar(select(models.Employee).where(models.Employee.employee_id == employee_id))
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -144,10 +148,10 @@ def update_employee_by_business_id(
     # 1) Vorab-Check: E-Mail schon bei anderem Datensatz vergeben?
     new_email = data.get("email")
     if new_email:
-        exists = (
-            db.query(models.Employee.id)
-              .filter(models.Employee.email == new_email, models.Employee.id != emp.id)
-              .first()
+        exists = await db.scalar(
+            select(models.Employee.id)
+            .where(models.Employee.email == new_email, models.Employee.id != emp.id)
+            .limit(1)
         )
         if exists:
             raise HTTPException(status_code=409, detail="Email already in use")
@@ -161,10 +165,10 @@ def update_employee_by_business_id(
 
     try:
         db.add(emp)
-        db.commit()
-        db.refresh(emp)
+        await db.commit()
+        await db.refresh(emp)
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         # Falls doch ein anderer Unique-Fehler kommt (z.B. employee_id)
         raise HTTPException(status_code=409, detail="Unique constraint violation") from e
 
@@ -174,7 +178,7 @@ def update_employee_by_business_id(
 async def upload_employee_avatar(
     employee_id: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     📸 Lädt ein Profilbild für den Mitarbeiter hoch.
@@ -187,7 +191,7 @@ async def upload_employee_avatar(
         raise HTTPException(status_code=400, detail="Nur Bilddateien sind erlaubt.")
 
     # 2️⃣ Mitarbeiter anhand Business-ID finden
-    emp = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+    emp = await db.scalar(select(models.Employee).where(models.Employee.employee_id == employee_id))
     if emp is None:
         raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden.")
 
@@ -208,11 +212,11 @@ async def upload_employee_avatar(
 
     # 5️⃣ Datei speichern
     with open(save_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(shutil.copyfileobj, file.file, buffer)
 
     # 6️⃣ URL im Datensatz aktualisieren
     emp.avatar_url = f"/uploads/avatar/{filename}"
-    db.commit()
-    db.refresh(emp)
+    await db.commit()
+    await db.refresh(emp)
 
     return emp
\ No newline at end of file
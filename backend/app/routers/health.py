@@ -2,8 +2,8 @@ from datetime import datetime, timezone
 import os
 from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy import text
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 import httpx
 import asyncio
 
@@ -22,9 +22,9 @@ def live():
     return {"status": "ok", "details": _meta()}
 
 @router.get("/ready", summary="Readiness probe (DB required)")
-def ready(db: Session = Depends(get_db)):
+async def ready(db: AsyncSession = Depends(get_async_db)):
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {"status": "ok", "details": {"db": "ok", **_meta()}}
     except Exception as e:
         # 503 signalisiert: noch nicht bereit
@@ -35,11 +35,11 @@ def ready(db: Session = Depends(get_db)):
         )
 
 @router.get("/health", summary="Detailed health (DB + Meta)")
-def health(db: Session = Depends(get_db)):
+async def health(db: AsyncSession = Depends(get_async_db)):
     status_flag = "ok"
     details = {"database": "ok", **_meta()}
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
     except Exception as e:
         status_flag = "degraded"
         details["database"] = f"error:{type(e).__name__}"
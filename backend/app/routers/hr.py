@@ -1,17 +1,21 @@
 # app/routers/hr.py
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
-import io
-import csv
+from datetime import date, datetime, timezone
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.auth import get_current_user
 from app.core.roles import require_roles
-from app.core.audit import log_action
+from app.core.audit import (
+    HR_RESOURCE_TYPES, AuditCursor, CountMode, audit_cursor, audit_page, created_between, log_action,
+)
+from app.core.query_budget import query_budget
 from app import models
-from app.services import hr_service
+from app.services import audit_export, dashboard_service, hr_service
 from app.schemas import HROverview
+from app.core.conditional import conditional
 
 
 router = APIRouter(prefix="/hr", tags=["HR"])
@@ -22,13 +26,15 @@ router = APIRouter(prefix="/hr", tags=["HR"])
 # ============================================================
 @router.get("/overview", response_model=HROverview)
 @require_roles(["management", "hr"])
+@conditional(dashboard_service.OVERVIEW_TABLES, time_bucket=60)
+@query_budget(1)
 async def hr_overview(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Liefert HR-KPIs als Subset der Dashboard-Aggregation."""
     print(f"[HR] Overview called by {user.get('email')}")
-    return hr_service.get_hr_overview(db)
+    return await hr_service.get_hr_overview(db)
 
 
 # ============================================================
@@ -36,13 +42,14 @@ async def hr_overview(
 # ============================================================
 @router.get("/stats/departments")
 @require_roles(["management", "hr"])
+@conditional({"employees"})
+@query_budget(1)
 async def hr_stats_departments(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Liefert aggregierte Mitarbeiterzahlen pro Abteilung."""
-    data = hr_service.get_hr_overview(db)
-    return data["departments"]
+    return await hr_service.get_department_stats(db)
 
 
 # ============================================================
@@ -52,23 +59,23 @@ async def hr_stats_departments(
 @require_roles(["management", "hr"])
 async def export_hr_report(
     format: str = Query("csv", enum=["csv", "json"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
     """Exportiert HR-Daten (CSV oder JSON)."""
     print(f"[HR] Export triggered by {user.get('email')} ({format})")
 
     # 🪵 Audit-Log für Exportvorgang
-    log_action(
+    await log_action(
         db=db,
         user=user,
         action="hr_export_report",
         resource="hr_reports",
         details={"format": format},
     )
-    db.commit()
+    await db.commit()
 
-    return hr_service.export_hr_report(db, user, format)
+    return await hr_service.export_hr_report(db, user, format)
 
 
 # ============================================================
@@ -76,32 +83,29 @@ async def export_hr_report(
 # ============================================================
 @router.get("/audits")
 @require_roles(["management", "hr"])
-def get_hr_audits(
-    db: Session = Depends(get_db),
+@query_budget(2)
+async def get_hr_audits(
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    date_from: date | None = Query(None, description="Created on/after this day (UTC)"),
+    date_to: date | None = Query(None, description="Created on/before this day (UTC)"),
+    cursor: AuditCursor | None = Depends(audit_cursor),
+    count: CountMode = Query("capped", description="total: exact | capped (bis AUDIT_COUNT_CAP) | none"),
 ):
     """
-    Gibt alle HR-relevanten Audit-Einträge zurück:
-    - HR-spezifische (resource LIKE 'hr_%')
-    - Dokumente (document:%)
-    - Reminder (reminder:%)
+    Gibt alle HR-relevanten Audit-Einträge zurück (neueste zuerst, Folgeseiten über next_cursor):
+    - HR-spezifische (resource_type 'hr', z. B. hr_reports)
+    - Dokumente (document:<id>)
+    - Reminder (reminder:<id>)
     """
-    query = (
-        db.query(models.AuditLog)
-        .filter(
-            models.AuditLog.resource.ilike("hr_%")
-            | models.AuditLog.resource.ilike("document:%")
-            | models.AuditLog.resource.ilike("reminder:%")
-        )
-        .order_by(models.AuditLog.created_at.desc())
-    )
-
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+    # resource_type statt ILIKE → ix_audit_logs_resource_type_created_at
+    hr_filter = models.AuditLog.resource_type.in_(HR_RESOURCE_TYPES)
+    # Zeitraum → Partition Pruning (nur die betroffenen Monate)
+    period = created_between(date_from, date_to)
 
-    return {"total": total, "items": items}
+    return await audit_page(db, [hr_filter, *period], limit=limit, skip=skip, cursor=cursor, count=count)
 
 
 # ============================================================
@@ -109,57 +113,36 @@ def get_hr_audits(
 # ============================================================
 @router.get("/audits/export", response_class=StreamingResponse)
 @require_roles(["management", "hr"])
-def export_hr_audits(
-    db: Session = Depends(get_db),
+async def export_hr_audits(
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
+    date_from: date | None = Query(None, description="Created on/after this day (UTC)"),
+    date_to: date | None = Query(None, description="Created on/before this day (UTC)"),
+    gzip: bool = Query(False, description="hr_audits.csv.gz statt hr_audits.csv"),
 ):
     """
-    Exportiert HR-bezogene Audit-Einträge als CSV.
+    Exportiert HR-bezogene Audit-Einträge als CSV (gestreamt, konstanter Speicher).
     - Nur HR & Management
     - Trennt HR-Audits klar von Admin-Logs
+    - gleiche Filter wie /hr/audits
     """
-    logs = (
-        db.query(models.AuditLog)
-        .filter(
-            models.AuditLog.resource.ilike("hr_%")
-            | models.AuditLog.resource.ilike("document:%")
-            | models.AuditLog.resource.ilike("reminder:%")
-        )
-        .order_by(models.AuditLog.created_at.desc())
-        .all()
-    )
-
-    if not logs:
+    filters = [
+        models.AuditLog.resource_type.in_(HR_RESOURCE_TYPES),
+        *created_between(date_from, date_to),
+        # Stand zum Zeitpunkt der Anfrage (der eigene Export-Eintrag ist selbst ein HR-Audit)
+        models.AuditLog.created_at <= datetime.now(timezone.utc),
+    ]
+    if not await db.scalar(select(exists().where(*filters))):
         raise HTTPException(status_code=404, detail="Keine HR-Audit-Logs gefunden")
 
-    # 🪵 Audit über Audit
-    log_action(
+    # 🪵 Audit über Audit – Anzahl ist vor dem Streamen unbekannt → Zeitraum merken
+    await log_action(
         db=db,
         user=user,
         action="hr_export_audits",
         resource="hr_audits",
-        details={"entries": len(logs)},
+        details={"date_from": date_from, "date_to": date_to, "gzip": gzip},
     )
-    db.commit()
-
-    # ❗ StringIO ohne encoding/newline
-    output = io.StringIO()
-    writer = csv.writer(output, lineterminator="\n")
-    writer.writerow(["created_at", "user_email", "role", "action", "resource", "details"])
-
-    for log in logs:
-        writer.writerow([
-            log.created_at.isoformat() if log.created_at else None,
-            log.user_email,
-            log.role,
-            log.action,
-            log.resource,
-            log.details,
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue().encode("utf-8")]),  # hier sauber nach UTF-8
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=hr_audits.csv"},
-)
\ No newline at end of file
+    await db.commit()
+
+    return audit_export.csv_response(filters, "hr_audits.csv", compress=gzip)
\ No newline at end of file
@@ -1,32 +1,37 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database import get_db
+from app.database import get_async_db
 from app import models
+from app.core.cache import cached
+from app.core.conditional import conditional, static_cache
 
 router = APIRouter(prefix="/meta", tags=["Meta"])
 
 @router.get("/departments")
-def list_departments(db: Session = Depends(get_db)):
-    rows = db.execute(
+@conditional({"employees"})
+@cached("meta.departments", ttl=300, tags={"employees"})
+async def list_departments(db: AsyncSession = Depends(get_async_db)):
+    rows = (await db.execute(
         select(models.Employee.department)
         .where(models.Employee.department.isnot(None))
         .group_by(models.Employee.department)
         .order_by(func.count().desc())
-    ).all()
+    )).all()
     # rows ist Liste von Tuples [(dept,), ...]
     return [r[0] for r in rows if r[0]]
 
 @router.get("/roles")
-def list_roles(db: Session = Depends(get_db)):
+@static_cache()
+async def list_roles(db: AsyncSession = Depends(get_async_db)):
     # einfache Heuristik: distinct role aus Employee (falls vorhanden)
     if hasattr(models.Employee, "role"):
-        rows = db.execute(
+        rows = (await db.execute(
             select(models.Employee.role)
             .where(models.Employee.role.isnot(None))
             .group_by(models.Employee.role)
             .order_by(func.count().desc())
-        ).all()
+        )).all()
         return [r[0] for r in rows if r[0]]
     # fallback: feste Liste
     return [
@@ -2,11 +2,12 @@ from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
+from app.core.conditional import conditional
 
 router = APIRouter(prefix="/reminders", tags=["Reminders"])
 
@@ -32,29 +33,31 @@ def add_is_overdue(obj: models.Reminder) -> schemas.ReminderOut:
 # ------------------------------------------------------------------
 
 @router.get("/by_business/{employee_id}", response_model=List[schemas.ReminderOut])
-def list_reminders_by_business_id(employee_id: str, db: Session = Depends(get_db)):
-    emp = db.scalar(
+@conditional({"reminders", "employees"}, time_bucket=60)
+async def list_reminders_by_business_id(employee_id: str, db: AsyncSession = Depends(get_async_db)):
+    emp = await db.scalar(
         select(models.Employee).where(models.Employee.employee_id == employee_id)
     )
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     rows = (
-        db.query(models.Reminder)
-        .filter(models.Reminder.employee_id == emp.employee_id)  # ✅ String-FK
-        .order_by(models.Reminder.due_at.asc().nulls_last(), models.Reminder.created.asc())
-        .all()
-    )
+        await db.scalars(
+            select(models.Reminder)
+            .where(models.Reminder.employee_id == emp.employee_id)  # ✅ String-FK
+            .order_by(models.Reminder.due_at.asc().nulls_last(), models.Reminder.created.asc())
+        )
+    ).all()
     return [add_is_overdue(r) for r in rows]
 
 
 @router.post("/by_business/{employee_id}", response_model=schemas.ReminderOut, status_code=201)
-def create_reminder_by_business_id(
+async def create_reminder_by_business_id(
     employee_id: str,
     payload: schemas.ReminderCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    emp = db.scalar(
+    emp = await db.scalar(
         select(models.Employee).where(models.Employee.employee_id == employee_id)
     )
     if not emp:
@@ -76,8 +79,8 @@ def create_reminder_by_business_id(
         updated=datetime.utcnow(),
     )
     db.add(new_r)
-    db.commit()
-    db.refresh(new_r)
+    await db.commit()
+    await db.refresh(new_r)
     return add_is_overdue(new_r)
 
 
@@ -86,20 +89,21 @@ def create_reminder_by_business_id(
 # ------------------------------------------------------------------
 
 @router.post("/", response_model=schemas.ReminderOut)
-def create_reminder(payload: schemas.ReminderCreate, db: Session = Depends(get_db)):
-    if not db.scalar(select(models.Employee).where(models.Employee.employee_id == payload.employee_id)):
+async def create_reminder(payload: schemas.ReminderCreate, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Employee).where(models.Employee.employee_id == payload.employee_id)):
         raise HTTPException(status_code=404, detail="Employee not found")
 
     item = models.Reminder(**payload.model_dump())
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     return add_is_overdue(item)
 
 
 @router.get("/", response_model=list[schemas.ReminderOut])
-def list_reminders(
-    db: Session = Depends(get_db),
+@conditional({"reminders"}, time_bucket=60)
+async def list_reminders(
+    db: AsyncSession = Depends(get_async_db),
     employee_id: Optional[str] = Query(None),  # ✅ String statt UUID
     status: Optional[models.ReminderStatus] = Query(None),
     due_before: Optional[datetime] = Query(None),
@@ -136,21 +140,22 @@ def list_reminders(
         .limit(page_size)
     )
 
-    rows = db.scalars(stmt).all()
+    rows = (await db.scalars(stmt)).all()
     return [add_is_overdue(r) for r in rows]
 
 
 @router.get("/{reminder_id:uuid}", response_model=schemas.ReminderOut)
-def get_reminder(reminder_id: uuid.UUID, db: Session = Depends(get_db)):
-    obj = db.get(models.Reminder, reminder_id)
+@conditional({"reminders"}, time_bucket=60)
+async def get_reminder(reminder_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(models.Reminder, reminder_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Reminder not found")
     return add_is_overdue(obj)
 
 
 @router.patch("/{reminder_id:uuid}", response_model=schemas.ReminderOut)
-def update_reminder(reminder_id: uuid.UUID, payload: schemas.ReminderUpdate, db: Session = Depends(get_db)):
-    obj = db.get(models.Reminder, reminder_id)
+async def update_reminder(reminder_id: uuid.UUID, payload: schemas.ReminderUpdate, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(models.Reminder, reminder_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Reminder not found")
 
@@ -158,15 +163,15 @@ def update_reminder(reminder_id: uuid.UUID, payload: schemas.ReminderUpdate, db:
     for k, v in data.items():
         setattr(obj, k, v)
 
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return add_is_overdue(obj)
 
 
 @router.delete("/{reminder_id:uuid}", status_code=204)
-def delete_reminder(reminder_id: uuid.UUID, db: Session = Depends(get_db)):
-    obj = db.get(models.Reminder, reminder_id)
+async def delete_reminder(reminder_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(models.Reminder, reminder_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Reminder not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
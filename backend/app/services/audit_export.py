@@ -0,0 +1,94 @@
+# app/services/audit_export.py
+"""
+CSV-Export der Audit-Logs mit konstantem Speicher.
+
+- serverseitiger Cursor (yield_per) in eigener Session – die Request-Session ist geschlossen,
+  bevor StreamingResponse den Body sendet
+- jeder Batch wird sofort CSV-kodiert und gesendet (kein .all(), kein StringIO mit der ganzen Tabelle)
+- optional on-the-fly gzip (?gzip=true → audit_logs.csv.gz)
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import zlib
+from typing import AsyncIterator, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, select
+
+from app import models
+from app.core.audit import details_text
+from app.database import AsyncSessionLocal
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+AUDIT_EXPORT_BATCH = int(os.getenv("AUDIT_EXPORT_BATCH", "2000"))  # Zeilen pro Fetch bzw. pro Chunk
+
+CSV_HEADER = ("created_at", "user_email", "role", "action", "resource", "details")
+_L = models.AuditLog
+COLUMNS = (_L.created_at, _L.user_email, _L.role, _L.action, _L.resource, _L.details)
+
+
+# ============================================================
+# 🗄️ Zeilen batchweise aus der DB (serverseitiger Cursor)
+# ============================================================
+async def fetch_batches(filters: List[ColumnElement[bool]], batch_size: int = AUDIT_EXPORT_BATCH) -> AsyncIterator[Sequence]:
+    """Neueste zuerst; nur die Export-Spalten, keine ORM-Objekte."""
+    stmt = (
+        select(*COLUMNS)
+        .where(*filters)
+        .order_by(_L.created_at.desc(), _L.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            yield batch
+
+
+# ============================================================
+# 🧾 CSV-Kodierung (+ gzip) je Batch
+# ============================================================
+def _csv_row(row: Sequence) -> tuple:
+    created_at, user_email, role, action, resource, details = row
+    return (created_at.isoformat() if created_at else None, user_email, role, action, resource, details_text(details))
+
+
+async def encode_csv(batches: AsyncIterator[Sequence], compress: bool = False) -> AsyncIterator[bytes]:
+    """Header + ein Chunk pro Batch; der Puffer wird nach jedem Chunk geleert."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    gz = zlib.compressobj(wbits=31) if compress else None  # wbits=31 → gzip-Container
+
+    def take() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return gz.compress(data) if gz else data
+
+    writer.writerow(CSV_HEADER)
+    async for batch in batches:
+        writer.writerows(_csv_row(row) for row in batch)
+        chunk = take()
+        if chunk:  # gzip puffert intern, bis ein Block voll ist
+            yield chunk
+    chunk = take()
+    if gz:
+        chunk += gz.flush()
+    if chunk:
+        yield chunk
+
+
+def csv_response(filters: List[ColumnElement[bool]], filename: str, compress: bool = False) -> StreamingResponse:
+    if compress:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+    else:
+        media_type = "text/csv"
+    return StreamingResponse(
+        encode_csv(fetch_batches(filters), compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
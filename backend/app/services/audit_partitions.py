@@ -0,0 +1,230 @@
+# app/services/audit_partitions.py
+"""
+Monatspartitionen für audit_logs (Migration f2a6c8d4e1b7: PARTITION BY RANGE (created_at)).
+
+- ensure_partitions: aktueller Monat + AUDIT_PARTITIONS_AHEAD Monate im Voraus
+  (Zeilen, die bis dahin in audit_logs_default gelandet sind, werden in die neue Partition verschoben)
+- apply_retention: ganze Monate älter als AUDIT_RETENTION_MONTHS abhängen (detach) oder löschen (drop)
+  statt zeilenweiser DELETEs
+- läuft beim Start und danach periodisch im Worker (AUDIT_PARTITION_MAINTENANCE_H), Advisory-Lock
+  verhindert, dass mehrere Worker gleichzeitig umbauen
+
+    python -m app.services.audit_partitions list
+    python -m app.services.audit_partitions maintain [--retention-months 24] [--mode drop]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+PARENT = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3"))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "0"))  # 0 = alles behalten
+AUDIT_RETENTION_MODE = os.getenv("AUDIT_RETENTION_MODE", "detach")  # detach | drop
+AUDIT_PARTITION_MAINTENANCE_H = float(os.getenv("AUDIT_PARTITION_MAINTENANCE_H", "12"))  # 0 = aus
+ADVISORY_LOCK_KEY = 7_420_115  # beliebig, aber fest: „audit partitions“
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: Optional[datetime]  # None = DEFAULT-Partition
+    upper: Optional[datetime]
+
+    @property
+    def is_default(self) -> bool:
+        return self.lower is None
+
+
+# ============================================================
+# 📅 Monats-Helfer
+# ============================================================
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def _bound(month: date) -> str:
+    return f"{month:%Y-%m-%d} 00:00:00+00"
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+# ============================================================
+# 🔍 Bestand
+# ============================================================
+def list_partitions(conn: Connection) -> List[Partition]:
+    rows = conn.execute(text(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+        ORDER BY c.relname
+        """
+    ), {"parent": PARENT})
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match is None:
+            partitions.append(Partition(name, None, None))
+            continue
+        lower, upper = (datetime.fromisoformat(v).astimezone(timezone.utc) for v in match.groups())
+        partitions.append(Partition(name, lower, upper))
+    return partitions
+
+
+def _lock(conn: Connection) -> None:
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+# ============================================================
+# ➕ Partitionen anlegen
+# ============================================================
+def create_partition(conn: Connection, month: date) -> str:
+    name, lower, upper = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    params = {"lower": lower, "upper": upper}
+    stray = conn.scalar(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+        "WHERE created_at >= CAST(:lower AS timestamptz) AND created_at < CAST(:upper AS timestamptz))"
+    ), params)
+    if not stray:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return name
+
+    # Zeilen aus der DEFAULT-Partition umziehen, sonst scheitert das Anhängen
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        "WHERE created_at >= CAST(:lower AS timestamptz) AND created_at < CAST(:upper AS timestamptz) RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), params)
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    return name
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = AUDIT_PARTITIONS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Fehlende Monatspartitionen vom aktuellen Monat bis months_ahead anlegen → angelegte Namen."""
+    _lock(conn)
+    existing = {p.name for p in list_partitions(conn)}
+    current = month_start(today or _today())
+    created = []
+    for n in range(months_ahead + 1):
+        month = add_months(current, n)
+        if partition_name(month) not in existing:
+            created.append(create_partition(conn, month))
+    return created
+
+
+# ============================================================
+# 🗑️ Aufbewahrung
+# ============================================================
+def apply_retention(
+    conn: Connection,
+    keep_months: int = AUDIT_RETENTION_MONTHS,
+    mode: str = AUDIT_RETENTION_MODE,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Partitionen, die komplett vor (aktueller Monat − keep_months) liegen, abhängen bzw. löschen.
+    detach: Tabelle bleibt als eigenständige Tabelle erhalten (Archiv/Export), zählt aber nicht mehr.
+    """
+    if keep_months <= 0:
+        return []
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"unknown retention mode: {mode}")
+    _lock(conn)
+    cutoff = datetime.combine(add_months(month_start(today or _today()), -keep_months), datetime.min.time(), timezone.utc)
+    removed = []
+    for partition in list_partitions(conn):
+        if partition.is_default or partition.upper > cutoff:
+            continue
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {partition.name}"))
+        if mode == "drop":
+            conn.execute(text(f"DROP TABLE {partition.name}"))
+        removed.append(partition.name)
+    # Ausreißer in der DEFAULT-Partition (sollte leer sein) – hier sind Zeilen-DELETEs ok
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"), {"cutoff": cutoff})
+    return removed
+
+
+def maintain(conn: Connection) -> Tuple[List[str], List[str]]:
+    return ensure_partitions(conn), apply_retention(conn)
+
+
+# ============================================================
+# 🔁 Periodisch im Worker (Lifespan)
+# ============================================================
+def _maintain_once() -> None:
+    from app.database import engine
+
+    with engine.begin() as conn:
+        created, removed = maintain(conn)
+    if created or removed:
+        logger.info("audit partitions: created %s, removed %s", created, removed)
+
+
+async def run_maintenance() -> None:
+    """Beim Start und danach alle AUDIT_PARTITION_MAINTENANCE_H Stunden (blockierende DDL im Thread)."""
+    while True:
+        try:
+            await asyncio.to_thread(_maintain_once)
+        except Exception:
+            logger.exception("audit partition maintenance failed")
+        await asyncio.sleep(AUDIT_PARTITION_MAINTENANCE_H * 3600)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Monatspartitionen von audit_logs verwalten")
+    parser.add_argument("command", choices=("list", "maintain"))
+    parser.add_argument("--months-ahead", type=int, default=AUDIT_PARTITIONS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=AUDIT_RETENTION_MONTHS)
+    parser.add_argument("--mode", choices=("detach", "drop"), default=AUDIT_RETENTION_MODE)
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    with engine.begin() as conn:
+        if args.command == "maintain":
+            created = ensure_partitions(conn, args.months_ahead)
+            removed = apply_retention(conn, args.retention_months, args.mode)
+            print(f"➕ angelegt: {', '.join(created) or '–'}")
+            print(f"🗑️ {args.mode}: {', '.join(removed) or '–'}")
+        for partition in list_partitions(conn):
+            rows = conn.scalar(text(f"SELECT count(*) FROM {partition.name}"))
+            span = "DEFAULT" if partition.is_default else f"{partition.lower:%Y-%m-%d} … {partition.upper:%Y-%m-%d}"
+            print(f"{partition.name:<28} {span:<26} {rows:>10} Zeilen")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# app/services/dashboard_counters.py
+"""
+Vorberechnete Dashboard-Zähler (Tabelle dashboard_counters).
+
+Die Werte pflegen Statement-Trigger (Migration a3c1f0d2b7e4) bei jedem INSERT/UPDATE/DELETE/TRUNCATE.
+Hier liegt die Rekonziliation: Zähler komplett neu aufbauen bzw. Abweichungen prüfen.
+
+    python -m app.services.dashboard_counters rebuild
+    python -m app.services.dashboard_counters check     # Exit-Code 1 bei Drift
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Dict, Tuple
+
+from sqlalchemy import Connection, text
+
+# name → (Tabelle, scope-Ausdruck, Bedingung) – muss zu den Triggern der Migration passen
+COUNTERS: Dict[str, Tuple[str, str, str]] = {
+    "employees": ("employees", "''", "true"),
+    "employees_by_department": ("employees", "coalesce(nullif(department, ''), 'Unassigned')", "true"),
+    "vacations_pending": ("vacation_requests", "''", "status = 'pending'"),
+    "time_entries_running": ("time_entries", "''", "end_time IS NULL"),
+    "documents": ("documents", "''", "true"),
+    "reminders_pending": ("reminders", "''", "status = 'pending'"),
+}
+TABLES = sorted({table for table, _, _ in COUNTERS.values()})
+
+Counts = Dict[Tuple[str, str], int]
+
+
+# ============================================================
+# 🧮 Ist- und Soll-Werte
+# ============================================================
+def _fresh_select() -> str:
+    """Soll-Werte direkt aus den Quelltabellen (voller Scan)."""
+    parts = [
+        f"SELECT '{name}' AS name, ({scope})::text AS scope, count(*) AS value FROM {table} WHERE {cond} GROUP BY 2"
+        for name, (table, scope, cond) in COUNTERS.items()
+    ]
+    # Basis-Zeilen auch bei leerer Tabelle (0 statt „fehlt“)
+    parts += [
+        f"SELECT '{name}', '', 0 WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {cond})"
+        for name, (table, scope, cond) in COUNTERS.items()
+        if scope == "''"
+    ]
+    return " UNION ALL ".join(parts)
+
+
+def stored(conn: Connection) -> Counts:
+    rows = conn.execute(text("SELECT name, scope, value FROM dashboard_counters"))
+    return {(name, scope): value for name, scope, value in rows if value}
+
+
+def fresh(conn: Connection) -> Counts:
+    rows = conn.execute(text(_fresh_select()))
+    return {(name, scope): value for name, scope, value in rows if value}
+
+
+# ============================================================
+# 🔧 Rekonziliation
+# ============================================================
+def rebuild(conn: Connection) -> int:
+    """
+    Zähler aus den Quelltabellen neu aufbauen.
+    SHARE-Lock blockiert Schreiber während des Neuaufbaus → kein Delta geht verloren.
+    """
+    conn.execute(text(f"LOCK TABLE {', '.join(TABLES)} IN SHARE MODE"))
+    conn.execute(text("DELETE FROM dashboard_counters"))
+    result = conn.execute(text(
+        f"INSERT INTO dashboard_counters (name, scope, value) SELECT name, scope, value FROM ({_fresh_select()}) AS f"
+    ))
+    return result.rowcount
+
+
+def check(conn: Connection) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """Abweichungen als {(name, scope): (gespeichert, tatsächlich)} – leer = alles konsistent."""
+    have, want = stored(conn), fresh(conn)
+    return {
+        key: (have.get(key, 0), want.get(key, 0))
+        for key in sorted(have.keys() | want.keys())
+        if have.get(key, 0) != want.get(key, 0)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Dashboard-Zähler neu aufbauen oder prüfen")
+    parser.add_argument("command", choices=("rebuild", "check"))
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    with engine.begin() as conn:
+        if args.command == "rebuild":
+            print(f"🧮 {rebuild(conn)} Zähler neu aufgebaut")
+            return 0
+        drift = check(conn)
+
+    for (name, scope), (have, want) in drift.items():
+        print(f"⚠️ {name}[{scope}]: gespeichert {have}, tatsächlich {want}")
+    print("✅ Zähler konsistent" if not drift else f"❌ {len(drift)} Abweichung(en) – 'rebuild' ausführen")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,454 @@
+# app/services/dashboard_service.py
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, DateTime, Integer, String, cast, func, literal, literal_column, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.core.cache import cached
+
+UNASSIGNED = "Unassigned"
+# Tabellen, deren Commit die gecachte Übersicht ungültig macht
+OVERVIEW_TABLES = {"employees", "vacation_requests", "sick_leaves", "time_entries", "documents", "reminders"}
+# Quellen des Mitarbeiter-Dashboards (ETag-Wasserstände)
+EMPLOYEE_DASHBOARD_TABLES = OVERVIEW_TABLES
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ============================================================
+# 🧮 Statements
+# ============================================================
+def _department_key():
+    """NULL und '' zählen beide als 'Unassigned' (wie das frühere `dept or "Unassigned"`)."""
+    return func.coalesce(func.nullif(models.Employee.department, ""), UNASSIGNED)
+
+
+def _department_counts():
+    """SELECT coalesce(nullif(department, ''), 'Unassigned'), count(*) … GROUP BY derselbe Ausdruck"""
+    key = _department_key()
+    return select(key.label("department"), func.count().label("cnt")).group_by(key)
+
+
+def overview_statement(now: datetime):
+    """
+    Alle Dashboard-Kennzahlen in einem Statement (ein Roundtrip statt neun):
+    - Abteilungen als CTE → Gesamtzahl + json_object_agg
+    - Reminder-Zahlen aus einem Scan mit FILTER
+    - übrige Zähler als skalare Subqueries
+    """
+    V, S, T, D, R = (
+        models.VacationRequest, models.SickLeave,
+        models.TimeEntry, models.Document, models.Reminder,
+    )
+    dept = _department_counts().cte("dept")
+
+    reminders = (
+        select(
+            func.count().label("pending_total"),
+            func.count().filter(R.due_at < now).label("overdue"),
+            func.count().filter(R.due_at >= now, R.due_at <= now + timedelta(days=7)).label("due_next_7_days"),
+        )
+        .where(R.status == "pending")
+        .subquery("rem")
+    )
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    return select(
+        select(cast(func.coalesce(func.sum(dept.c.cnt), 0), Integer)).scalar_subquery().label("employees_total"),
+        select(
+            func.coalesce(
+                func.json_object_agg(dept.c.department, dept.c.cnt, type_=JSON),
+                literal_column("'{}'::json"),
+            )
+        ).scalar_subquery().label("by_department"),
+        count(V, V.status == "pending").label("open_vacation_requests"),
+        count(S, S.start_date <= now, S.end_date >= now).label("active_sick_leaves"),
+        count(T, T.end_time.is_(None)).label("active_time_entries"),
+        count(D).label("total_documents"),
+        reminders.c.pending_total,
+        reminders.c.overdue,
+        reminders.c.due_next_7_days,
+    ).select_from(reminders)
+
+
+def counters_statement(now: datetime):
+    """
+    Übersicht aus dashboard_counters (O(1), von Triggern gepflegt) plus günstige Zeitkorrektur:
+    „aktuell krank“ und „überfällig / nächste 7 Tage“ hängen an now() und lassen sich nicht
+    vorzählen → schmale Index-Scans (ix_sick_leaves_end_date_start_date, ix_reminders_pending_due_at).
+    `ready` ist false, solange die Zähler nie aufgebaut wurden.
+    """
+    C, S, R = models.DashboardCounter, models.SickLeave, models.Reminder
+
+    def counter(name: str):
+        return (
+            select(cast(func.coalesce(func.sum(C.value), 0), Integer))
+            .where(C.name == name)
+            .scalar_subquery()
+        )
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    return select(
+        select(C.name).where(C.name == "employees").exists().label("ready"),
+        counter("employees").label("employees_total"),
+        select(
+            func.coalesce(
+                func.json_object_agg(C.scope, C.value, type_=JSON),
+                literal_column("'{}'::json"),
+            )
+        )
+        .where(C.name == "employees_by_department", C.value != 0)
+        .scalar_subquery()
+        .label("by_department"),
+        counter("vacations_pending").label("open_vacation_requests"),
+        count(S, S.end_date >= now, S.start_date <= now).label("active_sick_leaves"),
+        counter("time_entries_running").label("active_time_entries"),
+        counter("documents").label("total_documents"),
+        counter("reminders_pending").label("pending_total"),
+        count(R, R.status == "pending", R.due_at < now).label("overdue"),
+        count(R, R.status == "pending", R.due_at >= now, R.due_at <= now + timedelta(days=7)).label("due_next_7_days"),
+    )
+
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def employee_dashboard_statement(employee_ids: Sequence[str], now: datetime, today: date):
+    """
+    Mitarbeiter-Dashboards für mehrere Business-IDs in einem Statement:
+    Stammdaten als Spalten, je Tabelle eine korrelierte Subquery (Index auf employee_id)
+    – nur die benötigten Spalten, als JSON zusammengebaut statt als ORM-Objekte geladen.
+    """
+    E, D, S, V, T, R = (
+        models.Employee, models.Document, models.SickLeave,
+        models.VacationRequest, models.TimeEntry, models.Reminder,
+    )
+    next_60d = today + timedelta(days=60)
+
+    vacations = (
+        select(
+            func.json_build_object(
+                "open_requests", func.count().filter(V.status == "pending"),
+                "all_statuses", func.coalesce(func.json_agg(V.status), EMPTY_JSON_ARRAY),
+                "upcoming_60_days", func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object("id", V.id, "start_date", V.start_date, "end_date", V.end_date),
+                            V.start_date.asc(),
+                        )
+                    ).filter(V.start_date >= today, V.start_date <= next_60d),
+                    EMPTY_JSON_ARRAY,
+                ),
+                type_=JSON,
+            )
+        )
+        .where(V.employee_id == E.employee_id)
+        .scalar_subquery()
+    )
+
+    reminders = (
+        select(
+            func.json_build_object(
+                "open", func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object("id", R.id, "title", R.title, "due_at", R.due_at),
+                            R.due_at.is_(None).asc(),
+                            R.due_at.asc(),
+                        )
+                    ),
+                    EMPTY_JSON_ARRAY,
+                ),
+                "overdue_count", func.count().filter(R.due_at.isnot(None), R.due_at < now),
+                type_=JSON,
+            )
+        )
+        .where(R.employee_id == E.employee_id, R.status == "pending")
+        .scalar_subquery()
+    )
+
+    return select(
+        E.id, E.employee_id, E.name, E.department, E.email, E.position,
+        select(func.count()).select_from(D).where(D.employee_id == E.employee_id)
+        .scalar_subquery().label("total_documents"),
+        select(S.id).where(S.employee_id == E.employee_id, S.start_date <= now, S.end_date >= now)
+        .exists().label("sick_now"),
+        vacations.label("vacations"),
+        select(T.start_time).where(T.employee_id == E.employee_id, T.end_time.is_(None))
+        .limit(1).scalar_subquery().label("running_start"),
+        reminders.label("reminders"),
+    ).where(E.employee_id.in_(list(employee_ids)))
+
+
+def _iso(value: str | None) -> str | None:
+    """Zeitstempel aus JSON (Postgres-Format) → Python-isoformat wie bisher."""
+    return datetime.fromisoformat(value).isoformat() if value else None
+
+
+def _employee_dashboard(row) -> Dict[str, Any]:
+    return {
+        "employee": {
+            "id": str(row.id),
+            "employee_id": row.employee_id,
+            "name": row.name,
+            "department": row.department,
+            "email": row.email,
+            "position": row.position,
+        },
+        "documents": {"total": row.total_documents},
+        "sick_leave": {"active_now": row.sick_now},
+        "vacations": row.vacations,
+        "time_entries": {"running_start": row.running_start},
+        "reminders": {
+            "open": [dict(r, due_at=_iso(r["due_at"])) for r in row.reminders["open"]],
+            "overdue_count": row.reminders["overdue_count"],
+        },
+    }
+
+
+# Keyset-Cursor für /absences/upcoming: (start_date wie im Item, Rang vacation=0/sick=1, UUID)
+AbsenceCursor = Tuple[str, int, UUID]
+ABSENCE_KINDS = {"vac": 0, "sick": 1}
+
+
+def upcoming_absences_statement(today: date, until: date, limit: int, after: Optional[AbsenceCursor] = None):
+    """
+    Urlaub + Krankmeldungen als UNION ALL, sortiert nach (Start, Art, id) und begrenzt in SQL.
+    Jeder Zweig liefert höchstens `limit` Zeilen (Index auf start_date bzw. end_date),
+    die Kosten hängen an der Seitengröße statt an der Historie. `after` setzt hinter dem letzten Item fort.
+    """
+    E, V, S = models.Employee, models.VacationRequest, models.SickLeave
+    TS = DateTime(timezone=True)
+    v_start = cast(V.start_date, TS)
+
+    vacations = (
+        select(
+            literal(0).label("rank"), V.id, E.employee_id, E.name,
+            func.coalesce(cast(V.status, String), literal("approved")).label("status"),
+            v_start.label("start_at"), cast(V.end_date, TS).label("end_at"),
+        )
+        .join(E, E.employee_id == V.employee_id)
+        .where(V.start_date >= today, V.start_date <= until)
+        .order_by(V.start_date, V.id)
+    )
+    sick = (
+        select(
+            literal(1).label("rank"), S.id, E.employee_id, E.name, literal("sick").label("status"),
+            S.start_date.label("start_at"), S.end_date.label("end_at"),
+        )
+        .join(E, E.employee_id == S.employee_id)
+        .where(S.end_date >= today)
+        .order_by(S.start_date, S.id)
+    )
+
+    if after is not None:
+        start, rank, ident = after
+        cursor = tuple_(cast(literal(start), TS), literal(rank), literal(ident))
+        vacations = vacations.where(
+            V.start_date >= cast(cast(literal(start), TS), Date),  # Index-Range statt Vollscan ab today
+            tuple_(v_start, literal(0), V.id) > cursor,
+        )
+        sick = sick.where(tuple_(S.start_date, literal(1), S.id) > cursor)
+
+    merged = union_all(
+        select(vacations.limit(limit).subquery()),
+        select(sick.limit(limit).subquery()),
+    ).subquery("absences")
+    return select(merged).order_by(merged.c.start_at, merged.c.rank, merged.c.id).limit(limit)
+
+
+def _absence(row) -> Dict[str, Any]:
+    if row.rank == 0:
+        # Urlaub: reine Datumswerte (wie bisher str(date))
+        kind, start, end = "vacation", str(row.start_at.date()), str(row.end_at.date())
+    else:
+        kind, start, end = "sick", str(row.start_at), str(row.end_at)
+    return {
+        "id": f"{'vac' if row.rank == 0 else 'sick'}_{row.id}",
+        "employee_id": row.employee_id,
+        "name": row.name,
+        "type": kind,
+        "status": row.status,
+        "start_date": start,
+        "end_date": end,
+    }
+
+
+def parse_absence_cursor(after: str) -> AbsenceCursor:
+    """'<start_date>,<id>' des letzten Items → Cursor (ValueError bei Unsinn)."""
+    start, _, item_id = after.partition(",")
+    kind, _, ident = item_id.partition("_")
+    if not start or kind not in ABSENCE_KINDS:
+        raise ValueError(after)
+    datetime.fromisoformat(start)  # nur validieren – Postgres castet den Originaltext
+    return start, ABSENCE_KINDS[kind], UUID(ident)
+
+
+CALENDAR_MAX_DAYS = 92
+
+
+def calendar_statement(date_from: date, date_to: date, department: Optional[str] = None):
+    """
+    Team-Kalender: pro Tag Anzahl + Liste der Abwesenden.
+    Eine Überlappungs-Query je Quelle (&& auf die GiST-Indizes ix_vacation_requests_period /
+    ix_sick_leaves_period) – auch bereits laufende Abwesenheiten – danach Join gegen generate_series.
+    Krankmeldungen (Zeitstempel) zählen für jeden UTC-Tag, den sie berühren.
+    """
+    E, V, S = models.Employee, models.VacationRequest, models.SickLeave
+    TS = DateTime(timezone=True)
+    from_ts = datetime.combine(date_from, datetime.min.time(), tzinfo=timezone.utc)
+    until_ts = from_ts + timedelta(days=(date_to - date_from).days + 1)
+
+    vacations = (
+        select(
+            E.employee_id, E.name, literal("vacation").label("type"),
+            cast(V.status, String).label("status"),
+            V.start_date.label("first_day"), func.greatest(V.start_date, V.end_date).label("last_day"),
+        )
+        .join(E, E.employee_id == V.employee_id)
+        .where(
+            models.VACATION_PERIOD.op("&&")(func.daterange(date_from, date_to, literal_column("'[]'"))),
+            V.status != models.VacationStatus.rejected,
+        )
+    )
+    sick = (
+        select(
+            E.employee_id, E.name, literal("sick").label("type"), literal("sick").label("status"),
+            cast(func.timezone("UTC", S.start_date), Date).label("first_day"),
+            cast(func.timezone("UTC", func.greatest(S.start_date, S.end_date)), Date).label("last_day"),
+        )
+        .join(E, E.employee_id == S.employee_id)
+        .where(models.SICK_LEAVE_PERIOD.op("&&")(func.tstzrange(from_ts, until_ts, literal_column("'[)'"))))
+    )
+    if department is not None:
+        vacations = vacations.where(E.department == department)
+        sick = sick.where(E.department == department)
+
+    absences = union_all(vacations, sick).cte("absences")
+    days = (
+        select(
+            cast(
+                func.generate_series(cast(date_from, TS), cast(date_to, TS), literal_column("interval '1 day'")),
+                Date,
+            ).label("day")
+        ).subquery("days")
+    )
+    a = absences.c
+    return (
+        select(
+            days.c.day,
+            func.count(func.distinct(a.employee_id)).label("total"),
+            func.count().filter(a.type == "vacation").label("vacation"),
+            func.count().filter(a.type == "sick").label("sick"),
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "employee_id", a.employee_id, "name", a.name, "type", a.type, "status", a.status,
+                        ),
+                        a.name, a.employee_id, a.type,
+                    )
+                ).filter(a.employee_id.isnot(None)),
+                EMPTY_JSON_ARRAY,
+            ).label("out"),
+        )
+        .select_from(days.outerjoin(absences, days.c.day.between(a.first_day, a.last_day)))
+        .group_by(days.c.day)
+        .order_by(days.c.day)
+    )
+
+
+# ============================================================
+# 📊 Öffentliche Funktionen
+# ============================================================
+@cached("dashboard.overview", ttl=30, tags=OVERVIEW_TABLES)
+async def get_overview(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Gesamtübersicht für /dashboard/overview (gleiches JSON wie bisher, 1 Query).
+    Liest die vorberechneten Zähler; fehlen sie (Zähler nie aufgebaut), einmalig die volle Aggregation.
+    Gecacht (30 s, invalidiert bei Writes) – /dashboard/overview und /hr/overview teilen sich den Eintrag;
+    generated_at zeigt, wie alt die Zahlen sind.
+    """
+    now = now_utc()
+    row = (await db.execute(counters_statement(now))).one()
+    if not row.ready:
+        row = (await db.execute(overview_statement(now))).one()
+
+    return {
+        "employees": {"total": row.employees_total, "by_department": dict(row.by_department)},
+        "vacations": {"open_requests": row.open_vacation_requests},
+        "sick_leaves": {"active_now": row.active_sick_leaves},
+        "time_entries": {"active_now": row.active_time_entries},
+        "documents": {"total": row.total_documents},
+        "reminders": {
+            "pending_total": row.pending_total,
+            "overdue": row.overdue,
+            "due_next_7_days": row.due_next_7_days,
+        },
+        "generated_at": now.isoformat(),
+    }
+
+
+async def get_department_counts(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Nur die Abteilungsverteilung (/hr/stats/departments) – ohne die restlichen Zähler."""
+    C = models.DashboardCounter
+    rows = (
+        await db.execute(
+            select(C.scope, cast(C.value, Integer))
+            .where(C.name == "employees_by_department", C.value != 0)
+            .order_by(C.scope)
+        )
+    ).all()
+    if not rows:
+        # Zähler nicht aufgebaut (oder keine Mitarbeitenden) → direkt zählen
+        rows = (await db.execute(_department_counts())).all()
+    return [{"department": dept, "count": cnt} for dept, cnt in rows]
+
+
+async def get_employee_dashboards(db: AsyncSession, employee_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Dashboards für mehrere Mitarbeitende (1 Query) → {employee_id: dashboard}; Unbekannte fehlen im Dict."""
+    if not employee_ids:
+        return {}
+    rows = (await db.execute(employee_dashboard_statement(employee_ids, now_utc(), date.today()))).all()
+    return {row.employee_id: _employee_dashboard(row) for row in rows}
+
+
+@cached("dashboard.absences_upcoming", ttl=60, tags={"vacation_requests", "sick_leaves", "employees"})
+async def get_upcoming_absences(
+    db: AsyncSession, days: int = 30, limit: int = 20, after: Optional[AbsenceCursor] = None
+) -> List[Dict[str, Any]]:
+    """Kommende Abwesenheiten (Urlaub + Krank), eine Seite, 1 Query."""
+    today = date.today()
+    rows = (await db.execute(upcoming_absences_statement(today, today + timedelta(days=days), limit, after))).all()
+    return [_absence(row) for row in rows]
+
+
+@cached("dashboard.calendar", ttl=60, tags={"vacation_requests", "sick_leaves", "employees"})
+async def get_calendar(
+    db: AsyncSession, date_from: date, date_to: date, department: Optional[str] = None
+) -> Dict[str, Any]:
+    """Abwesenheitskalender [date_from, date_to] (inkl.), optional je Abteilung – 1 Query."""
+    rows = (await db.execute(calendar_statement(date_from, date_to, department))).all()
+    days = [
+        {"date": str(r.day), "total": r.total, "vacation": r.vacation, "sick": r.sick, "out": r.out}
+        for r in rows
+    ]
+    return {
+        "from": str(date_from),
+        "to": str(date_to),
+        "department": department,
+        "employees_out": len({p["employee_id"] for d in days for p in d["out"]}),
+        "days": days,
+    }
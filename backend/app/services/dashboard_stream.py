@@ -0,0 +1,237 @@
+# app/services/dashboard_stream.py
+"""
+Live-Updates fürs Dashboard per Server-Sent Events.
+
+Der Change-Bus (app/core/changes.py) meldet Commits; der Broadcaster sammelt sie kurz (Debounce),
+rechnet die Übersicht bzw. die betroffenen Mitarbeiter-Dashboards EINMAL neu und schickt allen
+verbundenen Clients nur die geänderten Felder. Hunderte offene Tabs kosten damit eine Berechnung
+pro Änderung statt einer pro Poll-Intervall.
+
+Events:
+    snapshot  – vollständiger Stand direkt nach dem Verbinden
+    overview  – {"changes": {...}, "generated_at": ...}
+    employee  – {"employee_id": ..., "changes": {...}}
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from app.core import changes
+from app.services import dashboard_service
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ⚙️ Konfiguration
+# ============================================================
+STREAM_DEBOUNCE_S = int(os.getenv("DASHBOARD_STREAM_DEBOUNCE_MS", "250")) / 1000
+STREAM_HEARTBEAT_S = float(os.getenv("DASHBOARD_STREAM_HEARTBEAT_S", "15"))
+# Clients, die so viele Events nicht abholen, werden getrennt (Reconnect → frischer Snapshot)
+STREAM_CLIENT_BACKLOG = int(os.getenv("DASHBOARD_STREAM_CLIENT_BACKLOG", "100"))
+
+STREAM_TABLES = dashboard_service.OVERVIEW_TABLES  # employees, reminders, vacations, sick leaves, …
+VOLATILE_KEYS = {"generated_at"}
+
+
+# ============================================================
+# 🧮 Deltas + SSE-Format
+# ============================================================
+def diff(old: Any, new: Any) -> Dict[str, Any]:
+    """Geänderte Felder (rekursiv für Dicts, Listen als Ganzes) – leer = nichts geändert."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {} if old == new else new
+    delta: Dict[str, Any] = {}
+    for key in new.keys() | old.keys():
+        if key in VOLATILE_KEYS:
+            continue
+        if key not in new:
+            delta[key] = None
+        elif key not in old:
+            delta[key] = new[key]
+        elif isinstance(old[key], dict) and isinstance(new[key], dict):
+            nested = diff(old[key], new[key])
+            if nested:
+                delta[key] = nested
+        elif old[key] != new[key]:
+            delta[key] = new[key]
+    return delta
+
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+# ============================================================
+# 📡 Broadcaster
+# ============================================================
+@dataclass(eq=False)
+class StreamClient:
+    employee_id: Optional[str] = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=STREAM_CLIENT_BACKLOG))
+    closed: bool = False
+
+
+class DashboardBroadcaster:
+    """Ein Broadcaster pro Worker; gebunden an dessen Event-Loop."""
+
+    def __init__(self, session_factory: Optional[Callable] = None, debounce_s: float = STREAM_DEBOUNCE_S):
+        self._session_factory = session_factory
+        self.debounce_s = debounce_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Set[StreamClient] = set()
+        self._pending: Optional[changes.Change] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._overview: Optional[Dict[str, Any]] = None
+        self._employees: Dict[str, Dict[str, Any]] = {}
+        self.computations = 0  # Neuberechnungen (für Tests / Monitoring)
+
+    # ---------- Lebenszyklus ----------
+    def _session(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # neuer Loop (Worker-Neustart, Tests) → alten Zustand verwerfen
+        self._loop, self._clients, self._pending, self._flush_task = loop, set(), None, None
+        self._overview, self._employees = None, {}
+        changes.subscribe(self._on_change)
+
+    async def close(self) -> None:
+        """Alle Streams beenden (Worker-Shutdown)."""
+        for client in list(self._clients):
+            self._close(client)
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        changes.unsubscribe(self._on_change)
+        self._loop = None
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    # ---------- Clients ----------
+    async def connect(self, employee_id: Optional[str] = None) -> StreamClient:
+        self._bind()
+        client = StreamClient(employee_id=employee_id)
+        async with self._session() as db:
+            overview = await dashboard_service.get_overview(db)
+            snapshot: Dict[str, Any] = {"overview": overview}
+            if employee_id:
+                dashboards = await dashboard_service.get_employee_dashboards(db, [employee_id])
+                snapshot["employee"] = dashboards.get(employee_id)
+                if employee_id in dashboards:
+                    self._employees[employee_id] = dashboards[employee_id]
+        if self._overview is None:
+            self._overview = overview
+        self._clients.add(client)
+        self._send(client, "snapshot", snapshot)
+        return client
+
+    def disconnect(self, client: StreamClient) -> None:
+        self._clients.discard(client)
+        client.closed = True
+        if client.employee_id and not any(c.employee_id == client.employee_id for c in self._clients):
+            self._employees.pop(client.employee_id, None)
+
+    def _close(self, client: StreamClient) -> None:
+        self.disconnect(client)
+        try:
+            client.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass  # Stream-Loop sieht client.closed beim nächsten Heartbeat
+
+    def _send(self, client: StreamClient, event: str, data: Any) -> None:
+        try:
+            client.queue.put_nowait(format_event(event, data))
+        except asyncio.QueueFull:
+            logger.info("dashboard stream client too slow – disconnecting")
+            self._close(client)
+
+    # ---------- Änderungen ----------
+    def _on_change(self, change: changes.Change) -> None:
+        # Commit kann aus einem anderen Thread kommen (Sync-Sessions) → in den Loop übergeben
+        loop = self._loop
+        if loop is None or loop.is_closed() or not (change.tables & STREAM_TABLES):
+            return
+        try:
+            loop.call_soon_threadsafe(self._schedule, change)
+        except RuntimeError:
+            pass  # Loop wird gerade beendet
+
+    def _schedule(self, change: changes.Change) -> None:
+        if self._pending is None:
+            self._pending = changes.Change(set(change.tables), None if change.employee_ids is None else set(change.employee_ids))
+        else:
+            self._pending.merge(change)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # Commits während flush() landen wieder in _pending (der Task läuft noch, _schedule startet keinen
+        # neuen) → weiterrechnen, bis nichts mehr offen ist
+        while self._pending is not None:
+            await asyncio.sleep(self.debounce_s)
+            change, self._pending = self._pending, None
+            if not self._clients:
+                return
+            try:
+                await self.flush(change)
+            except Exception:
+                logger.exception("dashboard stream update failed")
+
+    async def flush(self, change: changes.Change) -> None:
+        """Neu berechnen + Deltas verteilen (eine Berechnung für alle Clients)."""
+        subscribed = {c.employee_id for c in self._clients if c.employee_id}
+        targets = subscribed if change.employee_ids is None else subscribed & change.employee_ids
+
+        async with self._session() as db:
+            overview = await dashboard_service.get_overview(db)
+            dashboards = await dashboard_service.get_employee_dashboards(db, sorted(targets)) if targets else {}
+        self.computations += 1
+
+        delta = diff(self._overview or {}, overview)
+        self._overview = overview
+        if delta:
+            payload = {"changes": delta, "generated_at": overview.get("generated_at")}
+            for client in list(self._clients):
+                self._send(client, "overview", payload)
+
+        for employee_id, dashboard in dashboards.items():
+            delta = diff(self._employees.get(employee_id, {}), dashboard)
+            self._employees[employee_id] = dashboard
+            if not delta:
+                continue
+            for client in [c for c in self._clients if c.employee_id == employee_id]:
+                self._send(client, "employee", {"employee_id": employee_id, "changes": delta})
+
+    # ---------- SSE ----------
+    async def events(self, client: StreamClient, is_disconnected: Callable) -> AsyncIterator[str]:
+        """Event-Strings für StreamingResponse; Heartbeat-Kommentar hält Proxies offen."""
+        try:
+            yield "retry: 5000\n\n"
+            while not client.closed or not client.queue.empty():
+                try:
+                    message = await asyncio.wait_for(client.queue.get(), STREAM_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.disconnect(client)
+
+
+broadcaster = DashboardBroadcaster()
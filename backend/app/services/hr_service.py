@@ -7,22 +7,23 @@ import json
 from datetime import datetime, timezone
 from typing import Any, Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
 
 from app import models
-from app.routers.dashboard import get_dashboard_overview
-from app.core.audit import log_action
+from app.services import dashboard_service
+from app.core.audit import HR_RESOURCE_TYPES, details_text, log_action
 
 
 # ============================================================
 # 🧭 HR Overview (Dashboard Subset)
 # ============================================================
-def get_hr_overview(db: Session):
+async def get_hr_overview(db: AsyncSession):
     """
-    Aggregiert HR-relevante Kennzahlen basierend auf dem Dashboard-Endpoint.
+    Aggregiert HR-relevante Kennzahlen aus den vorberechneten Dashboard-Zählern (1 Query).
     """
-    data = get_dashboard_overview(db)
+    data = await dashboard_service.get_overview(db)
 
     return {
         "employees_total": data["employees"]["total"],
@@ -39,10 +40,15 @@ def get_hr_overview(db: Session):
     }
 
 
+async def get_department_stats(db: AsyncSession):
+    """Mitarbeiter pro Abteilung – nur das GROUP BY, nicht die ganze Übersicht."""
+    return await dashboard_service.get_department_counts(db)
+
+
 # ============================================================
 # 📤 HR Report Export (CSV / JSON)
 # ============================================================
-def export_hr_report(db: Session, user: dict, format: str = "csv"):
+async def export_hr_report(db: AsyncSession, user: dict, format: str = "csv"):
     """
     Erstellt einen vollständigen HR-Report mit allen Kern-Tabellen und zugehörigen Audit-Einträgen.
     - Employees, Vacations, SickLeaves, Reminders
@@ -53,23 +59,20 @@ def export_hr_report(db: Session, user: dict, format: str = "csv"):
     # ------------------------------
     # 🧾 Datensammlung
     # ------------------------------
-    employees = db.query(models.Employee).all()
-    vacations = db.query(models.VacationRequest).all()
-    sick_leaves = db.query(models.SickLeave).all()
-    reminders = db.query(models.Reminder).all()
+    employees = (await db.scalars(select(models.Employee))).all()
+    vacations = (await db.scalars(select(models.VacationRequest))).all()
+    sick_leaves = (await db.scalars(select(models.SickLeave))).all()
+    reminders = (await db.scalars(select(models.Reminder))).all()
 
     # 🔍 HR-bezogene Audit-Logs abrufen
     hr_audits = (
-        db.query(models.AuditLog)
-        .filter(
-            models.AuditLog.resource.ilike("hr_%")
-            | models.AuditLog.resource.ilike("document:%")
-            | models.AuditLog.resource.ilike("reminder:%")
+        await db.scalars(
+            select(models.AuditLog)
+            .where(models.AuditLog.resource_type.in_(HR_RESOURCE_TYPES))
+            .order_by(models.AuditLog.created_at.desc())
+            .limit(100)
         )
-        .order_by(models.AuditLog.created_at.desc())
-        .limit(100)
-        .all()
-    )
+    ).all()
 
     # ------------------------------
     # 📊 Datenstruktur
@@ -116,7 +119,7 @@ def export_hr_report(db: Session, user: dict, format: str = "csv"):
                 "employee_id": r.employee_id,
                 "status": r.status,
                 "title": r.title,
-                "due_date": r.due_date,
+                "due_date": r.due_at,
             }
             for r in reminders
         ],
@@ -137,7 +140,7 @@ def export_hr_report(db: Session, user: dict, format: str = "csv"):
     # ------------------------------
     # 🪵 Audit-Log: Export-Aktion speichern
     # ------------------------------
-    log_action(
+    await log_action(
         db=db,
         user=user,
         action="hr_export",
@@ -151,7 +154,7 @@ def export_hr_report(db: Session, user: dict, format: str = "csv"):
             "audits": len(hr_audits),
         },
     )
-    db.commit()
+    await db.commit()
 
     # ------------------------------
     # 📤 JSON Export
@@ -187,7 +190,7 @@ def export_hr_report(db: Session, user: dict, format: str = "csv"):
             a.role,
             a.action,
             a.resource,
-            a.details,
+            details_text(a.details),
             a.created_at,
         ])
 
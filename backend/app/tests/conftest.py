@@ -0,0 +1,96 @@
+# app/tests/conftest.py
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from sqlalchemy import delete
+
+from app.core.query_budget import capture_queries
+
+
+def make_test_user(role: str, email: str = ""):
+    """Simulierter User für den X-Test-User Header"""
+    return json.dumps({
+        "email": email or f"{role}@kit-it-koblenz.de",
+        "role": role,
+        "department": role,
+        "preferred_username": role.capitalize(),
+        "employee_id": f"KIT-{role.upper()}",
+    })
+
+
+def make_signing_key(kid: str):
+    """RSA-Schlüsselpaar → (private key, JWK wie von Keycloak ausgeliefert)"""
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private.public_key()))
+    return private, {**jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+def make_bearer_token(private, kid: str, email: str = "", minutes: int = 5, **extra) -> str:
+    """Signierter Access-Token (RS256) mit dem Issuer aus app/core/auth.py"""
+    from app.core.auth import OIDC_ISSUER
+
+    claims = {
+        "iss": OIDC_ISSUER,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=minutes),
+        **({"email": email} if email else {}),
+        **extra,
+    }
+    return jwt.encode(claims, private, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Zählt alle SQL-Statements im with-Block (auch aus dem TestClient-Thread):
+
+        with query_counter() as q:
+            client.get("/documents/")
+        q.assert_max(2)
+    """
+    return capture_queries
+
+
+@pytest.fixture
+def make_employee():
+    """
+    Legt eigene Mitarbeitende an statt auf Seed-Daten zu bauen; nach dem Test wieder weg
+    (abhängige Zeilen per ON DELETE CASCADE):
+
+        employee = make_employee(department="")
+        client.get(f"/dashboard/employee/{employee.employee_id}")
+    """
+    from app import models
+    from app.database import SessionLocal
+
+    created = []
+
+    def factory(**fields) -> models.Employee:
+        tag, now = uuid.uuid4().hex[:8], datetime.now(timezone.utc)
+        fields = {
+            "name": f"Test {tag}",
+            "email": f"test.{tag}@kit-it-koblenz.de",
+            "employee_id": f"KIT-T{tag.upper()}",
+            "start_date": date(2024, 1, 1),
+            # per Alembic angelegte Schemas haben keinen Server-Default für created/updated
+            "created": now,
+            "updated": now,
+            **fields,
+        }
+        with SessionLocal(expire_on_commit=False) as db:
+            employee = models.Employee(**fields)
+            db.add(employee)
+            db.commit()
+        created.append(employee.id)
+        return employee
+
+    yield factory
+
+    if created:
+        with SessionLocal() as db:
+            db.execute(delete(models.Employee).where(models.Employee.id.in_(created)))
+            db.commit()
@@ -0,0 +1,159 @@
+# app/tests/test_audit_export.py
+import asyncio
+import csv
+import gzip
+import io
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, text
+
+from app import models
+from app.core.audit import log_action
+from app.database import AsyncSessionLocal, engine
+from app.main import app
+from app.services.audit_export import CSV_HEADER, encode_csv, fetch_batches
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+
+
+async def _synthetic_batches(rows: int, batch_size: int = 5000):
+    """Wie fetch_batches, nur ohne DB: ein Batch wird immer wieder geliefert (Generator hält nichts fest)."""
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    batch = [
+        (created_at + timedelta(seconds=n), f"user{n % 500}@kit-it-koblenz.de", "hr", "update",
+         f"document:{uuid.UUID(int=n)}", {"employee_id": f"KIT-{n:04d}", "n": n} if n % 10 == 0 else None)
+        for n in range(batch_size)
+    ]
+    for start in range(0, rows, batch_size):
+        yield batch[: rows - start]
+
+
+def _peak_while_streaming(rows: int, compress: bool):
+    async def consume():
+        size = 0
+        async for chunk in encode_csv(_synthetic_batches(rows), compress=compress):
+            size += len(chunk)  # wie ein Client: senden und vergessen
+        return size
+
+    tracemalloc.start()
+    try:
+        size = asyncio.run(consume())
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# 📈 Nur der Encoder (synthetische Batches): 1 Mio. Zeilen, Spitzenverbrauch hängt an der Batchgröße
+def test_csv_encoding_memory_is_flat_for_a_million_rows():
+    small_size, small_peak = _peak_while_streaming(100_000, compress=False)
+    size, peak = _peak_while_streaming(1_000_000, compress=False)
+    assert size > 9 * small_size and size > 90_000_000  # ~95 MB CSV …
+    assert peak < 8_000_000  # … bei wenigen MB Spitze
+    assert peak < small_peak * 1.2  # 10× Zeilen, nicht 10× Speicher
+
+    gz_size, gz_peak = _peak_while_streaming(100_000, compress=True)
+    assert gz_size < small_size / 4 and gz_peak < 8_000_000
+
+
+def _seed_series(email: str, rows: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO audit_logs (id, user_email, role, action, resource, resource_type, resource_id, details, created_at) "
+            "SELECT gen_random_uuid(), :email, 'hr', 'update', 'document:' || g, 'document', g::text, "
+            "       CASE WHEN g % 10 = 0 THEN jsonb_build_object('employee_id', 'KIT-' || g) END, "
+            "       now() - make_interval(secs => g) "
+            "FROM generate_series(1, :rows) AS g"
+        ), {"email": email, "rows": rows})
+
+
+def _peak_while_fetching(email: str):
+    """Zeilen über fetch_batches (serverseitiger Cursor) holen; nebenbei prüfen, dass Postgres wirklich FETCHt."""
+    async def consume():
+        rows, fetching = 0, False
+        async for batch in fetch_batches([models.AuditLog.user_email == email], batch_size=2000):
+            rows += len(batch)
+            if not fetching:
+                # libpq-Puffer sieht tracemalloc nicht → Nachweis von der Serverseite: offener Cursor, FETCH je Batch
+                with engine.connect() as conn:
+                    fetching = bool(conn.scalar(text(
+                        "SELECT count(*) FROM pg_stat_activity WHERE query LIKE 'FETCH FORWARD 2000 FROM%'"
+                    )))
+        return rows, fetching
+
+    tracemalloc.start()
+    try:
+        rows, fetching = asyncio.run(consume())
+        return rows, fetching, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# 🗄️ fetch_batches gegen die DB: 200k Zeilen aus generate_series, Spitze wie bei 20k
+def test_fetch_batches_memory_is_flat_against_the_db():
+    small, big = (f"{name}.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de" for name in ("stream-small", "stream-big"))
+    _seed_series(small, 20_000)
+    _seed_series(big, 200_000)
+    try:
+        small_rows, _, small_peak = _peak_while_fetching(small)
+        rows, fetching, peak = _peak_while_fetching(big)
+        assert (small_rows, rows) == (20_000, 200_000)
+        assert fetching  # serverseitiger Cursor, nicht alles auf einmal im Client
+        assert peak < 8_000_000 and peak < small_peak * 1.5
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(models.AuditLog).where(models.AuditLog.user_email.in_([small, big])))
+
+
+def test_encoded_csv_roundtrip():
+    async def collect(compress):
+        return b"".join([chunk async for chunk in encode_csv(_synthetic_batches(5, batch_size=2), compress=compress)])
+
+    plain = asyncio.run(collect(False))
+    assert gzip.decompress(asyncio.run(collect(True))) == plain
+    rows = list(csv.reader(io.StringIO(plain.decode())))
+    assert tuple(rows[0]) == CSV_HEADER and len(rows) == 6
+    assert rows[1][5] == '{"employee_id": "KIT-0000", "n": 0}' and rows[2][5] == ""
+
+
+# 📤 Endpoint: gleiche Filter wie /admin/audits, gzip, eigener Export-Eintrag nicht im Ergebnis
+def test_export_endpoint_streams_filtered_rows():
+    email = f"export.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de"
+    actor = {"email": email, "role": "hr"}
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            for n in range(3):
+                await log_action(db, actor, "update", f"document:{n}", {"n": n})
+            await log_action(db, actor, "hr_export", "hr_reports", {"format": "csv"})
+            await db.commit()
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email))
+            await db.commit()
+
+    asyncio.run(seed())
+    try:
+        admin = {"X-Test-User": make_test_user("admin", email=email)}
+        res = client.get("/admin/audits/export", params={"user_email": email, "resource": "document", "gzip": "true"},
+                         headers=admin)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/gzip"
+        assert res.headers["content-disposition"].endswith("audit_logs.csv.gz")
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(res.content).decode())))
+        assert [r["resource"] for r in rows] == ["document:2", "document:1", "document:0"]
+
+        res = client.get("/admin/audits/export", params={"user_email": email}, headers=admin)
+        assert res.headers["content-type"].startswith("text/csv")
+        resources = [r["resource"] for r in csv.DictReader(io.StringIO(res.text))]
+        # 4 eigene + der erste Export; der Eintrag dieses Exports liegt hinter dem Stichzeitpunkt
+        assert len(resources) == 5 and resources.count("admin_audits") == 1
+
+        res = client.get("/admin/audits/export", params={"user_email": email, "date_to": "2000-01-01"}, headers=admin)
+        assert res.status_code == 404
+    finally:
+        asyncio.run(cleanup())
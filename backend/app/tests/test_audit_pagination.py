@@ -0,0 +1,76 @@
+# app/tests/test_audit_pagination.py
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app import models
+from app.core import audit
+from app.core.audit import decode_cursor, encode_cursor
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+ADMIN = {"X-Test-User": make_test_user("admin")}
+
+
+def test_cursor_roundtrip():
+    created, audit_id = datetime(2026, 10, 18, 9, 30, 1, 123456, tzinfo=timezone.utc), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created, audit_id)) == (created, audit_id)
+
+
+# 📜 Seiten über next_cursor: lückenlos, ohne Doppelte – auch bei gleichem created_at
+def test_cursor_pages_cover_all_entries(monkeypatch):
+    email = f"pages.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de"
+    base = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=5)
+    # 3 Paare mit identischem Zeitstempel → Reihenfolge entscheidet die id
+    stamps = [base + timedelta(seconds=n // 2) for n in range(7)]
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                models.AuditLog(id=uuid.uuid4(), user_email=email, role="admin", action="hr_sync",
+                                resource=f"hr_page_{n}", resource_type="hr", resource_id=f"page_{n}", created_at=ts)
+                for n, ts in enumerate(stamps)
+            ])
+            await db.commit()
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email))
+            await db.commit()
+
+    asyncio.run(seed())
+    try:
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"user_email": email, "limit": 3, "count": "none", **({"cursor": cursor} if cursor else {})}
+            data = client.get("/admin/audits", params=params, headers=ADMIN).json()
+            seen += [(i["created_at"], i["id"]) for i in data["items"]]
+            pages += 1
+            cursor = data["next_cursor"]
+            assert data["total"] is None
+            if cursor is None:
+                break
+        assert pages == 3 and len(seen) == 7 and len(set(seen)) == 7
+        assert seen == sorted(seen, reverse=True)
+
+        data = client.get("/admin/audits", params={"user_email": email, "limit": 7, "count": "exact"}, headers=ADMIN).json()
+        assert data["total"] == 7 and data["next_cursor"] is None  # volle letzte Seite → kein Cursor
+
+        monkeypatch.setattr(audit, "AUDIT_COUNT_CAP", 5)
+        data = client.get("/admin/audits", params={"user_email": email, "limit": 2}, headers=ADMIN).json()
+        assert (data["total"], data["total_capped"]) == (5, True)
+    finally:
+        asyncio.run(cleanup())
+
+
+def test_invalid_cursor_is_rejected():
+    res = client.get("/admin/audits", params={"cursor": "not-a-cursor"}, headers=ADMIN)
+    assert res.status_code == 400
+    res = client.get("/hr/audits", params={"cursor": encode_cursor(datetime.now(timezone.utc), uuid.uuid4())},
+                     headers={"X-Test-User": make_test_user("hr")})
+    assert res.status_code == 200
@@ -0,0 +1,71 @@
+# app/tests/test_audit_partitions.py
+import uuid
+from datetime import date
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.core.audit import created_between
+from app.database import engine
+from app.services import audit_partitions as ap
+
+# Alles in einer Transaktion mit Rollback – DDL ist in Postgres transaktional
+
+
+def _insert(conn, created_at: str) -> None:
+    conn.execute(text(
+        "INSERT INTO audit_logs (id, user_email, role, action, resource, resource_type, created_at) "
+        "VALUES (:id, 'partition@kit-it-koblenz.de', 'admin', 'hr_sync', 'hr_partition_test', 'hr', CAST(:ts AS timestamptz))"
+    ), {"id": uuid.uuid4(), "ts": created_at})
+
+
+def _count(conn, table: str) -> int:
+    return conn.scalar(text(f"SELECT count(*) FROM {table} WHERE resource = 'hr_partition_test'"))
+
+
+# ➕ Künftige Monate anlegen; Zeilen aus der DEFAULT-Partition ziehen mit um
+def test_ensure_partitions_creates_months_and_moves_stray_rows():
+    with engine.connect() as conn, conn.begin() as tx:
+        _insert(conn, "2031-03-10 12:00:00+00")  # noch keine Partition → DEFAULT
+        assert _count(conn, ap.DEFAULT_PARTITION) == 1
+
+        created = ap.ensure_partitions(conn, months_ahead=2, today=date(2031, 1, 20))
+        assert created == ["audit_logs_2031_01", "audit_logs_2031_02", "audit_logs_2031_03"]
+        assert _count(conn, "audit_logs_2031_03") == 1 and _count(conn, ap.DEFAULT_PARTITION) == 0
+        assert ap.ensure_partitions(conn, months_ahead=2, today=date(2031, 1, 20)) == []
+
+        march = next(p for p in ap.list_partitions(conn) if p.name == "audit_logs_2031_03")
+        assert (march.lower.month, march.upper.month) == (3, 4)
+        tx.rollback()
+
+
+# 🗑️ Aufbewahrung: ganze Partitionen abhängen bzw. löschen, keine Zeilen-DELETEs
+def test_retention_detaches_or_drops_whole_months():
+    with engine.connect() as conn, conn.begin() as tx:
+        ap.create_partition(conn, date(2001, 1, 1))
+        ap.create_partition(conn, date(2001, 2, 1))
+        _insert(conn, "2001-01-15 08:00:00+00")
+
+        assert ap.apply_retention(conn, keep_months=0, today=date(2001, 4, 1)) == []  # 0 = alles behalten
+        removed = ap.apply_retention(conn, keep_months=2, mode="detach", today=date(2001, 4, 1))
+        assert removed == ["audit_logs_2001_01"]  # Februar liegt noch im Fenster
+        names = {p.name for p in ap.list_partitions(conn)}
+        assert "audit_logs_2001_01" not in names and "audit_logs_2001_02" in names
+        assert _count(conn, "audit_logs_2001_01") == 1  # abgehängt, aber als Archiv-Tabelle erhalten
+
+        assert ap.apply_retention(conn, keep_months=1, mode="drop", today=date(2001, 4, 1)) == ["audit_logs_2001_02"]
+        assert conn.scalar(text("SELECT to_regclass('audit_logs_2001_02')")) is None
+        tx.rollback()
+
+
+# 🔍 Zeitraum-Filter → Postgres liest nur die Partition des Monats
+def test_date_range_prunes_partitions():
+    stmt = select(models.AuditLog).where(*created_between(date(2026, 10, 1), date(2026, 10, 31)))
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = "\n".join(conn.scalars(text(f"EXPLAIN {sql}")))
+        unbounded = "\n".join(conn.scalars(text("EXPLAIN SELECT * FROM audit_logs")))
+    assert "audit_logs_2026_10" in plan
+    assert "audit_logs_2026_09" not in plan and "audit_logs_2026_11" not in plan
+    assert "audit_logs_2026_11" in unbounded
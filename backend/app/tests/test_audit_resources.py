@@ -0,0 +1,167 @@
+# app/tests/test_audit_resources.py
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app import models
+from app.core.audit import build_entry, log_action, split_resource
+from app.core.cache import cache
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+
+
+def test_split_resource():
+    assert split_resource("document:3fd7468e") == ("document", "3fd7468e")
+    assert split_resource("sick_leave:42") == ("sick_leave", "42")  # ':' vor '_'
+    assert split_resource(" Reminder:7 ") == ("reminder", "7")
+    assert split_resource("hr_reports") == ("hr", "reports")
+    assert split_resource("/hr/audits") == ("route", "/hr/audits")
+    assert split_resource("document") == ("document", None)
+
+
+# 🔎 log_action schreibt resource_type/resource_id, Endpoints filtern per Gleichheit
+def test_audit_endpoints_use_structured_columns():
+    email = f"Resource.{uuid.uuid4().hex[:8]}@KIT-IT-Koblenz.de"
+    doc_id = str(uuid.uuid4())
+    actor = {"email": email, "role": "hr"}
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await log_action(db, actor, "upload", f"document:{doc_id}", {"n": 1})
+            await log_action(db, actor, "hr_export", "hr_reports")
+            await log_action(db, actor, "hr_export", "admin_audits")
+            await db.commit()
+            rows = (await db.scalars(select(models.AuditLog).where(models.AuditLog.user_email == email.lower()))).all()
+            return {(r.resource_type, r.resource_id) for r in rows}
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email.lower()))
+            await db.commit()
+
+    try:
+        assert asyncio.run(seed()) == {("document", doc_id), ("hr", "reports"), ("admin", "audits")}
+
+        admin = {"X-Test-User": make_test_user("admin")}
+        res = client.get("/admin/audits", params={"user_email": email}, headers=admin)
+        assert res.status_code == 200 and res.json()["total"] == 3  # E-Mail case-insensitiv
+
+        res = client.get("/admin/audits", params={"user_email": email, "resource": f"document:{doc_id}"}, headers=admin)
+        assert [i["resource"] for i in res.json()["items"]] == [f"document:{doc_id}"]
+        res = client.get("/admin/audits", params={"user_email": email, "resource": "hr"}, headers=admin)
+        assert [i["resource"] for i in res.json()["items"]] == ["hr_reports"]
+
+        hr = {"X-Test-User": make_test_user("hr")}
+        items = client.get("/hr/audits", params={"limit": 200}, headers=hr).json()["items"]
+        mine = {i["resource"] for i in items if i["user_email"] == email.lower()}
+        assert mine == {f"document:{doc_id}", "hr_reports"}  # admin_audits gehört nicht zur HR-Sicht
+    finally:
+        asyncio.run(cleanup())
+
+
+# 🗂️ Auswahllisten für die exakten Admin-Filter; Aktion kleingeschrieben gespeichert und gefiltert
+def test_admin_audit_options_and_action_filter():
+    email = f"options.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de"
+    actor = {"email": email, "role": "hr"}
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await log_action(db, actor, "HR_Review", "sick_leave:7")
+            await log_action(db, actor, "upload", "document:1")
+            await db.commit()
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email))
+            await db.commit()
+
+    asyncio.run(seed())
+    try:
+        admin = {"X-Test-User": make_test_user("admin")}
+        cache.clear("admin.audit_options")
+        options = client.get("/admin/audits/options", headers=admin).json()
+        assert {"hr_review", "upload"} <= set(options["actions"]) and "HR_Review" not in options["actions"]
+        assert {"sick_leave", "document"} <= set(options["resource_types"])
+        assert options["actions"] == sorted(options["actions"])
+
+        res = client.get("/admin/audits", params={"user_email": email, "action": " HR_REVIEW "}, headers=admin)
+        assert [i["resource"] for i in res.json()["items"]] == ["sick_leave:7"]
+    finally:
+        asyncio.run(cleanup())
+
+
+# 🚫 403 aus require_roles landet kleingeschrieben → per ?action= (beliebige Schreibweise) auffindbar
+def test_access_denied_is_found_by_action_filter():
+    email = f"denied.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de"
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email))
+            await db.commit()
+
+    try:
+        res = client.get("/admin/audits", headers={"X-Test-User": make_test_user("facility", email=email)})
+        assert res.status_code == 403
+
+        admin = {"X-Test-User": make_test_user("admin")}
+        for spelling in ("ACCESS_DENIED", "access_denied"):
+            res = client.get("/admin/audits", params={"user_email": email, "action": spelling}, headers=admin)
+            assert [i["action"] for i in res.json()["items"]] == ["access_denied"]
+
+        cache.clear("admin.audit_options")
+        assert "access_denied" in client.get("/admin/audits/options", headers=admin).json()["actions"]
+    finally:
+        asyncio.run(cleanup())
+
+
+def test_details_are_json_objects():
+    user = {"email": "details@kit-it-koblenz.de", "role": "hr"}
+    assert build_entry(user, "delete", "document:1", "Dokument gelöscht")["details"] == {"message": "Dokument gelöscht"}
+    assert build_entry(user, "hr_export", "hr_reports", {"format": "csv", "n": 3})["details"] == {"format": "csv", "n": 3}
+    assert build_entry(user, "hr_export", "hr_reports")["details"] is None
+    big = build_entry(user, "hr_sync", "hr_sync", {"blob": "x" * 100}, max_details_len=40)["details"]
+    assert big["truncated"] is True and len(big["message"]) == 40
+
+
+# 🧾 ?details.<key>=<wert> → details @> {...}
+def test_admin_audits_filter_by_details():
+    email = f"details.{uuid.uuid4().hex[:8]}@kit-it-koblenz.de"
+    actor = {"email": email, "role": "hr"}
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await log_action(db, actor, "hr_export", "hr_reports", {"format": "json", "entries": 5})
+            await log_action(db, actor, "hr_export", "hr_reports", {"format": "csv", "entries": 5})
+            await log_action(db, actor, "update", "document:1", {"employee_id": "KIT-0042", "changes": {"status": "approved"}})
+            await db.commit()
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AuditLog).where(models.AuditLog.user_email == email))
+            await db.commit()
+
+    asyncio.run(seed())
+    try:
+        admin = {"X-Test-User": make_test_user("admin")}
+
+        def matching(**details):
+            params = {"user_email": email, **{f"details.{k}": v for k, v in details.items()}}
+            res = client.get("/admin/audits", params=params, headers=admin)
+            assert res.status_code == 200
+            return sorted(i["details"].get("format") or i["details"].get("employee_id") for i in res.json()["items"])
+
+        assert matching(format="json") == ["json"]
+        assert matching(employee_id="KIT-0042") == ["KIT-0042"]
+        assert matching(entries="5") == ["csv", "json"]  # Zahl als JSON-Wert
+        assert matching(**{"changes.status": "approved"}) == ["KIT-0042"]  # verschachtelt
+        assert matching(format="json", employee_id="KIT-0042") == []
+
+        res = client.get("/admin/audits", params={"details.": "x"}, headers=admin)
+        assert res.status_code == 400
+    finally:
+        asyncio.run(cleanup())
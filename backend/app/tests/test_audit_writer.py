@@ -0,0 +1,90 @@
+# app/tests/test_audit_writer.py
+import asyncio
+import uuid
+
+from sqlalchemy import delete, func, select
+
+from app import models
+from app.core import audit
+from app.core.audit import AuditWriter, build_entry, log_action
+from app.database import AsyncSessionLocal
+
+USER = {"email": "writer@kit-it-koblenz.de", "role": "management"}
+
+
+async def _count(resource: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(models.AuditLog).where(models.AuditLog.resource == resource))
+
+
+async def _cleanup(resource: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(models.AuditLog).where(models.AuditLog.resource == resource))
+        await db.commit()
+
+
+# 📦 25 Einträge, Batch 10 → 3 Multi-Row-INSERTs; stop() schreibt den Rest
+def test_writer_batches_and_flushes_on_stop():
+    resource = f"hr_writer_{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        writer = AuditWriter(batch_size=10, flush_ms=50)
+        await writer.start()
+        try:
+            for n in range(25):
+                assert writer.submit(build_entry(USER, "hr_sync", resource, {"n": n}))
+            await asyncio.sleep(0)
+        finally:
+            await writer.stop()
+        written = await _count(resource)
+        await _cleanup(resource)
+        return writer, written
+
+    writer, written = asyncio.run(scenario())
+    assert written == 25
+    assert writer.stats.batches == 3 and writer.stats.written == 25
+    assert writer.submit(build_entry(USER, "hr_sync", resource)) is False  # gestoppt → Aufrufer schreibt selbst
+
+
+# 🚧 Backlog voll → Policy greift
+def test_overflow_policies():
+    async def scenario():
+        results = {}
+        for policy in ("drop_newest", "drop_oldest", "sync"):
+            writer = AuditWriter(batch_size=100, flush_ms=60_000, max_backlog=3, overflow=policy)
+            await writer.start()
+            accepted = [writer.submit({"n": n}) for n in range(5)]
+            results[policy] = (accepted, [e["n"] for e in writer._backlog], writer.stats.dropped)
+            writer._backlog.clear()
+            await writer.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results["drop_newest"] == ([True] * 5, [0, 1, 2], 2)
+    assert results["drop_oldest"] == ([True] * 5, [2, 3, 4], 2)
+    assert results["sync"] == ([True, True, True, False, False], [0, 1, 2], 0)
+
+
+# 🔒 transactional=True bleibt in der Request-Transaktion: Rollback → kein Eintrag
+def test_transactional_entries_follow_the_request(monkeypatch):
+    monkeypatch.setattr(audit, "AUDIT_ASYNC", True)
+    resource = f"hr_strict_{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        writer = AuditWriter(flush_ms=10)
+        monkeypatch.setattr(audit, "audit_writer", writer)
+        await writer.start()
+        try:
+            async with AsyncSessionLocal() as db:
+                await log_action(db, USER, "hr_update", resource, "rolled back", transactional=True)
+                await log_action(db, USER, "hr_update", resource, "queued")
+                await db.rollback()
+        finally:
+            await writer.stop()
+        counted = await _count(resource)
+        await _cleanup(resource)
+        return writer, counted
+
+    writer, counted = asyncio.run(scenario())
+    assert writer.stats.enqueued == 1
+    assert counted == 1  # nur der asynchrone Eintrag
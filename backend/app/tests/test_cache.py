@@ -0,0 +1,67 @@
+# app/tests/test_cache.py
+from fastapi.testclient import TestClient
+
+from app.core.cache import cache
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+
+
+# 🗃️ Zweiter Aufruf kommt aus dem Cache (keine Query)
+def test_overview_served_from_cache(query_counter):
+    cache.clear()
+    first = client.get("/dashboard/overview", headers=HEADERS)
+    with query_counter() as q:
+        second = client.get("/dashboard/overview", headers=HEADERS)
+    assert second.status_code == 200
+    assert q.count == 0
+    assert second.json() == first.json()
+
+
+# 🔔 Commit auf eine getaggte Tabelle wirft den Eintrag weg
+def test_write_invalidates_tagged_entries(query_counter, make_employee):
+    employee_id = make_employee().employee_id
+    cache.clear()
+    before = client.get("/dashboard/overview", headers=HEADERS).json()
+    client.get("/meta/departments", headers=HEADERS)
+
+    created = client.post(f"/reminders/by_business/{employee_id}", json={"title": "cache test"}, headers=HEADERS)
+    assert created.status_code == 201
+    try:
+        with query_counter() as q:
+            after = client.get("/dashboard/overview", headers=HEADERS).json()
+        assert q.count >= 1
+        assert after["reminders"]["pending_total"] == before["reminders"]["pending_total"] + 1
+
+        # meta.departments hängt nur an employees → bleibt gecacht
+        with query_counter() as q:
+            client.get("/meta/departments", headers=HEADERS)
+        assert q.count == 0
+    finally:
+        client.delete(f"/reminders/{created.json()['id']}", headers=HEADERS)
+
+
+# 📊 Trefferquote und Alter pro Namespace sichtbar
+def test_admin_cache_stats():
+    cache.clear()
+    client.get("/dashboard/reminders/top", headers=HEADERS)
+    client.get("/dashboard/reminders/top", headers=HEADERS)
+
+    res = client.get("/admin/cache", headers=HEADERS)
+    assert res.status_code == 200
+    stats = res.json()["namespaces"]["dashboard.reminders_top"]
+    assert stats["hits"] >= 1 and stats["entries"] == 1
+    assert set(stats) >= {"hit_rate", "served_age_max_s", "invalidations", "ttl_s"}
+
+
+# 🧹 GET bleibt lesend (auch mit ?flush=1), Leeren/Zurücksetzen nur per POST
+def test_admin_cache_flush_requires_post():
+    client.get("/dashboard/reminders/top", headers=HEADERS)
+    assert client.get("/admin/cache", params={"flush": True, "reset": True}, headers=HEADERS).status_code == 200
+    assert cache.snapshot()["dashboard.reminders_top"]["entries"] == 1
+
+    res = client.post("/admin/cache", params={"flush": True, "reset": True}, headers=HEADERS)
+    assert res.status_code == 200 and res.json()["flushed"] >= 1
+    assert cache.snapshot().get("dashboard.reminders_top", {}).get("entries", 0) == 0
@@ -0,0 +1,85 @@
+# app/tests/test_conditional_get.py
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.conditional import watermarks
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+
+
+# 🔖 Unveränderte Daten → 304 ohne Body und ohne Query
+def test_matching_etag_returns_304_without_query(query_counter):
+    first = client.get("/employees/", headers=HEADERS)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    with query_counter() as q:
+        again = client.get("/employees/", headers={**HEADERS, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert q.count == 0
+
+    since = client.get("/employees/", headers={**HEADERS, "If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+    # anderer Filter → anderer ETag
+    assert client.get("/employees/?limit=5", headers=HEADERS).headers["etag"] != etag
+
+
+# ✍️ Schreibzugriff → neuer ETag, alte Kopie wird nicht mehr bestätigt
+def test_write_changes_etag(make_employee):
+    employee_id = make_employee().employee_id
+    before = client.get("/dashboard/reminders/top", headers=HEADERS).headers["etag"]
+    created = client.post(f"/reminders/by_business/{employee_id}", json={"title": "etag test"}, headers=HEADERS)
+    assert created.status_code == 201
+    try:
+        res = client.get("/dashboard/reminders/top", headers={**HEADERS, "If-None-Match": before})
+        assert res.status_code == 200
+        assert res.headers["etag"] != before
+    finally:
+        client.delete(f"/reminders/{created.json()['id']}", headers=HEADERS)
+
+
+# 🔁 Schreibzugriff an der App vorbei (nur in der Versions-Sequenz sichtbar) → nach dem Neuladen neuer ETag
+def test_reload_picks_up_foreign_commits():
+    before = client.get("/employees/", headers=HEADERS).headers["etag"]
+
+    async def foreign_commit():
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("UPDATE employees SET updated = updated WHERE false"))  # Statement-Trigger feuert trotzdem
+            await db.commit()
+
+    asyncio.run(foreign_commit())
+    watermarks.clear()  # = TTL abgelaufen
+    assert client.get("/employees/", headers=HEADERS).headers["etag"] != before
+
+
+# 📌 Statische Listen: lange Cache-Lebensdauer
+def test_static_lists_are_long_lived():
+    for path in ("/documents/types", "/meta/roles"):
+        res = client.get(path, headers=HEADERS)
+        assert res.status_code == 200
+        assert res.headers["cache-control"] == "public, max-age=86400"
+        revalidated = client.get(path, headers={**HEADERS, "If-None-Match": res.headers["etag"]})
+        assert revalidated.status_code == 304
+
+
+# 🔓 Wasserstand sperrt nichts: zwei offene Transaktionen auf derselben Tabelle blockieren sich nicht
+def test_version_bump_does_not_serialize_writers(make_employee):
+    from app.database import engine
+
+    first, second = make_employee(), make_employee()
+    with engine.connect() as a, engine.connect() as b:
+        a.execute(text("UPDATE employees SET position = 'a' WHERE id = :id"), {"id": first.id})
+        b.execute(text("SET LOCAL lock_timeout = '1s'"))
+        b.execute(text("UPDATE employees SET position = 'b' WHERE id = :id"), {"id": second.id})
+        b.commit()
+        a.commit()
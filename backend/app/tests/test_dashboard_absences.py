@@ -0,0 +1,34 @@
+# app/tests/test_dashboard_absences.py
+from fastapi.testclient import TestClient
+
+from app.core.cache import cache
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+URL = "/dashboard/absences/upcoming?days=400"
+
+
+# 🚑 Sortierung + Limit in SQL, Seiten über ?after= ergeben zusammen die volle Liste
+def test_upcoming_absences_keyset_pages(query_counter):
+    cache.clear()
+    with query_counter() as q:
+        full = client.get(f"{URL}&limit=500", headers=HEADERS).json()
+    q.assert_max(1)
+    assert [a["start_date"] for a in full] == sorted(a["start_date"] for a in full)
+
+    pages, after = [], None
+    while True:
+        res = client.get(f"{URL}&limit=3" + (f"&after={after}" if after else ""), headers=HEADERS)
+        assert res.status_code == 200
+        assert len(res.json()) <= 3
+        pages += res.json()
+        after = res.headers.get("X-Next-After")
+        if not after:
+            break
+    assert pages == full
+
+
+def test_upcoming_absences_rejects_bad_cursor():
+    assert client.get(f"{URL}&after=gestern", headers=HEADERS).status_code == 400
@@ -0,0 +1,45 @@
+# app/tests/test_dashboard_calendar.py
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+
+
+# 📅 Ein Eintrag pro Tag, Zählungen passen zur Liste der Abwesenden
+def test_calendar_days_and_counts(query_counter):
+    start = date.today() - timedelta(days=7)
+    end = start + timedelta(days=29)
+    with query_counter() as q:
+        res = client.get(f"/dashboard/calendar?from={start}&to={end}", headers=HEADERS)
+    assert res.status_code == 200
+    q.assert_max(1)
+
+    data = res.json()
+    assert [d["date"] for d in data["days"]] == [str(start + timedelta(days=i)) for i in range(30)]
+    for day in data["days"]:
+        assert day["vacation"] + day["sick"] == len(day["out"])
+        assert day["total"] == len({p["employee_id"] for p in day["out"]})
+        assert all(p["status"] != "rejected" for p in day["out"])
+
+
+# 🏢 Abteilungsfilter ist eine Teilmenge
+def test_calendar_department_filter():
+    everyone = client.get("/dashboard/calendar", headers=HEADERS).json()
+    someone = next((p for d in everyone["days"] for p in d["out"]), None)
+    if someone is None:
+        return
+    dept = client.get(f"/dashboard/employee/{someone['employee_id']}", headers=HEADERS).json()["employee"]["department"]
+    filtered = client.get("/dashboard/calendar", params={"department": dept}, headers=HEADERS).json()
+    assert filtered["employees_out"] <= everyone["employees_out"]
+    for all_day, dept_day in zip(everyone["days"], filtered["days"]):
+        assert dept_day["total"] <= all_day["total"]
+
+
+def test_calendar_rejects_bad_range():
+    assert client.get("/dashboard/calendar?from=2026-10-10&to=2026-10-01", headers=HEADERS).status_code == 400
+    assert client.get("/dashboard/calendar?from=2026-01-01&to=2026-12-31", headers=HEADERS).status_code == 400
@@ -0,0 +1,55 @@
+# app/tests/test_dashboard_employee.py
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import SessionLocal
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+
+
+# 👤 Einzel-Dashboard in einem Roundtrip
+def test_employee_dashboard_single_round_trip(query_counter, make_employee):
+    employee = make_employee(department="")
+    now, today = datetime.now(timezone.utc), date.today()
+    with SessionLocal() as db:
+        db.add_all([
+            models.VacationRequest(employee_id=employee.employee_id, start_date=today + timedelta(days=10 * n),
+                                   end_date=today + timedelta(days=10 * n + 2), status=status, created=now, updated=now)
+            for n, status in enumerate(("pending", "approved", "pending"), start=1)
+        ])
+        db.commit()
+    with query_counter() as q:
+        res = client.get(f"/dashboard/employee/{employee.employee_id}", headers=HEADERS)
+    assert res.status_code == 200
+    q.assert_max(1)
+
+    data = res.json()
+    assert data["employee"]["employee_id"] == employee.employee_id
+    assert set(data) == {"employee", "documents", "sick_leave", "vacations", "time_entries", "reminders"}
+    assert set(data["vacations"]) == {"open_requests", "all_statuses", "upcoming_60_days"}
+    assert data["vacations"]["open_requests"] == data["vacations"]["all_statuses"].count("pending") == 2
+
+
+# 👥 Batch: gleiche Dashboards, Reihenfolge wie angefragt, Unbekannte separat
+def test_employee_dashboards_batch(query_counter, make_employee):
+    first, second = make_employee(department="").employee_id, make_employee(department="hr").employee_id
+    with query_counter() as q:
+        res = client.get(f"/dashboard/employees?employees={second},KIT-NOPE,{first},{second}", headers=HEADERS)
+    assert res.status_code == 200
+    q.assert_max(1)
+
+    data = res.json()
+    assert [d["employee"]["employee_id"] for d in data["items"]] == [second, first]
+    assert data["not_found"] == ["KIT-NOPE"]
+    assert data["items"][1] == client.get(f"/dashboard/employee/{first}", headers=HEADERS).json()
+
+
+def test_employee_dashboards_batch_limits():
+    assert client.get("/dashboard/employees?employees=,", headers=HEADERS).status_code == 400
+    too_many = ",".join(f"KIT-{i:04d}" for i in range(101))
+    assert client.get(f"/dashboard/employees?employees={too_many}", headers=HEADERS).status_code == 400
@@ -0,0 +1,83 @@
+# app/tests/test_dashboard_overview.py
+import importlib.util
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+HEADERS = {"X-Test-User": make_test_user("management")}
+
+
+# 📊 Übersicht in einem Roundtrip, gleiche JSON-Struktur wie vorher
+def test_dashboard_overview_single_round_trip(query_counter):
+    with query_counter() as q:
+        res = client.get("/dashboard/overview", headers=HEADERS)
+    assert res.status_code == 200
+    q.assert_max(1)
+
+    data = res.json()
+    assert set(data) == {"employees", "vacations", "sick_leaves", "time_entries", "documents", "reminders", "generated_at"}
+    assert set(data["reminders"]) == {"pending_total", "overdue", "due_next_7_days"}
+    assert sum(data["employees"]["by_department"].values()) == data["employees"]["total"]
+    assert data["reminders"]["overdue"] + data["reminders"]["due_next_7_days"] <= data["reminders"]["pending_total"]
+
+
+# 🧩 HR-Sichten nutzen dieselbe Aggregation statt sie mehrfach auszuführen
+def test_hr_overview_and_departments_one_query_each(query_counter, make_employee):
+    make_employee(department="hr")  # ohne Mitarbeitende gibt es keine Abteilungszähler → Fallback-Query
+    for path in ("/hr/overview", "/hr/stats/departments"):
+        with query_counter() as q:
+            res = client.get(path, headers=HEADERS)
+        assert res.status_code == 200
+        q.assert_max(1)
+
+    overview = client.get("/hr/overview", headers=HEADERS).json()
+    departments = client.get("/hr/stats/departments", headers=HEADERS).json()
+    assert sorted(d["department"] for d in overview["departments"]) == sorted(d["department"] for d in departments)
+
+
+# 🧮 Vorberechnete Zähler (Trigger) = volle Aggregation
+def test_counters_match_full_aggregation():
+    from app.database import engine
+    from app.services import dashboard_counters, dashboard_service
+
+    now = dashboard_service.now_utc()
+    with engine.connect() as conn:
+        assert dashboard_counters.check(conn) == {}
+        counted = conn.execute(dashboard_service.counters_statement(now)).one()._asdict()
+        full = conn.execute(dashboard_service.overview_statement(now)).one()._asdict()
+
+    assert counted.pop("ready") is True
+    assert counted == full
+
+
+# 🪞 Die Trigger der Migration und die Rekonziliation im Service zählen dasselbe
+def test_counter_definitions_match_migration():
+    from app.services import dashboard_counters
+
+    path = Path(__file__).resolve().parents[2] / "alembic" / "versions" / "a3c1f0d2b7e4_dashboard_counters.py"
+    spec = importlib.util.spec_from_file_location("a3c1f0d2b7e4_dashboard_counters", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    assert migration.COUNTERS == dashboard_counters.COUNTERS
+
+
+# 🏷️ NULL und '' landen beide unter "Unassigned" – kein eigener ''-Schlüssel
+def test_empty_department_counts_as_unassigned(make_employee):
+    from app.database import engine
+    from app.services import dashboard_counters, dashboard_service
+
+    with engine.connect() as conn:
+        before = conn.execute(dashboard_service.overview_statement(dashboard_service.now_utc())).one().by_department
+    make_employee(department="")
+    make_employee(department=None)
+    with engine.connect() as conn:
+        after = conn.execute(dashboard_service.overview_statement(dashboard_service.now_utc())).one().by_department
+
+    assert "" not in after
+    assert after["Unassigned"] == before.get("Unassigned", 0) + 2
+    with engine.connect() as conn:
+        assert dashboard_counters.check(conn) == {}  # Trigger-Zähler ebenso
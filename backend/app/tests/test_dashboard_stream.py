@@ -0,0 +1,103 @@
+# app/tests/test_dashboard_stream.py
+import asyncio
+import json
+import uuid
+
+from app import models
+from app.core import changes
+from app.database import AsyncSessionLocal
+from app.services import dashboard_service
+from app.services.dashboard_stream import DashboardBroadcaster, diff
+
+
+def _events(client):
+    events = []
+    while not client.queue.empty():
+        message = client.queue.get_nowait()
+        lines = dict(line.split(": ", 1) for line in message.strip().splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_diff_only_changed_fields():
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "generated_at": "t1"}
+    new = {"a": 1, "b": {"x": 1, "y": 3}, "generated_at": "t2"}
+    assert diff(old, new) == {"b": {"y": 3}}
+    assert diff(new, new) == {}
+
+
+# 📡 Ein Commit → eine Neuberechnung, Deltas an alle passenden Clients
+def test_commit_pushes_deltas_to_all_clients(make_employee):
+    mine, theirs = make_employee().employee_id, make_employee().employee_id
+
+    async def scenario():
+        broadcaster = DashboardBroadcaster(debounce_s=0.05)
+        team_view = await broadcaster.connect()
+        personal = await broadcaster.connect(mine)
+        other = await broadcaster.connect(theirs)
+        assert [e for e, _ in _events(personal)] == ["snapshot"]
+        _events(team_view), _events(other)
+
+        reminder_id = uuid.uuid4()
+        async with AsyncSessionLocal() as db:
+            db.add(models.Reminder(id=reminder_id, employee_id=mine, title="stream test"))
+            await db.commit()
+        try:
+            await asyncio.sleep(0.3)
+            assert broadcaster.computations == 1
+
+            team_events = dict(_events(team_view))
+            assert team_events["overview"]["changes"]["reminders"]["pending_total"] >= 1
+
+            personal_events = dict(_events(personal))
+            assert "overview" in personal_events
+            assert personal_events["employee"]["employee_id"] == mine
+            assert "reminders" in personal_events["employee"]["changes"]
+
+            assert "employee" not in dict(_events(other))
+        finally:
+            async with AsyncSessionLocal() as db:
+                await db.delete(await db.get(models.Reminder, reminder_id))
+                await db.commit()
+            await broadcaster.close()
+
+    asyncio.run(scenario())
+
+
+# ⏳ Änderung während einer laufenden (langsamen) Neuberechnung → danach noch eine Runde, nichts bleibt liegen
+def test_change_during_flush_is_not_lost(monkeypatch):
+    state = {"n": 0}
+
+    class _Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def slow_overview(db):
+        n = state["n"]  # Stand zu Beginn der Berechnung
+        await asyncio.sleep(0.2)
+        return {"n": n}
+
+    monkeypatch.setattr(dashboard_service, "get_overview", slow_overview)
+
+    async def scenario():
+        broadcaster = DashboardBroadcaster(session_factory=_Session, debounce_s=0.02)
+        client = await broadcaster.connect()
+        _events(client)
+        try:
+            state["n"] = 1
+            changes.publish(changes.Change({"employees"}, {"KIT-T1"}))
+            await asyncio.sleep(0.1)  # erste Neuberechnung läuft
+            state["n"] = 2
+            changes.publish(changes.Change({"employees"}, {"KIT-T2"}))
+            await asyncio.sleep(0.6)
+
+            assert broadcaster.computations == 2
+            assert broadcaster._pending is None
+            assert [data["changes"] for _, data in _events(client)] == [{"n": 1}, {"n": 2}]
+        finally:
+            await broadcaster.close()
+
+    asyncio.run(scenario())
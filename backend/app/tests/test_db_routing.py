@@ -0,0 +1,49 @@
+# app/tests/test_db_routing.py
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import db_routing
+from app.core.db_routing import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, ReplicaRoutingMiddleware, use_replica
+
+
+def _worker() -> FastAPI:
+    """Eigene App = eigener Worker (kein geteilter Speicher außer dem, was der Client mitbringt)."""
+    worker = FastAPI()
+    worker.add_middleware(ReplicaRoutingMiddleware)
+
+    @worker.get("/read")
+    def read():
+        return {"replica": use_replica.get()}
+
+    @worker.post("/write")
+    def write():
+        return {"replica": use_replica.get()}
+
+    return worker
+
+
+# ✍️ Schreiben auf Worker A → nächster GET auf Worker B liest von der Primary
+def test_read_your_writes_across_workers(monkeypatch):
+    monkeypatch.setattr(db_routing, "REPLICA_RYW_SECONDS", 5.0)
+    a, b = TestClient(_worker()), TestClient(_worker())
+    assert b.get("/read").json() == {"replica": True}
+
+    written = a.post("/write")
+    assert written.json() == {"replica": False}
+    stamp = written.headers[LAST_WRITE_HEADER]
+    assert written.cookies[LAST_WRITE_COOKIE] == stamp
+
+    assert b.get("/read", headers={LAST_WRITE_HEADER: stamp}).json() == {"replica": False}
+    b.cookies.set(LAST_WRITE_COOKIE, stamp)
+    assert b.get("/read").json() == {"replica": False}
+
+
+# ⏳ Fenster abgelaufen bzw. Unsinn im Header → wieder Replica
+def test_stale_or_invalid_stamp_reads_replica(monkeypatch):
+    monkeypatch.setattr(db_routing, "REPLICA_RYW_SECONDS", 5.0)
+    client = TestClient(_worker())
+    old = f"{time.time() - 6:.3f}"
+    assert client.get("/read", headers={LAST_WRITE_HEADER: old}).json() == {"replica": True}
+    assert client.get("/read", headers={LAST_WRITE_HEADER: "nope"}).json() == {"replica": True}
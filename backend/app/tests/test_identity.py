@@ -0,0 +1,77 @@
+# app/tests/test_identity.py
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.core import auth, changes
+from app.core.identity import derive_role, identity_cache, identity_statement
+from app.core.jwks import JWKSKeyStore
+from app.core.token_cache import token_cache
+from app.main import app
+from app.tests.conftest import make_bearer_token, make_signing_key
+
+client = TestClient(app)
+
+
+def _jwks_of(*jwks):
+    async def fetch():
+        return {"keys": list(jwks)}
+    return fetch
+
+
+def test_identity_statement_uses_lower_indexes():
+    sql = str(identity_statement("User1@KIT.de", "Kit-0001").compile(dialect=postgresql.dialect()))
+    assert "lower(employees.email)" in sql and "lower(employees.employee_id)" in sql
+    assert "LIKE" not in sql.upper()
+    assert derive_role("Backoffice") == "hr" and derive_role(None) == "employee"
+
+
+# 🗂️ Neuer Token derselben Person (sub) → Signaturprüfung, aber keine Query
+def test_known_sub_resolves_without_query(monkeypatch, query_counter, make_employee):
+    employee_id = make_employee().employee_id
+    sub, username = f"sub-{employee_id.lower()}", employee_id.lower()
+    private, jwk = make_signing_key("k1")
+    monkeypatch.setattr(auth, "key_store", JWKSKeyStore("fake", fetch=_jwks_of(jwk)))
+    token_cache.clear()
+    identity_cache.clear()
+
+    # nur Username (anders geschrieben) → case-insensitiv über die Business-ID
+    first = make_bearer_token(private, "k1", sub=sub, preferred_username=username)
+    res = client.get("/employees/me", headers={"Authorization": f"Bearer {first}"})
+    assert res.status_code == 200
+    assert res.json()["employee_id"] == employee_id
+
+    refreshed = make_bearer_token(private, "k1", minutes=6, sub=sub, preferred_username=username)
+    with query_counter() as q:
+        res = client.get("/employees/me", headers={"Authorization": f"Bearer {refreshed}"})
+    assert res.json()["employee_id"] == employee_id
+    assert q.count == 0
+    assert identity_cache.snapshot()["hits"] == 1
+
+    unknown = make_bearer_token(private, "k1", sub="sub-nobody", preferred_username="kit-00")
+    assert client.get("/employees/me", headers={"Authorization": f"Bearer {unknown}"}).status_code == 404
+
+
+# ✏️ Business-ID umbenannt → Change-Bus meldet alte UND neue ID (alle Worker), gecachte Identität fliegt
+def test_renamed_employee_id_invalidates_cached_identity(monkeypatch, make_employee):
+    employee = make_employee()
+    renamed = f"{employee.employee_id}-R"
+    private, jwk = make_signing_key("k1")
+    monkeypatch.setattr(auth, "key_store", JWKSKeyStore("fake", fetch=_jwks_of(jwk)))
+    token_cache.clear()
+    identity_cache.clear()
+
+    sub = f"sub-{employee.employee_id.lower()}"
+    token = make_bearer_token(private, "k1", employee.email, sub=sub)
+    assert client.get("/employees/me", headers={"Authorization": f"Bearer {token}"}).json()["employee_id"] == employee.employee_id
+
+    received = []
+    changes.subscribe(received.append)
+    try:
+        assert client.put(f"/employees/{employee.id}", json={"employee_id": renamed}).status_code == 200
+    finally:
+        changes.unsubscribe(received.append)
+    assert any({employee.employee_id, renamed} <= (c.employee_ids or set()) for c in received)
+
+    # neuer Token derselben Person (sub) → Identität wird neu aufgelöst
+    refreshed = make_bearer_token(private, "k1", employee.email, minutes=6, sub=sub)
+    assert client.get("/employees/me", headers={"Authorization": f"Bearer {refreshed}"}).json()["employee_id"] == renamed
@@ -0,0 +1,68 @@
+# app/tests/test_invalidation_bus.py
+import asyncio
+import json
+import uuid
+
+import psycopg
+
+from app import models
+from app.core import changes
+from app.core.invalidation import InvalidationBus, decode, encode
+from app.database import AsyncSessionLocal
+
+
+def test_payload_roundtrip_and_size_limit():
+    change = changes.Change({"employees"}, {"KIT-0001"})
+    assert decode(encode(change, "w1")) == changes.Change({"employees"}, {"KIT-0001"}, origin="w1")
+
+    many = changes.Change({"reminders"}, {f"KIT-{n:05d}" for n in range(5000)})
+    assert decode(encode(many, "w1")).employee_ids is None  # zu groß → „alle“
+
+
+# 📮 Lokaler Commit → NOTIFY an andere Worker; deren NOTIFY → lokaler Change-Bus
+def test_bus_publishes_local_commits_and_applies_foreign_ones(make_employee):
+    employee_id = make_employee().employee_id
+    channel = f"wm_test_{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        bus = InvalidationBus(channel=channel, worker_id="worker-a")
+        received = []
+        changes.subscribe(received.append)
+        await bus.start()
+        other = await psycopg.AsyncConnection.connect(bus.dsn, autocommit=True)
+        try:
+            await asyncio.wait_for(bus.listening.wait(), 5)
+            await other.execute(f'LISTEN "{channel}"')
+
+            # 1) eigener Commit → Nachricht für die anderen Worker
+            reminder_id = uuid.uuid4()
+            async with AsyncSessionLocal() as db:
+                db.add(models.Reminder(id=reminder_id, employee_id=employee_id, title="bus test"))
+                await db.commit()
+            notify = await asyncio.wait_for(anext(other.notifies()), 5)
+            sent = json.loads(notify.payload)
+            assert sent["origin"] == "worker-a"
+            assert "reminders" in sent["tables"] and employee_id in sent["employee_ids"]
+
+            # 2) Commit eines anderen Workers → lokal veröffentlicht (nicht zurückgespiegelt)
+            received.clear()
+            foreign = {"origin": "worker-b", "tables": ["employees"], "employee_ids": ["KIT-0003"]}
+            await other.execute("SELECT pg_notify(%s, %s)", (channel, json.dumps(foreign)))
+            own = {"origin": "worker-a", "tables": ["documents"], "employee_ids": []}
+            await other.execute("SELECT pg_notify(%s, %s)", (channel, json.dumps(own)))
+            for _ in range(50):
+                if bus.stats.ignored_own >= 2:
+                    break
+                await asyncio.sleep(0.05)
+            assert received == [changes.Change({"employees"}, {"KIT-0003"}, origin="worker-b")]
+            assert bus.stats.sent == 1  # fremde Änderung nicht erneut gesendet
+
+            async with AsyncSessionLocal() as db:
+                await db.delete(await db.get(models.Reminder, reminder_id))
+                await db.commit()
+        finally:
+            changes.unsubscribe(received.append)
+            await other.close()
+            await bus.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,239 @@
+# app/tests/test_jwks.py
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import auth
+from app.core.jwks import JWKSKeyStore, JWKSUnavailable
+from app.core.token_cache import token_cache
+from app.main import app
+from app.tests.conftest import make_bearer_token, make_signing_key, make_test_user
+
+client = TestClient(app)
+
+
+class FakeKeycloak:
+    """JWKS-Endpunkt zum Umschalten (Rotation) mit Request-Zähler."""
+
+    def __init__(self, *jwks, delay=0.0):
+        self.keys = list(jwks)
+        self.calls = 0
+        self.delay = delay
+        self.down = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("keycloak down")
+        return {"keys": self.keys}
+
+
+@contextmanager
+def jwks_server(*jwks, delay=0.0):
+    """Lokaler Stand-in für Keycloaks certs-Endpunkt (echtes HTTP, langsam auf Wunsch)."""
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(self.path)
+            time.sleep(delay)
+            body = json.dumps({"keys": list(jwks)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/realms/kit/protocol/openid-connect/certs", calls
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# 🔑 Einmal geladen + geparst, danach nur noch Treffer
+def test_keys_are_parsed_once():
+    async def scenario():
+        _, jwk = make_signing_key("k1")
+        keycloak = FakeKeycloak(jwk, {"kid": "enc", "kty": "RSA", "use": "enc"})
+        store = JWKSKeyStore("fake", fetch=keycloak)
+
+        first = await store.get_key("k1")
+        assert first is not None and await store.get_key("k1") is first
+        assert keycloak.calls == 1
+        assert store.snapshot()["kids"] == ["k1"]
+        assert store.stats.refreshes == {"cold": 1}
+
+    asyncio.run(scenario())
+
+
+# 🔄 Rotation: unbekannte kid → nachladen (aber nicht bei jedem Request)
+def test_unknown_kid_triggers_rate_limited_refresh():
+    async def scenario():
+        _, old = make_signing_key("old")
+        _, new = make_signing_key("new")
+        keycloak = FakeKeycloak(old)
+        store = JWKSKeyStore("fake", fetch=keycloak, min_refresh_interval=60)
+        assert await store.get_key("old") is not None
+
+        keycloak.keys = [new]
+        store._last_attempt = float("-inf")  # letzter Versuch lange her
+        assert await store.get_key("new") is not None
+        assert store.stats.refreshes == {"cold": 1, "kid": 1}
+
+        assert await store.get_key("forged") is None
+        assert await store.get_key("forged") is None
+        assert keycloak.calls == 2
+        assert store.stats.rate_limited == 2
+
+    asyncio.run(scenario())
+
+
+# ⏱️ TTL abgelaufen → alte Schlüssel sofort, Nachladen im Hintergrund; Keycloak down → alte bleiben
+def test_stale_keys_served_while_revalidating():
+    async def scenario():
+        _, jwk = make_signing_key("k1")
+        keycloak = FakeKeycloak(jwk)
+        store = JWKSKeyStore("fake", ttl=0, min_refresh_interval=0, fetch=keycloak)
+        key = await store.get_key("k1")
+
+        keycloak.delay = 0.3
+        started = time.perf_counter()
+        assert await store.get_key("k1") is key
+        assert time.perf_counter() - started < 0.1
+        assert store.stats.stale_served == 1
+        await asyncio.sleep(0.4)
+        assert store.stats.refreshes == {"cold": 1, "ttl": 1}
+
+        keycloak.delay, keycloak.down = 0, True
+        await store.get_key("k1")
+        await asyncio.sleep(0.05)
+        assert await store.get_key("k1") is not None
+        assert store.stats.failures == 1
+
+        with pytest.raises(JWKSUnavailable):
+            await JWKSKeyStore("fake", fetch=keycloak).get_key("k1")
+        assert await JWKSKeyStore("fake", fetch=keycloak).prewarm() is False
+
+    asyncio.run(scenario())
+
+
+# 🧵 Echter HTTP-Abruf: gleichzeitige Misses → ein Request, Event-Loop läuft währenddessen weiter
+def test_http_fetch_is_single_flight_and_non_blocking():
+    _, jwk = make_signing_key("k1")
+    with jwks_server(jwk, delay=0.5) as (uri, calls):
+        async def scenario():
+            store = JWKSKeyStore(uri)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            keys = await asyncio.gather(*(store.get_key("k1") for _ in range(10)))
+            elapsed = time.perf_counter() - started
+            ticking.cancel()
+            await store.aclose()
+            return keys, elapsed, ticks, store.stats.coalesced
+
+        keys, elapsed, ticks, coalesced = asyncio.run(scenario())
+
+    assert all(k is not None for k in keys)
+    assert len(calls) == 1 and coalesced == 9
+    assert elapsed < 1.0  # nicht 10 × 0.5 s
+    assert ticks >= 20  # Loop war während des Abrufs frei (blockierend wären es 0)
+
+
+# 🚦 App-Ebene: andere Requests warten nicht auf den JWKS-Abruf eines kalten Workers
+def test_requests_not_serialized_behind_jwks_fetch(monkeypatch, make_employee):
+    employee = make_employee()
+    private, jwk = make_signing_key("k1")
+    token = make_bearer_token(private, "k1", employee.email)
+    token_cache.clear()
+    with jwks_server(jwk, delay=0.5) as (uri, calls):
+        monkeypatch.setattr(auth, "key_store", JWKSKeyStore(uri))
+
+        async def scenario():
+            finished = {}
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                async def get(name, url, **kwargs):
+                    res = await http.get(url, **kwargs)
+                    finished[name] = time.perf_counter()
+                    return res
+
+                results = await asyncio.gather(
+                    get("me", "/employees/me", headers={"Authorization": f"Bearer {token}"}),
+                    *(get(f"live{n}", "/api/live") for n in range(5)),
+                )
+            await auth.key_store.aclose()
+            return results, finished
+
+        results, finished = asyncio.run(scenario())
+
+    assert [r.status_code for r in results] == [200] * 6
+    assert results[0].json()["employee_id"] == employee.employee_id
+    assert max(finished[f"live{n}"] for n in range(5)) < finished["me"]
+    assert len(calls) == 1
+
+
+# 👤 Ende-zu-Ende: Bearer-Token nach Key-Rotation ohne Neustart akzeptiert
+def test_bearer_token_after_rotation(monkeypatch, make_employee):
+    employee = make_employee()
+    old_private, old = make_signing_key("old")
+    new_private, new = make_signing_key("new")
+    keycloak = FakeKeycloak(old)
+    store = JWKSKeyStore("fake", fetch=keycloak, min_refresh_interval=0)
+    monkeypatch.setattr(auth, "key_store", store)
+    token_cache.clear()
+
+    def token(private, kid):
+        return make_bearer_token(private, kid, employee.email)
+
+    res = client.get("/employees/me", headers={"Authorization": f"Bearer {token(old_private, 'old')}"})
+    assert res.status_code == 200
+    assert res.json()["employee_id"] == employee.employee_id
+
+    keycloak.keys = [new]
+    res = client.get("/employees/me", headers={"Authorization": f"Bearer {token(new_private, 'new')}"})
+    assert res.status_code == 200
+    assert keycloak.calls == 2
+
+    res = client.get("/employees/me", headers={"Authorization": f"Bearer {token(new_private, 'forged')}"})
+    assert res.status_code == 401
+
+
+# 🛑 GET /admin/jwks lädt nichts nach (auch mit ?refresh=1), nur POST
+def test_admin_jwks_refresh_requires_post(monkeypatch):
+    from app.routers import admin
+
+    _, jwk = make_signing_key("k1")
+    keycloak = FakeKeycloak(jwk)
+    monkeypatch.setattr(admin, "key_store", JWKSKeyStore("fake", fetch=keycloak))
+    headers = {"X-Test-User": make_test_user("admin")}
+
+    res = client.get("/admin/jwks", params={"refresh": True}, headers=headers)
+    assert res.status_code == 200 and res.json()["kids"] == []
+    assert keycloak.calls == 0
+
+    res = client.post("/admin/jwks", params={"refresh": True}, headers=headers)
+    assert res.json()["refreshed"] is True and res.json()["kids"] == ["k1"]
+    assert keycloak.calls == 1
@@ -0,0 +1,56 @@
+# app/tests/test_query_budget.py
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.query_budget import QueryBudget, QueryBudgetExceeded, QueryCapture, find_violations
+from app.core.sql_metrics import route_summary, statement_shape
+from app.tests.conftest import make_test_user
+
+client = TestClient(app)
+
+
+# ✅ Gleiche Statements mit anderen Parametern → gleicher Shape
+def test_statement_shape_ignores_parameters():
+    a = statement_shape("SELECT * FROM employees WHERE employee_id IN (%(id_1)s, %(id_2)s) LIMIT 5")
+    b = statement_shape("SELECT * FROM employees WHERE employee_id IN (%(id_1)s) LIMIT 10")
+    assert a == b
+
+
+# 🚨 Budget + N+1-Erkennung
+def test_find_violations_flags_budget_and_repeats():
+    shapes = Counter({"SELECT * FROM employees WHERE employee_id = ?": 6, "SELECT * FROM documents": 1})
+    violations = find_violations(7, shapes, QueryBudget(max_queries=2, max_repeats=5))
+    assert any("budget 2" in v for v in violations)
+    assert any("N+1" in v for v in violations)
+    assert find_violations(1, Counter({"SELECT 1": 1}), QueryBudget(max_queries=2)) == []
+
+
+def test_capture_assert_max_raises():
+    q = QueryCapture(statements=["SELECT 1", "SELECT 2", "SELECT 3"])
+    with pytest.raises(QueryBudgetExceeded):
+        q.assert_max(2)
+
+
+# 📄 /documents/ lädt Document.employee per Join – kein Lazy-Load pro Zeile
+def test_documents_list_has_no_n_plus_one(query_counter):
+    headers = {"X-Test-User": make_test_user("management")}
+    with query_counter() as q:
+        res = client.get("/documents/?page_size=100", headers=headers)
+    assert res.status_code == 200
+    q.assert_max(1)
+
+
+# 🧹 GET /admin/sql-stats leert nichts (auch mit ?reset=1), nur POST
+def test_admin_sql_stats_reset_requires_post():
+    headers = {"X-Test-User": make_test_user("admin")}
+    client.get("/employees/", headers=headers)
+
+    res = client.get("/admin/sql-stats", params={"reset": True}, headers=headers)
+    assert res.status_code == 200 and res.json()["routes"]
+    assert route_summary.snapshot()
+
+    assert client.post("/admin/sql-stats", params={"reset": True}, headers=headers).json()["routes"]
+    assert [r["route"] for r in route_summary.snapshot()] == ["POST /admin/sql-stats"]  # nur der Reset selbst
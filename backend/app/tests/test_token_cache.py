@@ -0,0 +1,80 @@
+# app/tests/test_token_cache.py
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import auth
+from app.core.jwks import JWKSKeyStore
+from app.core.token_cache import TokenCache, token_cache
+from app.main import app
+from app.tests.conftest import make_bearer_token, make_signing_key, make_test_user
+
+client = TestClient(app)
+
+
+def _jwks_of(*jwks):
+    async def fetch():
+        return {"keys": list(jwks)}
+    return fetch
+
+
+# 🧹 LRU: volle Kapazität → ältester Eintrag fliegt, abgelaufene Tokens werden nie gespeichert
+def test_lru_eviction_and_expiry():
+    cache = TokenCache(max_entries=2, max_ttl=60)
+    for n in range(3):
+        cache.set(f"token-{n}", {"employee_id": f"KIT-{n}"}, exp=None, generation=cache.generation)
+    assert cache.get("token-0") is None
+    assert cache.get("token-2") == {"employee_id": "KIT-2"}
+    assert cache.snapshot()["evictions"] == 1
+
+    assert cache.set("expired", {"employee_id": "KIT-9"}, exp=time.time() - 1, generation=cache.generation) is False
+
+    # während der Prüfung invalidiert → Ergebnis wird verworfen
+    generation = cache.generation
+    cache.invalidate_employees({"KIT-2"})
+    assert cache.get("token-2") is None
+    assert cache.set("token-3", {"employee_id": "KIT-3"}, exp=None, generation=generation) is False
+
+
+# 🎟️ Wiederholter Token → keine Signaturprüfung, keine Query; Abteilungswechsel → neu auflösen
+def test_repeat_token_skips_verification_until_employee_changes(monkeypatch, query_counter, make_employee):
+    created = make_employee(department="")
+    private, jwk = make_signing_key("k1")
+    monkeypatch.setattr(auth, "key_store", JWKSKeyStore("fake", fetch=_jwks_of(jwk)))
+    token_cache.clear()
+    headers = {"Authorization": f"Bearer {make_bearer_token(private, 'k1', created.email)}"}
+
+    employee = client.get("/employees/me", headers=headers).json()
+    assert employee["employee_id"] == created.employee_id and employee["department"] == ""
+
+    def verify_again(*args, **kwargs):
+        raise AssertionError("token verified again")
+
+    monkeypatch.setattr(auth.jwt, "decode", verify_again)
+    with query_counter() as q:
+        again = client.get("/employees/me", headers=headers)
+    assert again.json() == employee
+    assert q.count == 0
+    monkeypatch.undo()
+
+    monkeypatch.setattr(auth, "key_store", JWKSKeyStore("fake", fetch=_jwks_of(jwk)))
+    # eigener Mitarbeiter → Abteilung ändern ist unbedenklich (Fixture räumt auf)
+    client.put(f"/employees/{created.id}", json={"department": "hr"})
+    assert client.get("/employees/me", headers=headers).json()["department"] == "hr"
+    client.put(f"/employees/{created.id}", json={"department": ""})
+    assert client.get("/employees/me", headers=headers).json()["department"] == ""
+
+
+# 🧹 GET /admin/token-cache bleibt lesend (auch mit ?flush=1), Leeren nur per POST
+def test_admin_token_cache_flush_requires_post():
+    headers = {"X-Test-User": make_test_user("admin")}
+    token_cache.clear()
+    token_cache.set("token-x", {"employee_id": "KIT-X"}, exp=None, generation=token_cache.generation)
+
+    res = client.get("/admin/token-cache", params={"flush": True}, headers=headers)
+    assert res.status_code == 200 and "identities" in res.json()
+    assert token_cache.get("token-x") == {"employee_id": "KIT-X"}
+
+    res = client.post("/admin/token-cache", params={"flush": True}, headers=headers)
+    assert res.json()["flushed"] >= 1
+    assert token_cache.get("token-x") is None
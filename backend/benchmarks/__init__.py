@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Endpoint-Benchmarks gegen einen großen, synthetischen Mandanten.
+# Start: cd backend && python -m benchmarks.run --help
@@ -0,0 +1,19 @@
+# benchmarks/dataset.py
+# Der Benchmark-Datensatz kommt aus dem Bulk-Seeder (seed_bulk.py) – gleiche Verteilungen wie für Lasttests.
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional
+
+import psycopg
+
+import seed_bulk
+from seed_bulk import FULL, SeedSize as DatasetSize, create_schema, libpq_url  # noqa: F401
+
+
+def load(url: str, size: DatasetSize, seed: int = 42, now: Optional[datetime] = None) -> Dict[str, float]:
+    """Füllt eine leere DB per COPY und räumt danach auf (VACUUM → Visibility-Map für Index-Only-Scans)."""
+    timings = seed_bulk.seed(url, size, seed=seed, now=now)
+    with psycopg.connect(libpq_url(url), autocommit=True) as conn:
+        conn.execute("VACUUM ANALYZE")
+    return timings
@@ -0,0 +1,256 @@
+# benchmarks/run.py
+"""
+Endpoint-Benchmark gegen einen synthetischen Großmandanten.
+
+    cd backend
+    python -m benchmarks.run                      # eigene Postgres (Docker / pg_ctl), voller Datensatz
+    python -m benchmarks.run --scale 0.05         # schneller Lauf
+    python -m benchmarks.run --compare benchmarks/results/<alt>.json
+
+Misst pro Route (alle Router aus app/routers/__init__.py) p50/p95-Latenz und Query-Anzahl
+und schreibt das Ergebnis nach benchmarks/results/<git-sha>.json.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks import dataset
+from benchmarks.postgres import LocalPostgres
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# ============================================================
+# 🧮 Helfer
+# ============================================================
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def git_sha() -> str:
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    sha = out.stdout.strip() or "nogit"
+    dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], capture_output=True).returncode != 0
+    return sha + ("-dirty" if dirty else "")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Workmate endpoint benchmarks")
+    p.add_argument("--scale", type=float, default=1.0, help="Datensatzgröße relativ zu 20k Mitarbeitern / 2M Zeiteinträgen")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--iterations", type=int, default=30, help="Messungen pro Route")
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--routes", default="", help="Nur Routen, deren Key diesen Text enthält (z. B. 'dashboard')")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"),
+                   help="Vorhandene (leere) DB statt eigener Postgres-Instanz")
+    p.add_argument("--skip-load", action="store_true", help="Datensatz ist schon geladen (mit --database-url/--keep)")
+    p.add_argument("--keep", action="store_true", help="Postgres nach dem Lauf nicht stoppen")
+    p.add_argument("--output", help="Ergebnisdatei (Default: benchmarks/results/<sha>.json)")
+    p.add_argument("--compare", help="Älteres Ergebnis, gegen das verglichen wird")
+    p.add_argument("--threshold", type=float, default=1.25, help="Regressionsschwelle für p95 (Faktor)")
+    p.add_argument("--fail-on-regression", action="store_true", help="Exit-Code 1 bei Regression")
+    p.add_argument("--with-cache", action="store_true",
+                   help="Response-Cache (app/core/cache.py) aktiv lassen – Default: aus, gemessen wird die DB-Arbeit")
+    return p.parse_args(argv)
+
+
+# ============================================================
+# 🏃 Messung
+# ============================================================
+def discover_routes():
+    """Alle API-Routen aus app/routers/__init__.py als (key, method, path)."""
+    from fastapi.routing import APIRoute
+    from app.routers import api_router
+    from benchmarks.scenarios import METHOD_ORDER
+
+    routes = []
+    for route in api_router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in sorted(route.methods):
+            routes.append((f"{method} {route.path}", method, route.path))
+    routes.sort(key=lambda r: METHOD_ORDER.get(r[1], 9))
+    return routes
+
+
+def measure(client, ctx, method: str, path: str, scenario, args) -> Dict[str, Any]:
+    from app.core.query_budget import capture_queries
+    from benchmarks.scenarios import HEADERS, resolve_path
+
+    if scenario.skip:
+        return {"skipped": scenario.skip}
+    iterations = scenario.iterations or args.iterations
+    latencies: List[float] = []
+    queries: List[int] = []
+    statuses: Dict[int, int] = {}
+    devnull = open(os.devnull, "w")
+
+    for i in range(args.warmup + iterations):
+        consumed = None
+        if scenario.consume:
+            consumed = ctx.take(scenario.consume)
+            if consumed is None:
+                return {"skipped": f"no rows left from {scenario.consume}"}
+        url = resolve_path(path, ctx, consumed)
+        if url is None:
+            return {"skipped": "no sample value for path parameter"}
+        if scenario.query:
+            url += "?" + scenario.query.format(employee_id=ctx.employee_id, team=",".join(ctx.team))
+
+        kwargs = scenario.build(ctx) or {}
+        with capture_queries() as q, redirect_stdout(devnull):  # print()-Debugausgaben der Router schlucken
+            started = time.perf_counter()
+            response = client.request(method, url, headers=HEADERS, **kwargs)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if scenario.collect and response.status_code < 300:
+            ctx.created.setdefault(scenario.collect, []).append(str(response.json()[scenario.id_field]))
+        if i < args.warmup:
+            continue
+        latencies.append(elapsed_ms)
+        queries.append(q.count)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "queries": max(queries),
+        "queries_min": min(queries),
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+    from app.database import engine
+    from app.main import app
+    from benchmarks.scenarios import BENCH_FILENAME, SCENARIOS, Scenario, load_context
+
+    ctx = load_context(engine)
+    upload_dir = Path(os.environ["UPLOAD_DIR"]) / "documents" / ctx.employee_id
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    (upload_dir / BENCH_FILENAME).write_text("benchmark")
+
+    results: Dict[str, Any] = {}
+    with TestClient(app, raise_server_exceptions=False) as client:
+        for key, method, path in discover_routes():
+            scenarios = SCENARIOS.get(key) or ([Scenario()] if method == "GET" else [])
+            if not scenarios:
+                results[key] = {"skipped": "no scenario for write route"}
+                continue
+            for scenario in scenarios:
+                name = f"{key} ?{scenario.query}" if scenario.query else key
+                if args.routes and args.routes not in name:
+                    continue
+                result = measure(client, ctx, method, path, scenario, args)
+                results[name] = result
+                if "skipped" in result:
+                    print(f"  ⏭️  {name:<60} {result['skipped']}")
+                else:
+                    print(f"  ⏱️  {name:<60} p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+                          f"{result['queries']:>4} queries  {result['status']}")
+    return results
+
+
+# ============================================================
+# 📊 Vergleich
+# ============================================================
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📊 Vergleich mit {baseline.get('commit')} ({baseline_path})")
+    print(f"  {'route':<60} {'p95 alt':>9} {'p95 neu':>9} {'Δ':>7} {'queries':>11}")
+    for name, new in current["routes"].items():
+        old = baseline.get("routes", {}).get(name)
+        if not old or "p95_ms" not in old or "p95_ms" not in new:
+            continue
+        factor = new["p95_ms"] / old["p95_ms"] if old["p95_ms"] else 1.0
+        flag = ""
+        if factor > threshold or new["queries"] > old["queries"]:
+            flag = " ⚠️"
+            regressions.append(name)
+        print(f"  {name:<60} {old['p95_ms']:>9.1f} {new['p95_ms']:>9.1f} {factor:>6.2f}x "
+              f"{old['queries']:>5}→{new['queries']:<5}{flag}")
+    return regressions
+
+
+# ============================================================
+# 🚀 Main
+# ============================================================
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    size = dataset.FULL.scaled(args.scale)
+
+    server = nullcontext(args.database_url) if args.database_url else LocalPostgres(keep=args.keep)
+    with server as url, tempfile.TemporaryDirectory(prefix="workmate-bench-uploads-") as uploads:
+        # app.database liest die Umgebung beim Import → vor jedem app-Import setzen
+        os.environ["DATABASE_URL"] = url
+        os.environ.pop("DATABASE_REPLICA_URL", None)
+        os.environ.setdefault("UPLOAD_DIR", uploads)
+        os.environ.setdefault("QUERY_BUDGET_MODE", "log")
+        os.environ["CACHE_ENABLED"] = "1" if args.with_cache else "0"
+        logging.disable(logging.WARNING)
+
+        load_timings: Dict[str, float] = {}
+        if not args.skip_load:
+            print(f"🏗️  Lade Datensatz (scale={args.scale}) nach {url.rsplit('@', 1)[-1]}")
+            dataset.create_schema(url)
+            load_timings = dataset.load(url, size, seed=args.seed)
+
+        print("⏱️  Messe Routen …")
+        routes = run_benchmarks(args)
+
+    result = {
+        "commit": git_sha(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "scale": args.scale, "seed": args.seed, "iterations": args.iterations, "warmup": args.warmup,
+            "cache": args.with_cache,
+        },
+        "dataset": asdict(size),
+        "load_seconds": load_timings,
+        "routes": routes,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"\n💾 Ergebnis: {output}")
+
+    if args.compare:
+        regressions = compare(result, args.compare, args.threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} Regression(en) über {args.threshold:.2f}x bzw. mehr Queries")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# benchmarks/scenarios.py
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+# ============================================================
+# 🧭 Kontext: Beispiel-IDs aus dem Datensatz + im Lauf erzeugte Zeilen
+# ============================================================
+MANAGEMENT_USER = {
+    "email": "bench@workmate.io",
+    "role": "management",
+    "department": "management",
+    "preferred_username": "Benchmark",
+    "employee_id": "KIT-0001",
+}
+HEADERS = {"X-Test-User": json.dumps(MANAGEMENT_USER)}
+BENCH_FILENAME = "benchmark.txt"
+
+
+@dataclass
+class BenchContext:
+    employee_id: str                                        # Business-ID (KIT-xxxx)
+    ids: Dict[str, str]                                     # Pfad-Parameter → Beispielwert (UUIDs)
+    team: List[str] = field(default_factory=list)           # Business-IDs derselben Abteilung (Batch-Routen)
+    created: Dict[str, List[str]] = field(default_factory=dict)
+
+    def take(self, resource: str) -> Optional[str]:
+        pool = self.created.get(resource) or []
+        return pool.pop() if pool else None
+
+
+def load_context(engine) -> BenchContext:
+    """Nimmt den Mitarbeiter mit den meisten Zeiteinträgen → realistisch „schwere“ Detailseiten."""
+    with engine.connect() as conn:
+        emp = conn.execute(text(
+            "SELECT e.id, e.employee_id FROM employees e "
+            "JOIN time_entries t ON t.employee_id = e.employee_id "
+            "GROUP BY e.id, e.employee_id ORDER BY count(*) DESC LIMIT 1"
+        )).one()
+
+        def first(table: str) -> Optional[str]:
+            row = conn.execute(
+                text(f"SELECT id FROM {table} WHERE employee_id = :e LIMIT 1"), {"e": emp.employee_id}
+            ).first() or conn.execute(text(f"SELECT id FROM {table} LIMIT 1")).first()
+            return str(row.id) if row else None
+
+        team = list(conn.scalars(text(
+            "SELECT employee_id FROM employees "
+            "WHERE department = (SELECT department FROM employees WHERE employee_id = :e) "
+            "ORDER BY employee_id LIMIT 25"
+        ), {"e": emp.employee_id}))
+
+        ids = {
+            "employee_uuid": str(emp.id),
+            "doc_id": first("documents"),
+            "sl_id": first("sick_leaves"),
+            "te_id": first("time_entries"),
+            "vr_id": first("vacation_requests"),
+            "reminder_id": first("reminders"),
+            "filename": BENCH_FILENAME,
+        }
+    return BenchContext(employee_id=emp.employee_id, ids=ids, team=team or [emp.employee_id])
+
+
+# ============================================================
+# 📋 Szenarien
+# ============================================================
+@dataclass
+class Scenario:
+    """
+    Ein Request-Rezept für eine Route.
+    - build(ctx) → kwargs für TestClient.request (json/files/data) – None = nicht ausführbar
+    - collect: POST legt Zeilen an, deren id für DELETE gemerkt wird
+    - consume: DELETE braucht pro Aufruf eine frische Zeile aus `collect`
+    """
+    build: Callable[[BenchContext], Optional[Dict[str, Any]]] = lambda ctx: {}
+    query: str = ""
+    collect: Optional[str] = None
+    consume: Optional[str] = None
+    id_field: str = "id"
+    iterations: Optional[int] = None  # überschreibt --iterations (z. B. für große Exporte)
+    skip: Optional[str] = None        # Grund, warum die Route nicht wiederholt messbar ist
+
+
+def _soon(days: int = 0) -> str:
+    return (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+
+
+# Schlüssel wie route_key(): "METHOD /pfad/template". Fehlt ein GET → Default-Szenario ohne Parameter.
+SCENARIOS: Dict[str, List[Scenario]] = {
+    # ---------- Lesen: zusätzliche Varianten mit Filtern ----------
+    "GET /employees/": [Scenario(), Scenario(query="q=mül")],
+    "GET /documents/": [Scenario(), Scenario(query="q=attest"), Scenario(query="employee_id={employee_id}")],
+    "GET /reminders/": [Scenario(), Scenario(query="status=pending")],
+    "GET /admin/audits": [Scenario(), Scenario(query="action=upload&resource=document")],
+    "GET /admin/audits/export": [Scenario(iterations=3)],
+    "GET /hr/audits/export": [Scenario(iterations=3)],
+    "GET /dashboard/employees": [Scenario(query="employees={team}")],
+    "GET /dashboard/calendar": [Scenario(), Scenario(query="department=Support")],
+    "GET /dashboard/stream": [Scenario(skip="server-sent event stream never completes")],
+    "GET /hr/reports/export": [Scenario(query="format=json", iterations=5), Scenario(query="format=csv", iterations=5)],
+
+    # ---------- Schreiben ----------
+    # POST /employees/ legt nur das eigene Profil an (einmal pro User) → DELETE hätte nichts zu löschen
+    "POST /employees/": [Scenario(skip="creates the caller's own profile only once")],
+    "PUT /employees/{employee_id}": [Scenario(build=lambda ctx: {"json": {"position": "Benchmark"}})],
+    "DELETE /employees/{employee_id}": [Scenario(skip="needs rows created by POST /employees/")],
+    "PUT /employees/by_business/{employee_id}": [Scenario(build=lambda ctx: {"json": {"department": "management"}})],
+    "POST /employees/upload-avatar/{employee_id}": [
+        Scenario(build=lambda ctx: {"files": {"file": ("avatar.png", b"\x89PNG\r\n", "image/png")}})
+    ],
+
+    "POST /documents/upload/{employee_id}": [Scenario(
+        build=lambda ctx: {"files": {"file": ("bench.txt", b"benchmark")}, "data": {"document_type": "attest"}},
+        collect="documents",
+    )],
+    "PUT /documents/{doc_id}": [Scenario(build=lambda ctx: {"json": {"notes": "benchmark"}})],
+    "DELETE /documents/{doc_id}": [Scenario(consume="documents")],
+
+    "POST /sick-leaves/": [Scenario(
+        build=lambda ctx: {"json": {"employee_id": ctx.employee_id, "start_date": _soon(400), "end_date": _soon(402)}},
+        collect="sick_leaves",
+    )],
+    "POST /sick-leaves/by_business/{employee_id}": [Scenario(
+        build=lambda ctx: {"json": {"start_date": _soon(400), "end_date": _soon(402)}}, collect="sick_leaves",
+    )],
+    "PUT /sick-leaves/{sl_id}": [Scenario(build=lambda ctx: {"json": {"notes": "benchmark"}})],
+    "DELETE /sick-leaves/{sl_id}": [Scenario(consume="sick_leaves")],
+
+    "POST /time-entries/": [Scenario(
+        build=lambda ctx: {"json": {"employee_id": ctx.employee_id, "start_time": _soon(400)}}, collect="time_entries",
+    )],
+    "POST /time-entries/by_business/{employee_id}": [Scenario(
+        build=lambda ctx: {"json": {"start_time": _soon(400)}}, collect="time_entries",
+    )],
+    "PUT /time-entries/{te_id}": [Scenario(build=lambda ctx: {"json": {"notes": "benchmark"}})],
+    "DELETE /time-entries/{te_id}": [Scenario(consume="time_entries")],
+
+    "POST /vacation-requests/": [Scenario(
+        build=lambda ctx: {"json": {"employee_id": ctx.employee_id, "start_date": _soon(400)[:10], "end_date": _soon(405)[:10]}},
+        collect="vacation_requests",
+    )],
+    "POST /vacation-requests/by_business/{employee_id}": [Scenario(
+        build=lambda ctx: {"json": {"start_date": _soon(400)[:10], "end_date": _soon(405)[:10]}},
+        collect="vacation_requests",
+    )],
+    "PUT /vacation-requests/{vr_id}": [Scenario(build=lambda ctx: {"json": {"notes": "benchmark"}})],
+    "DELETE /vacation-requests/{vr_id}": [Scenario(consume="vacation_requests")],
+
+    "POST /reminders/": [Scenario(
+        build=lambda ctx: {"json": {"employee_id": ctx.employee_id, "title": "Benchmark", "due_at": _soon(3)}},
+        collect="reminders",
+    )],
+    "POST /reminders/by_business/{employee_id}": [Scenario(
+        build=lambda ctx: {"json": {"title": "Benchmark", "due_at": _soon(3)}}, collect="reminders",
+    )],
+    "PATCH /reminders/{reminder_id:uuid}": [Scenario(build=lambda ctx: {"json": {"description": "benchmark"}})],
+    "DELETE /reminders/{reminder_id:uuid}": [Scenario(consume="reminders")],
+}
+
+# Reihenfolge: erst lesen, dann anlegen, ändern, löschen (DELETE verbraucht die POST-Zeilen)
+METHOD_ORDER = {"GET": 0, "POST": 1, "PUT": 2, "PATCH": 2, "DELETE": 3}
+
+# Pfad-Parameter, die unter /employees/{employee_id} die UUID statt der Business-ID meinen
+UUID_EMPLOYEE_ROUTES = {"/employees/{employee_id}"}
+
+
+def resolve_path(path: str, ctx: BenchContext, consumed: Optional[str] = None) -> Optional[str]:
+    """Setzt Beispielwerte (oder die verbrauchte Zeile) in das Pfad-Template ein."""
+    values = dict(ctx.ids, employee_id=ctx.employee_id)
+    if path in UUID_EMPLOYEE_ROUTES:
+        values["employee_id"] = ctx.ids["employee_uuid"]
+
+    result = path
+    for name, value in values.items():
+        for placeholder in ("{%s}" % name, "{%s:uuid}" % name):
+            if placeholder in result:
+                if consumed is not None:
+                    value = consumed
+                if value is None:
+                    return None
+                result = result.replace(placeholder, value)
+    return None if "{" in result else result
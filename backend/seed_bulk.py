@@ -0,0 +1,397 @@
+# seed_bulk.py
+"""
+Schreibt einen realistischen Datensatz direkt in die Datenbank (COPY in Batches statt API-Calls).
+
+    python seed_bulk.py --scale 0.05 --create-schema          # ~1k Mitarbeiter, ~100k Zeiteinträge
+    python seed_bulk.py --employees 500 --reset               # Größe über die Mitarbeiterzahl
+    python seed_workmate.py --direct --employees 200          # gleicher Weg aus dem API-Seeder
+
+Verteilungen:
+- Abteilungen ungleich groß (Support/Consulting groß, Management klein)
+- Urlaube mit Sommer-/Weihnachtsspitzen → viele Überschneidungen pro Abteilung
+- laufende Zeiteinträge (end_time NULL) für einen Teil der Belegschaft
+- überfällige, offene und erledigte Erinnerungen
+- aktuelle Krankmeldungen + Häufung im Winter
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+# ---------------------------
+# Größe
+# ---------------------------
+@dataclass(frozen=True)
+class SeedSize:
+    employees: int = 20_000
+    time_entries: int = 2_000_000
+    audit_logs: int = 500_000
+    reminders: int = 200_000
+    vacation_requests: int = 60_000
+    sick_leaves: int = 30_000
+    documents: int = 40_000
+
+    def scaled(self, scale: float) -> "SeedSize":
+        return SeedSize(**{k: max(1, int(v * scale)) for k, v in asdict(self).items()})
+
+    @classmethod
+    def for_employees(cls, employees: int) -> "SeedSize":
+        """Alle Tabellen proportional zur Mitarbeiterzahl."""
+        return cls().scaled(employees / cls().employees)
+
+
+FULL = SeedSize()
+
+# ---------------------------
+# Verteilungen
+# ---------------------------
+DEPARTMENTS = {
+    "Support": 22, "Consulting": 16, "Sales": 14, "Backoffice": 10, "Facility": 8, "Marketing": 7,
+    "Creative": 6, "Finance": 5, "HR": 5, "Security": 4, "Management": 3,
+}
+POSITIONS = {"Mitarbeiter:in": 50, "Senior": 18, "Junior": 14, "Teamlead": 8, "Werkstudent:in": 6, "Azubi": 4}
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hannes", "Ida", "Jonas", "Lena",
+               "Max", "Nora", "Paul", "Sophie", "Tim", "Lea", "Noah", "Mia", "Elias", "Hanna", "Luis"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz",
+              "Hoffmann", "Koch", "Richter", "Klein", "Wolf", "Schröder", "Neumann", "Schwarz", "Braun"]
+DOC_TYPES = {"attest": 30, "urlaubsantrag": 20, "krankenkasse": 15, "sonstige": 12, "fehlzeit": 10,
+             "urlaub_bescheinigung": 8, "bewerbung": 5}
+REMINDER_TITLES = ["AU nachreichen", "Vertrag verlängern", "Urlaubsantrag prüfen", "Onboarding-Gespräch",
+                   "Zielvereinbarung", "Probezeit endet", "Schulung planen", "Resturlaub klären"]
+AUDIT_ACTIONS = {"update": 30, "create": 20, "upload": 15, "download": 15, "approve": 8,
+                 "delete": 5, "complete": 5, "reject": 2}
+AUDIT_RESOURCES = {"upload": "document", "download": "document", "approve": "vacation",
+                   "reject": "vacation", "complete": "reminder"}
+
+RUNNING_ENTRY_SHARE = 0.3     # Anteil Mitarbeiter mit laufender Stempelung
+CURRENTLY_SICK_SHARE = 0.04   # Anteil aktuell krank
+
+
+def _weighted(rng: random.Random, weights: Dict[str, int]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def business_id(i: int) -> str:
+    return f"KIT-{i:04d}"
+
+
+def _uuid(table: int, i: int) -> uuid.UUID:
+    """Deterministische IDs: gleiche Seed → gleiche Zeilen."""
+    return uuid.UUID(int=(table << 96) | i)
+
+
+def _split(total: int, parts: int) -> Iterator[int]:
+    """Verteilt total möglichst gleichmäßig auf parts (für Zeilen pro Mitarbeiter)."""
+    base, rest = divmod(total, parts)
+    for i in range(parts):
+        yield base + (1 if i < rest else 0)
+
+
+@dataclass
+class SeedContext:
+    size: SeedSize
+    seed: int
+    now: datetime
+    employees: List[tuple] = field(default_factory=list)  # (business_id, email, department)
+
+    def rng(self, table: str) -> random.Random:
+        """Eigener RNG pro Tabelle → jede Tabelle bleibt reproduzierbar, egal welche geladen werden."""
+        return random.Random(f"{self.seed}:{table}")
+
+
+# ---------------------------
+# Generatoren (Spaltenreihenfolge = TABLES[...][0])
+# ---------------------------
+def gen_employees(ctx: SeedContext) -> Iterator[Sequence]:
+    rng = ctx.rng("employees")
+    for i in range(1, ctx.size.employees + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}.{i}@kit-bench.de".replace("ü", "ue").replace("ö", "oe")
+        department = _weighted(rng, DEPARTMENTS) if rng.random() > 0.02 else None
+        ctx.employees.append((business_id(i), email, department))
+        yield (
+            _uuid(1, i), f"{first} {last}", email, business_id(i), department, _weighted(rng, POSITIONS),
+            ctx.now.date() - timedelta(days=rng.randrange(30, 12 * 365)),
+            30, rng.randrange(0, 26), ctx.now, ctx.now,
+        )
+
+
+def gen_time_entries(ctx: SeedContext) -> Iterator[Sequence]:
+    """Pro Mitarbeiter aufeinanderfolgende Werktage rückwärts ab gestern; ein Teil stempelt gerade."""
+    rng = ctx.rng("time_entries")
+    n = 0
+    for (emp_id, _, _), count in zip(ctx.employees, _split(ctx.size.time_entries, len(ctx.employees))):
+        if count and rng.random() < RUNNING_ENTRY_SHARE:
+            n += 1
+            count -= 1
+            start = ctx.now - timedelta(minutes=rng.randrange(15, 9 * 60))
+            yield (_uuid(2, n), emp_id, start, None, None, start, start)
+
+        day = ctx.now.date() - timedelta(days=1)
+        for _ in range(count):
+            while day.weekday() >= 5:
+                day -= timedelta(days=1)
+            start = datetime.combine(day, dtime(6 + rng.randrange(4), rng.randrange(60)), tzinfo=timezone.utc)
+            end = start + timedelta(minutes=max(120, int(rng.gauss(8.5 * 60, 60))))
+            n += 1
+            yield (_uuid(2, n), emp_id, start, end, "Homeoffice" if rng.random() < 0.2 else None, start, end)
+            day -= timedelta(days=1)
+
+
+def _vacation_start(rng: random.Random, today: date) -> date:
+    """40 % Sommerferien, 15 % Weihnachten, Rest gleichverteilt ±6 Monate."""
+    roll = rng.random()
+    year = today.year if rng.random() < 0.5 else today.year + (1 if today.month > 6 else -1)
+    if roll < 0.40:
+        return date(year, 7, 1) + timedelta(days=rng.randrange(62))
+    if roll < 0.55:
+        return date(year, 12, 18) + timedelta(days=rng.randrange(10))
+    return today + timedelta(days=rng.randrange(-180, 180))
+
+
+def gen_vacation_requests(ctx: SeedContext) -> Iterator[Sequence]:
+    rng = ctx.rng("vacation_requests")
+    today = ctx.now.date()
+    for i in range(1, ctx.size.vacation_requests + 1):
+        emp_id = rng.choice(ctx.employees)[0]
+        start = _vacation_start(rng, today)
+        end = start + timedelta(days=rng.choices([1, 2, 4, 9, 14], weights=[20, 20, 30, 20, 10])[0])
+        if end < today:
+            status = rng.choices(["approved", "rejected"], weights=[9, 1])[0]
+        else:
+            status = rng.choices(["pending", "approved", "rejected"], weights=[45, 50, 5])[0]
+        created = datetime.combine(start, dtime(), tzinfo=timezone.utc) - timedelta(days=rng.randrange(7, 90))
+        yield (_uuid(5, i), emp_id, start, end, rng.choice([None, "Erholung", "Familie", "Umzug"]),
+               status, None, None, created, created)
+
+
+def gen_sick_leaves(ctx: SeedContext) -> Iterator[Sequence]:
+    rng = ctx.rng("sick_leaves")
+    current = min(ctx.size.sick_leaves, int(ctx.size.employees * CURRENTLY_SICK_SHARE))
+    for i in range(1, ctx.size.sick_leaves + 1):
+        emp_id = rng.choice(ctx.employees)[0]
+        if i <= current:
+            start = ctx.now - timedelta(days=rng.randrange(0, 5))
+        else:
+            # Winter doppelt gewichtet
+            days_ago = rng.randrange(5, 365)
+            if (ctx.now - timedelta(days=days_ago)).month in (4, 5, 6, 7, 8, 9) and rng.random() < 0.5:
+                days_ago = rng.randrange(5, 365)
+            start = ctx.now - timedelta(days=days_ago)
+        length = rng.choices([1, 2, 3, 5, 10, 20], weights=[25, 25, 20, 15, 10, 5])[0]
+        yield (_uuid(6, i), emp_id, None, start, start + timedelta(days=length),
+               None, start, start)
+
+
+def gen_reminders(ctx: SeedContext) -> Iterator[Sequence]:
+    """20 % überfällig, 40 % erledigt, 40 % offen in der Zukunft."""
+    rng = ctx.rng("reminders")
+    for i in range(1, ctx.size.reminders + 1):
+        emp_id = rng.choice(ctx.employees)[0]
+        roll = rng.random()
+        if roll < 0.20:
+            due, status = ctx.now - timedelta(hours=rng.randrange(1, 60 * 24)), "pending"
+        elif roll < 0.60:
+            due, status = ctx.now - timedelta(hours=rng.randrange(1, 180 * 24)), "done"
+        else:
+            due, status = ctx.now + timedelta(hours=rng.randrange(1, 60 * 24)), "pending"
+        created = due - timedelta(days=rng.randrange(1, 30))
+        yield (_uuid(4, i), emp_id, rng.choice(REMINDER_TITLES), None, due, due - timedelta(days=1),
+               status, None, created, created)
+
+
+def gen_documents(ctx: SeedContext) -> Iterator[Sequence]:
+    rng = ctx.rng("documents")
+    for i in range(1, ctx.size.documents + 1):
+        emp_id = rng.choice(ctx.employees)[0]
+        doc_type = _weighted(rng, DOC_TYPES)
+        uploaded = ctx.now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        status = rng.choices(["pending", "approved", "rejected"], weights=[20, 70, 10])[0]
+        yield (_uuid(7, i), emp_id, doc_type, f"{doc_type}-{i}.pdf", f"/uploads/documents/{emp_id}/{doc_type}-{i}.pdf",
+               doc_type == "attest" and rng.random() < 0.5, status, None, None, uploaded, uploaded, uploaded)
+
+
+def gen_audit_logs(ctx: SeedContext) -> Iterator[Sequence]:
+    """Überwiegend HR/Management als Akteure, tagsüber an Werktagen."""
+    rng = ctx.rng("audit_logs")
+    actors = [e for e in ctx.employees if e[2] in ("HR", "Management")] or ctx.employees
+    for i in range(1, ctx.size.audit_logs + 1):
+        actor = rng.choice(actors) if rng.random() < 0.8 else rng.choice(ctx.employees)
+        subject = rng.choice(ctx.employees)[0]
+        action = _weighted(rng, AUDIT_ACTIONS)
+        resource = AUDIT_RESOURCES.get(action) or rng.choice(["employee", "document", "vacation", "sick_leave", "reminder"])
+        day = ctx.now.date() - timedelta(days=rng.randrange(365))
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        created = datetime.combine(day, dtime(8 + rng.randrange(10), rng.randrange(60), rng.randrange(60)), tzinfo=timezone.utc)
+        role = actor[2].lower() if actor[2] in ("HR", "Management") else "employee"
+        resource_id = str(_uuid(9, rng.getrandbits(40)))
+        yield (_uuid(3, i), actor[1].lower(), role, action, f"{resource}:{resource_id}", resource, resource_id,
+               json.dumps({"employee_id": subject}), created)
+
+
+# Reihenfolge = Ladereihenfolge (employees zuerst: FK + ctx.employees)
+TABLES: Dict[str, tuple[str, Callable[[SeedContext], Iterable[Sequence]]]] = {
+    "employees": ("id, name, email, employee_id, department, position, start_date, "
+                  "vacation_days_total, vacation_days_used, created, updated", gen_employees),
+    "time_entries": ("id, employee_id, start_time, end_time, notes, created, updated", gen_time_entries),
+    "vacation_requests": ("id, employee_id, start_date, end_date, reason, status, representative, notes, "
+                          "created, updated", gen_vacation_requests),
+    "sick_leaves": ("id, employee_id, document_id, start_date, end_date, notes, created, updated", gen_sick_leaves),
+    "reminders": ("id, employee_id, title, description, due_at, reminder_time, status, linked_to, "
+                  "created, updated", gen_reminders),
+    "documents": ("id, employee_id, document_type, title, file_url, is_original_required, status, "
+                  "comment, notes, upload_date, created, updated", gen_documents),
+    "audit_logs": ("id, user_email, role, action, resource, resource_type, resource_id, details, created_at",
+                   gen_audit_logs),
+}
+
+
+# ---------------------------
+# DB
+# ---------------------------
+ENUM_TYPES = {
+    "documentstatus": ["pending", "approved", "rejected"],
+    "vacationstatus": ["pending", "approved", "rejected"],
+    "documenttype": list(DOC_TYPES),
+}
+
+
+def libpq_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def create_schema(url: str) -> None:
+    """
+    Schema aus den Models (für leere Wegwerf-DBs – Alembic-Kette ist auf leerer DB nicht konsistent).
+    Die Enum-Typen sind in den Models create_type=False → vorher anlegen.
+    Danach die Alembic-Kette ab dem letzten Stand vor den Triggern nachziehen.
+    """
+    os.environ.setdefault("DATABASE_URL", url)
+    from sqlalchemy import create_engine, text
+    from app.database import Base
+    from app import models  # noqa: F401  (registriert die Tabellen)
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for name, values in ENUM_TYPES.items():
+            labels = ", ".join(f"'{v}'" for v in values)
+            conn.execute(text(
+                f"DO $$ BEGIN CREATE TYPE {name} AS ENUM ({labels}); "
+                f"EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+            ))
+        Base.metadata.create_all(conn)
+    engine.dispose()
+
+    # Trigger & Zähler (dashboard_counters) kommen aus den Migrationen nach 778dc2bdac96
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(Path(__file__).resolve().parent / "alembic.ini"))
+    previous = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = url  # env.py liest die URL aus der Umgebung
+    try:
+        command.stamp(config, "778dc2bdac96")
+        command.upgrade(config, "head")
+    finally:
+        if previous is not None:
+            os.environ["DATABASE_URL"] = previous
+
+
+def copy_rows(conn: psycopg.Connection, table: str, columns: str, rows: Iterable[Sequence], batch_size: int) -> int:
+    """COPY in Batches – jeder Batch ist eine eigene Transaktion (Fortschritt bleibt bei Abbruch erhalten)."""
+    total = 0
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return total
+        with conn.cursor() as cur, cur.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+            for row in batch:
+                copy.write_row(row)
+        conn.commit()
+        total += len(batch)
+
+
+def reset(conn: psycopg.Connection) -> None:
+    conn.execute(f"TRUNCATE {', '.join(reversed(list(TABLES)))} CASCADE")
+    conn.commit()
+
+
+def seed(
+    url: str,
+    size: SeedSize,
+    seed: int = 42,
+    now: Optional[datetime] = None,
+    batch_size: int = 50_000,
+    truncate: bool = False,
+    verbose: bool = True,
+) -> Dict[str, float]:
+    """Lädt alle Tabellen per COPY. Liefert die Ladezeit pro Tabelle in Sekunden."""
+    now = now or datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    ctx = SeedContext(size=size, seed=seed, now=now)
+    timings: Dict[str, float] = {}
+
+    with psycopg.connect(libpq_url(url)) as conn:
+        if truncate:
+            reset(conn)
+        for table, (columns, generator) in TABLES.items():
+            started = time.perf_counter()
+            rows = copy_rows(conn, table, columns, generator(ctx), batch_size)
+            timings[table] = round(time.perf_counter() - started, 2)
+            if verbose:
+                print(f"  📥 {table:<18} {rows:>10,} rows  {timings[table]:>7.2f}s")
+
+        conn.autocommit = True
+        conn.execute("ANALYZE")
+    return timings
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Bulk-seed Workmate directly into Postgres (COPY)")
+    p.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Default: $DATABASE_URL")
+    p.add_argument("--scale", type=float, default=None, help="1.0 = 20k Mitarbeiter / 2M Zeiteinträge")
+    p.add_argument("--employees", type=int, default=None, help="Alternativ: Größe über die Mitarbeiterzahl")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--batch-size", type=int, default=50_000)
+    p.add_argument("--reset", action="store_true", help="Tabellen vorher leeren (TRUNCATE … CASCADE)")
+    p.add_argument("--create-schema", action="store_true", help="Tabellen aus den Models anlegen (leere DB)")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if not args.database_url:
+        raise SystemExit("DATABASE_URL oder --database-url angeben.")
+
+    if args.employees is not None:
+        size = SeedSize.for_employees(args.employees)
+    else:
+        size = FULL.scaled(args.scale if args.scale is not None else 0.01)
+
+    if args.create_schema:
+        create_schema(args.database_url)
+
+    print(f"🌱 Bulk-Seed nach {make_url(args.database_url).render_as_string(hide_password=True)}")
+    started = time.perf_counter()
+    seed(args.database_url, size, seed=args.seed, batch_size=args.batch_size, truncate=args.reset)
+    print(f"✅ Fertig in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
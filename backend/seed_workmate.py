@@ -15,6 +15,9 @@ def parse_args():
     p.add_argument("--employees", type=int, default=5, help="How many employees to create")
     p.add_argument("--reset", nargs="?", const="ALL",
                    help="Delete data. Options: ALL or comma list (employees,documents,reminders,sick-leaves,vacation-requests,time-entries)")
+    p.add_argument("--direct", action="store_true",
+                   help="Write straight into the database via COPY (seed_bulk.py) instead of the API")
+    p.add_argument("--database-url", default=None, help="Only with --direct (default: $DATABASE_URL)")
     return p.parse_args()
 
 # ---------------------------
@@ -229,6 +232,18 @@ def reset_collections(session: requests.Session, base: str, targets: Iterable[st
 # ---------------------------
 def main():
     args = parse_args()
+
+    # DIRECT: ohne API, per COPY in die DB (Tausende Zeilen pro Sekunde)
+    if args.direct:
+        import seed_bulk
+        bulk_args = ["--employees", str(args.employees)]
+        if args.database_url:
+            bulk_args += ["--database-url", args.database_url]
+        if args.reset:
+            bulk_args.append("--reset")
+        seed_bulk.main(bulk_args)
+        return
+
     base = ensure_trailing_slash(args.base_url)
 
     s = requests.Session()
@@ -35,8 +35,13 @@ export const http = axios.create({
   headers: { 'Content-Type': 'application/json' },
 })
 
+// ===== Read-your-writes: Zeitpunkt des letzten Schreibzugriffs (vom Backend) mitschicken =====
+// → nach einem Speichern liest der nächste GET von der Primary, egal welcher Worker ihn bekommt
+let lastWrite: string | null = null
+
 // ===== INTERCEPTOR: fügt automatisch das Keycloak-Token hinzu =====
 http.interceptors.request.use(async (config) => {
+  if (lastWrite) config.headers['X-Last-Write'] = lastWrite
   try {
     // ⏱️ Token ggf. vor dem Request aktualisieren
     if (keycloak.authenticated) {
@@ -62,7 +67,11 @@ function clean<T extends Record<string, any>>(o: T): Partial<T> {
 // 🧭 Response-Interceptor → zentrales Error-Handling
 // ============================================================h
 http.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const stamp = response.headers['x-last-write']
+    if (stamp) lastWrite = stamp
+    return response
+  },
   (error) => {
     const status = error.response?.status
 